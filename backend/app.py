@@ -7,20 +7,30 @@ Ce module initialise l'application Flask et configure toutes les routes API
 """
 
 import os
+import json
 import logging
 from datetime import datetime
+import click
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_swagger_ui import get_swaggerui_blueprint
+from sqlalchemy.orm import undefer_group
 
 from config import active_config
 from utils.logging import setup_logging
-from utils.legal_check import validate_use_case, check_ethical_compliance
-from models import db, User, SearchHistory, AuditLog
+from utils.legal_check import check_ethical_compliance
+from utils.request_context import get_request_context
+from models import db, User, SearchHistory, SearchResult, AuditLog
+from utils.audit_queue import audit_queue
 from routes import register_routes
+from modules.registry import preload
+from utils.partitions import ensure_partitions, drop_expired_partitions
+from utils.search_index import search_indexer, build_documents
+from utils.payload_store import blob_store
+from utils.rate_limiter import outbound_limiter
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -44,6 +54,8 @@ def create_app(config=None):
     # Initialiser les extensions
     CORS(app, resources={r"/api/*": {"origins": app.config['FRONTEND_URL']}})
     db.init_app(app)
+    audit_queue.init_app(app)
+    search_indexer.init_app(app)
     jwt = JWTManager(app)
     
     # Initialiser le limiteur de débit
@@ -69,6 +81,10 @@ def create_app(config=None):
     # Enregistrer les routes
     register_routes(app)
     
+    # Précharger les modèles lourds dans le processus maître (partage copie sur écriture)
+    if app.config['PRELOAD_MODELS']:
+        preload(app.config['PRELOAD_MODULES'])
+    
     # Route par défaut pour le swagger JSON
     @app.route('/api/swagger.json')
     def swagger():
@@ -85,16 +101,16 @@ def create_app(config=None):
         # Vérification de consentement éthique pour les endpoints API
         if request.path.startswith('/api/search'):
             if app.config['ETHICAL_CHECK_ENABLED']:
-                consent = request.headers.get('X-Ethical-Consent')
-                use_case = request.headers.get('X-Use-Case')
+                # Contexte partagé avec le journal d'audit et les routes
+                context = get_request_context()
                 
-                if not consent or consent.lower() != 'true':
+                if not context.consent:
                     return jsonify({
                         'error': 'Consentement éthique requis',
                         'message': 'Vous devez accepter les directives éthiques pour utiliser cette API'
                     }), 403
                 
-                if not validate_use_case(use_case):
+                if not context.use_case_valid:
                     return jsonify({
                         'error': 'Cas d\'usage non autorisé',
                         'message': 'Le cas d\'usage spécifié n\'est pas autorisé'
@@ -118,6 +134,50 @@ def create_app(config=None):
         
         return None
     
+    # Maintenance des partitions (à planifier quotidiennement, ex: cron)
+    @app.cli.command('partitions')
+    def partitions_command():
+        """Crée les partitions d'historique et d'audit à venir"""
+        with db.engine.begin() as connection:
+            created = ensure_partitions(connection, app.config['PARTITION_PRECREATE_DAYS'])
+        click.echo(f"{len(created)} partitions présentes ou créées")
+    
+    @app.cli.command('retention')
+    @click.option('--dry-run', is_flag=True, help="Lister les partitions expirées sans les supprimer")
+    def retention_command(dry_run):
+        """Applique DATA_RETENTION_DAYS en supprimant les partitions expirées"""
+        with db.engine.begin() as connection:
+            ensure_partitions(connection, app.config['PARTITION_PRECREATE_DAYS'])
+            dropped = drop_expired_partitions(connection, app.config['DATA_RETENTION_DAYS'], dry_run=dry_run)
+        
+        # Les blobs des résultats sont conservés une partition quotidienne de plus que les lignes
+        if not dry_run:
+            blob_store.purge(app.config['DATA_RETENTION_DAYS'] + 2)
+        click.echo(f"Partitions {'expirées' if dry_run else 'supprimées'}: {', '.join(dropped) or 'aucune'}")
+    
+    @app.cli.command('reindex')
+    def reindex_command():
+        """Réindexe dans Elasticsearch tous les résultats enregistrés"""
+        rows = db.session.query(SearchHistory, SearchResult).join(
+            SearchResult, SearchResult.search_id == SearchHistory.id
+        ).options(undefer_group('payload')).yield_per(1000)
+        documents = (
+            document
+            for search, result in rows
+            for document in build_documents(search, [result.to_item()])
+        )
+        indexed = search_indexer.bulk(documents)
+        click.echo(f"{indexed} documents indexés dans {search_indexer.index}")
+    
+    @app.cli.command('rate-limits')
+    def rate_limits_command():
+        """Affiche les attentes de la limitation sortante, cumulées sur tous les workers"""
+        stats = outbound_limiter.cluster_stats()
+        click.echo(f"{'fournisseur':<16} {'appels':>8} {'attentes':>9} {'attente moy. (s)':>17} {'refusés':>8}")
+        for provider, values in sorted(stats.items()):
+            average = values['wait_seconds'] / values['waited'] if values['waited'] else 0.0
+            click.echo(f"{provider:<16} {values['acquired']:>8} {values['waited']:>9} {average:>17.2f} {values['denied']:>8}")
+    
     # Gestion des erreurs
     @app.errorhandler(404)
     def not_found(e):
@@ -144,6 +204,8 @@ if __name__ == '__main__':
     # Créer les tables de la base de données si elles n'existent pas
     with app.app_context():
         db.create_all()
+        with db.engine.begin() as connection:
+            ensure_partitions(connection, app.config['PARTITION_PRECREATE_DAYS'])
     
     # Démarrer l'application
     app.run(host='0.0.0.0', port=active_config.PORT, debug=active_config.DEBUG)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Benchmark de l'extraction des lieux
+Compare le débit de l'analyse par mots-clés d'origine, d'un appel nlp() par
+description (tous les composants actifs) et de nlp.pipe par lots avec les
+composants inutiles désactivés (utils.entity_extraction).
+
+Usage (depuis le répertoire backend):
+    python benchmarks/bench_entity_extraction.py [--texts 2000] [--model xx_ent_wiki_sm] [--batch-sizes 16,64,256]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.entity_extraction import keyword_locations, NLP_KEEP_PIPES, LOCATION_LABELS
+
+
+CITIES = ['Paris', 'Lyon', 'Marseille', 'Berlin', 'London', 'New York', 'Montréal', 'Bruxelles', 'Genève', 'Madrid']
+JOBS = ['Développeur', 'Photographe', 'Journaliste', 'Software engineer', 'Designer', 'Consultante']
+TEMPLATES = [
+    "{job} à {city}. Passionné de voyages et de cuisine.",
+    "{job} based in {city}, working at a small studio.",
+    "{job} from {city}, now living in {other}. Opinions are my own.",
+    "Compte personnel. {job}. Café, vélo et photographie.",
+    "{job} chez une agence de communication, located in {city}, {other}."
+]
+
+
+def build_descriptions(count, seed=42):
+    """
+    Construit des descriptions de profils synthétiques
+    Args:
+        count: Nombre de descriptions
+        seed: Graine du générateur aléatoire
+    Returns:
+        list: Descriptions
+    """
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(job=rng.choice(JOBS), city=rng.choice(CITIES), other=rng.choice(CITIES))
+        for _ in range(count)
+    ]
+
+
+def measure(extract, texts):
+    """
+    Mesure le débit d'une fonction d'extraction
+    Returns:
+        tuple: (textes par seconde, nombre de lieux trouvés)
+    """
+    start = time.perf_counter()
+    found = sum(len(locations) for locations in extract(texts))
+    elapsed = time.perf_counter() - start
+    return len(texts) / elapsed, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'extraction des lieux")
+    parser.add_argument('--texts', type=int, default=2000, help="Nombre de descriptions")
+    parser.add_argument('--model', default='xx_ent_wiki_sm', help="Modèle spaCy")
+    parser.add_argument('--batch-sizes', default='16,64,256', help="Tailles de lot testées pour nlp.pipe")
+    args = parser.parse_args()
+
+    texts = build_descriptions(args.texts)
+    variants = [('mots-clés (boucle Python)', lambda items: [keyword_locations(text) for text in items])]
+
+    try:
+        import spacy
+        full = spacy.load(args.model)
+        reduced = spacy.load(args.model)
+        reduced.select_pipes(disable=[name for name in reduced.pipe_names if name not in NLP_KEEP_PIPES])
+
+        def ents(doc):
+            return [ent.text for ent in doc.ents if ent.label_ in LOCATION_LABELS]
+
+        variants.append(('nlp() par texte, tous composants', lambda items: [ents(full(text)) for text in items]))
+        for batch_size in (int(size) for size in args.batch_sizes.split(',')):
+            variants.append((
+                f"nlp.pipe lots de {batch_size}, NER seul",
+                lambda items, batch_size=batch_size: [ents(doc) for doc in reduced.pipe(items, batch_size=batch_size)]
+            ))
+    except (ImportError, OSError) as e:
+        print(f"spaCy ou le modèle {args.model} indisponible ({e}) : seule l'analyse par mots-clés est mesurée")
+
+    print(f"{'variante':<36} {'textes/s':>12} {'lieux':>8}")
+    for name, extract in variants:
+        rate, found = measure(extract, texts)
+        print(f"{name:<36} {rate:>12.0f} {found:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Benchmark de l'analyse des pages de résultats
+Compare, sur les pages enregistrées dans benchmarks/fixtures/, l'ancienne
+analyse (BeautifulSoup avec html.parser sur toute la page) à chaque parseur
+disponible de utils.html_parser, restreint aux conteneurs de résultats.
+Vérifie aussi que chaque variante extrait les mêmes résultats.
+
+Usage (depuis le répertoire backend):
+    python benchmarks/bench_html_parser.py [--runs 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.html_parser import available_parsers
+from utils.result_pages import parse_google_images, parse_yandex_images, parse_tineye, parse_google_results
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Page enregistrée -> fonction d'extraction
+PAGES = {
+    'google_images.html': parse_google_images,
+    'yandex_images.html': parse_yandex_images,
+    'tineye.html': parse_tineye,
+    'google_search.html': parse_google_results
+}
+
+
+def measure(extract, html, runs, **kwargs):
+    """
+    Mesure le temps médian d'une extraction
+    Returns:
+        tuple: (temps médian en ms, résultats)
+    """
+    timings = []
+    results = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        results = extract(html, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyse des pages de résultats")
+    parser.add_argument('--runs', type=int, default=20, help="Nombre d'exécutions par variante")
+    args = parser.parse_args()
+
+    parsers = available_parsers()
+    print(f"Parseurs disponibles: {', '.join(parsers)}")
+    print(f"{'page':<20} {'taille (Ko)':>11} {'variante':<22} {'temps (ms)':>11} {'gain':>7} {'résultats':>10}")
+
+    for page, extract in PAGES.items():
+        with open(os.path.join(FIXTURES_DIR, page), encoding='utf-8') as f:
+            html = f.read()
+
+        legacy, expected = measure(extract, html, args.runs, parser='html.parser', scoped=False)
+        print(f"{page:<20} {len(html) / 1024:>11.0f} {'html.parser (page)':<22} {legacy:>11.2f} {'':>7} {'référence':>10}")
+
+        for name in parsers:
+            elapsed, results = measure(extract, html, args.runs, parser=name, scoped=True)
+            status = 'identiques' if results == expected else 'DIFFÉRENTS'
+            print(f"{'':<20} {'':>11} {name + ' (conteneurs)':<22} {elapsed:>11.2f} {legacy / elapsed:>6.1f}x {status:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Benchmark de la vérification de conformité
+Compare, sur des corps JSON de taille croissante sans violation (parcours
+complet), l'ancienne vérification (une expression compilée par mot-clé et par
+requête sur le texte remis en minuscules, puis re.findall par motif) au moteur
+de règles compilé de utils.legal_check.
+
+Usage (depuis le répertoire backend):
+    python benchmarks/bench_legal_check.py [--sizes 10,100,1000] [--runs 5]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.legal_check import SENSITIVE_KEYWORDS, REGEX_PATTERNS, policy_engine
+
+
+WORDS = ['Jean', 'Dupont', 'profil', 'public', 'Lyon', 'photographe', 'recherche', 'compte', 'linkedin', 'entreprise']
+
+
+def build_body(size_kb, seed=42):
+    """
+    Construit un corps JSON synthétique sans violation
+    Args:
+        size_kb: Taille approximative en Ko
+        seed: Graine du générateur aléatoire
+    Returns:
+        str: Texte analysé (valeurs du JSON jointes, comme pour une requête)
+    """
+    rng = random.Random(seed)
+    body = {}
+    field = 0
+    while len(json.dumps(body)) < size_kb * 1024:
+        body[f"field_{field}"] = ' '.join(rng.choice(WORDS) for _ in range(50))
+        field += 1
+    return ' '.join(str(v) for v in body.values())
+
+
+def legacy_check(request_data):
+    """
+    Reproduit l'ancienne vérification de check_ethical_compliance
+    """
+    for keyword in SENSITIVE_KEYWORDS:
+        if re.search(r'\b' + re.escape(keyword) + r'\b', request_data.lower()):
+            return False
+    for pattern in REGEX_PATTERNS.values():
+        if re.findall(pattern, request_data):
+            return False
+    return True
+
+
+def measure(check, text, runs):
+    """
+    Mesure le temps médian d'une vérification
+    Returns:
+        float: Temps médian en ms
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        check(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la vérification de conformité")
+    parser.add_argument('--sizes', default='10,100,1000', help="Tailles des corps JSON (Ko)")
+    parser.add_argument('--runs', type=int, default=5, help="Nombre d'exécutions par variante")
+    args = parser.parse_args()
+
+    # Compiler les règles avant la mesure (fait une fois par processus en production)
+    policy_engine.rules()
+
+    print(f"{'taille (Ko)':>12} {'ancienne (ms)':>14} {'compilée (ms)':>14} {'gain':>8}")
+    for size_kb in (int(size) for size in args.sizes.split(',')):
+        text = build_body(size_kb)
+        legacy = measure(legacy_check, text, args.runs)
+        compiled = measure(policy_engine.find_violations, text, args.runs)
+        print(f"{size_kb:>12} {legacy:>14.2f} {compiled:>14.2f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
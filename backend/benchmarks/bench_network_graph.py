@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Benchmark du rendu du graphe de relations
+Compare l'ancien rendu (spring_layout + pyplot à 300 dpi) au rendu radial
+de DataAggregator.generate_network_graph, en temps et en taille de sortie.
+
+Usage (depuis le répertoire backend):
+    python benchmarks/bench_network_graph.py [--nodes 40] [--runs 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.data_aggregator import DataAggregator
+
+
+def build_person_data(nodes):
+    """
+    Construit des données agrégées synthétiques
+    Args:
+        nodes: Nombre approximatif de nœuds périphériques
+    Returns:
+        dict: Données agrégées d'une personne
+    """
+    per_type = max(nodes // 5, 1)
+    return {
+        'name': 'Jean Dupont',
+        'social_profiles': {
+            'linkedin': [{'name': f"Jean Dupont {i}", 'url': f"https://linkedin.com/in/jdupont{i}"} for i in range(per_type)]
+        },
+        'possible_usernames': [f"jdupont{i}" for i in range(per_type)],
+        'emails': [{'address': f"jean{i}@example.com"} for i in range(per_type)],
+        'organizations': [f"Organisation {i}" for i in range(per_type)],
+        'locations': [f"Ville {i}" for i in range(per_type)],
+        'metadata': {'sources': [], 'confidence': 50}
+    }
+
+
+def legacy_render(person_data):
+    """
+    Reproduit l'ancien rendu: graphe networkx, spring_layout et pyplot à 300 dpi
+    """
+    import networkx as nx
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    G = nx.DiGraph()
+    G.add_node(person_data['name'], color='red')
+    for platform, profiles in person_data['social_profiles'].items():
+        for i, profile in enumerate(profiles):
+            G.add_node(f"{platform}_{i}", label=profile['name'], color='blue')
+            G.add_edge(person_data['name'], f"{platform}_{i}")
+    for key, color in (('possible_usernames', 'green'), ('organizations', 'orange'), ('locations', 'yellow')):
+        for value in person_data[key]:
+            G.add_node(value, color=color)
+            G.add_edge(person_data['name'], value)
+    for email in person_data['emails']:
+        G.add_node(email['address'], color='purple')
+        G.add_edge(person_data['name'], email['address'])
+
+    plt.figure(figsize=(12, 8))
+    pos = nx.spring_layout(G)
+    nx.draw_networkx_nodes(G, pos, node_color=[G.nodes[n].get('color', 'gray') for n in G.nodes()], node_size=500, alpha=0.8)
+    nx.draw_networkx_edges(G, pos, width=1.0, alpha=0.5)
+    nx.draw_networkx_labels(G, pos, {n: G.nodes[n].get('label', n) for n in G.nodes()}, font_size=10, font_family='sans-serif')
+    plt.title(f"Réseau de relations pour {person_data['name']}")
+    plt.axis('off')
+    img_buf = BytesIO()
+    plt.savefig(img_buf, format='png', dpi=300, bbox_inches='tight')
+    plt.close()
+    return img_buf
+
+
+def measure(render, runs):
+    """
+    Mesure le temps médian et la taille de sortie d'une fonction de rendu
+    Returns:
+        tuple: (temps médian en ms, taille en octets)
+    """
+    timings = []
+    size = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        buf = render()
+        timings.append((time.perf_counter() - start) * 1000)
+        size = len(buf.getvalue())
+    timings.sort()
+    return timings[len(timings) // 2], size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du rendu du graphe de relations")
+    parser.add_argument('--nodes', type=int, default=40, help="Nombre de nœuds périphériques")
+    parser.add_argument('--runs', type=int, default=5, help="Nombre d'exécutions par variante")
+    args = parser.parse_args()
+
+    person_data = build_person_data(args.nodes)
+    aggregator = DataAggregator()
+
+    variants = [
+        ('legacy spring/pyplot png@300', lambda: legacy_render(person_data)),
+        (f"radial png@{aggregator.graph_dpi}", lambda: aggregator.generate_network_graph(person_data, 'png')),
+        ('radial svg', lambda: aggregator.generate_network_graph(person_data, 'svg')),
+    ]
+
+    print(f"{'variante':<32} {'médiane (ms)':>14} {'taille (Ko)':>12}")
+    for name, render in variants:
+        try:
+            median, size = measure(render, args.runs)
+        except ImportError as e:
+            print(f"{name:<32} {'indisponible':>14} ({e})")
+            continue
+        print(f"{name:<32} {median:>14.1f} {size / 1024:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
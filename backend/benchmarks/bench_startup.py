@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Benchmark du temps d'import au démarrage
+Lance un interpréteur neuf avec `python -X importtime`, importe le module
+cible (par défaut `routes`, chargé par chaque worker) et analyse la trace :
+temps cumulé, imports les plus coûteux, et présence de dépendances lourdes
+qui doivent rester chargées à la demande (voir modules/registry.py).
+
+Le script sort en erreur si une dépendance lourde est importée ou si le
+budget de temps est dépassé, ce qui permet de l'utiliser comme garde-fou.
+
+Usage (depuis le répertoire backend):
+    python benchmarks/bench_startup.py [--module routes] [--budget-ms 1500] [--top 15]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dépendances qui ne doivent pas être importées au démarrage d'un worker
+HEAVY_MODULES = [
+    'face_recognition',
+    'dlib',
+    'cv2',
+    'boto3',
+    'selenium',
+    'networkx',
+    'matplotlib',
+    'spacy'
+]
+
+
+def run_importtime(module):
+    """
+    Importe un module dans un interpréteur neuf avec -X importtime
+    Args:
+        module: Nom du module à importer
+    Returns:
+        list: Liste de tuples (self_us, cumulative_us, nom, profondeur)
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+
+    if process.returncode != 0:
+        last_line = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else ''
+        raise RuntimeError(f"Import de '{module}' impossible: {last_line}")
+
+    entries = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(self_us), int(cumulative_us), name.strip(), depth))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du temps d'import au démarrage")
+    parser.add_argument('--module', default='routes', help="Module à importer")
+    parser.add_argument('--budget-ms', type=float, default=None, help="Temps d'import maximal toléré")
+    parser.add_argument('--top', type=int, default=15, help="Nombre d'imports les plus coûteux à afficher")
+    args = parser.parse_args()
+
+    try:
+        entries = run_importtime(args.module)
+    except RuntimeError as e:
+        print(str(e))
+        return 2
+
+    # Les imports de premier niveau (profondeur 1) totalisent le temps d'import
+    total_ms = sum(cumulative for _, cumulative, _, depth in entries if depth == 1) / 1000
+    print(f"Import de '{args.module}': {total_ms:.1f} ms, {len(entries)} modules")
+
+    print(f"\n{'module':<50} {'cumulé (ms)':>12}")
+    top_level = sorted((e for e in entries if e[3] == 1), key=lambda e: e[1], reverse=True)
+    for _, cumulative, name, _ in top_level[:args.top]:
+        print(f"{name:<50} {cumulative / 1000:>12.1f}")
+
+    status = 0
+
+    imported = {name.split('.')[0] for _, _, name, _ in entries}
+    heavy = [name for name in HEAVY_MODULES if name in imported]
+    if heavy:
+        print(f"\nERREUR: dépendances lourdes importées au démarrage: {', '.join(heavy)}")
+        status = 1
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nERREUR: budget dépassé ({total_ms:.1f} ms > {args.budget_ms:.1f} ms)")
+        status = 1
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
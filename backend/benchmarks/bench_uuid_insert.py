@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Benchmark d'insertion selon le type de clé primaire
+Insère des lignes de la forme des logs d'audit dans deux tables temporaires
+(clé primaire UUID seule), l'une avec des clés uuid4, l'autre avec des clés
+uuid7, et compare le débit d'insertion et la taille finale de l'index de clé
+primaire (les divisions de pages des clés aléatoires laissent des pages à
+moitié remplies).
+
+Nécessite un PostgreSQL local et psycopg2.
+
+Usage (depuis le répertoire backend):
+    python benchmarks/bench_uuid_insert.py [--dsn postgresql://...] [--rows 500000] [--batch 1000]
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from config import active_config
+from models import uuid7
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7
+}
+
+
+def run(connection, name, generator, rows, batch):
+    """
+    Insère des lignes par lots dans une table temporaire
+    Args:
+        connection: Connexion psycopg2
+        name: Nom du générateur (suffixe de la table)
+        generator: Fonction retournant un UUID
+        rows: Nombre total de lignes
+        batch: Taille des lots
+    Returns:
+        dict: Débit (lignes/s) et taille de l'index de clé primaire (octets)
+    """
+    table = f"bench_audit_{name}"
+    details = json.dumps({'method': 'GET', 'params': {}})
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        cursor.execute(
+            f"CREATE TABLE {table} ("
+            "id uuid PRIMARY KEY, created_at timestamp, action varchar(50), "
+            "resource varchar(100), ip_address varchar(50), details jsonb)"
+        )
+        connection.commit()
+
+        start = time.perf_counter()
+        for offset in range(0, rows, batch):
+            now = datetime.datetime.utcnow()
+            values = [
+                (str(generator()), now, 'access', '/api/history', '127.0.0.1', details)
+                for _ in range(min(batch, rows - offset))
+            ]
+            execute_values(
+                cursor,
+                f"INSERT INTO {table} (id, created_at, action, resource, ip_address, details) VALUES %s",
+                values,
+                page_size=batch
+            )
+            connection.commit()
+        elapsed = time.perf_counter() - start
+
+        cursor.execute("SELECT pg_relation_size(%s)", (f"{table}_pkey",))
+        index_size = cursor.fetchone()[0]
+
+        cursor.execute(f"DROP TABLE {table}")
+        connection.commit()
+
+    return {'rows_per_s': rows / elapsed, 'index_bytes': index_size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark d'insertion uuid4 / uuid7")
+    parser.add_argument('--dsn', default=active_config.SQLALCHEMY_DATABASE_URI, help="Chaîne de connexion PostgreSQL")
+    parser.add_argument('--rows', type=int, default=500000, help="Nombre de lignes insérées par type de clé")
+    parser.add_argument('--batch', type=int, default=1000, help="Taille des lots d'insertion")
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(args.dsn)
+    try:
+        print(f"{'clé':<8}{'lignes/s':>14}{'index PK':>14}")
+        for name, generator in GENERATORS.items():
+            result = run(connection, name, generator, args.rows, args.batch)
+            print(f"{name:<8}{result['rows_per_s']:>14,.0f}{result['index_bytes'] / 1024 / 1024:>11.1f} Mo")
+    finally:
+        connection.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Mesure du préchargement avant le fork, sans gunicorn
+Reproduit le cycle des workers : le processus parent charge (ou non) les
+modules préchargés comme create_app avec PRELOAD_MODELS (modules.registry.preload,
+puis gc.freeze), crée des processus enfants par fork, puis chaque enfant
+traite une requête type (rendu d'un graphe matplotlib, analyse de descriptions
+avec le modèle NLP). La mémoire de chaque enfant est ensuite lue dans
+/proc/<pid>/smaps_rollup, dans les deux modes.
+
+Usage (depuis le répertoire backend):
+    python benchmarks/measure_preload_rss.py [--workers 4] [--preload DataAggregator] [--modules networkx]
+"""
+
+import os
+import sys
+import gc
+import time
+import signal
+import argparse
+import importlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from measure_worker_rss import read_rollup
+from bench_entity_extraction import build_descriptions
+
+
+def load(preload_names, modules):
+    """
+    Charge les modules préchargés et les imports supplémentaires
+    Args:
+        preload_names: Classes passées à modules.registry.preload
+        modules: Modules importés en plus (par exemple networkx)
+    """
+    for name in modules:
+        importlib.import_module(name)
+
+    from modules.registry import preload
+    preload(preload_names)
+
+
+def handle_request(texts):
+    """
+    Requête type : graphe rendu avec matplotlib et lieux extraits des descriptions
+    """
+    from io import BytesIO
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from utils.entity_extraction import extract_locations
+
+    figure = Figure(figsize=(4, 4))
+    FigureCanvasAgg(figure)
+    figure.add_subplot().plot(range(len(texts)), [len(text) for text in texts])
+    figure.savefig(BytesIO(), format='png')
+
+    extract_locations(texts)
+
+
+def run(workers, preloaded, preload_names, modules):
+    """
+    Crée les enfants, attend qu'ils aient traité leur requête et relève leur mémoire
+    Returns:
+        tuple: (compteurs du parent, liste des compteurs des enfants)
+    """
+    if preloaded:
+        load(preload_names, modules)
+
+    texts = build_descriptions(200)
+    ready = []
+    pids = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            if not preloaded:
+                load(preload_names, modules)
+            handle_request(texts)
+            os.write(write_fd, b'1')
+            os.close(write_fd)
+            signal.pause()
+            os._exit(0)
+        os.close(write_fd)
+        ready.append(read_fd)
+        pids.append(pid)
+
+    for fd in ready:
+        os.read(fd, 1)
+        os.close(fd)
+
+    # Laisser le ramasse-miettes des enfants faire son premier passage
+    time.sleep(0.5)
+    parent = read_rollup(os.getpid())
+    results = [read_rollup(pid) for pid in pids]
+
+    for pid in pids:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+
+    return parent, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mémoire des workers avec et sans préchargement")
+    parser.add_argument('--workers', type=int, default=4, help="Nombre de processus enfants")
+    parser.add_argument('--preload', default='DataAggregator', help="Classes préchargées (PRELOAD_MODULES)")
+    parser.add_argument('--modules', default='', help="Modules importés en plus, séparés par des virgules")
+    parser.add_argument('--mode', choices=('preload', 'no-preload'), help="Mode mesuré (par défaut: les deux)")
+    args = parser.parse_args()
+
+    preload_names = [name for name in args.preload.split(',') if name]
+    modules = [name for name in args.modules.split(',') if name]
+
+    if args.mode is None:
+        # Chaque mode dans un interpréteur neuf, pour que le premier ne charge rien pour le second
+        for mode in ('no-preload', 'preload'):
+            sys.stdout.flush()
+            pid = os.fork()
+            if pid == 0:
+                os.execv(sys.executable, [sys.executable, os.path.abspath(__file__), *sys.argv[1:], '--mode', mode])
+            os.waitpid(pid, 0)
+        return 0
+
+    parent, results = run(args.workers, args.mode == 'preload', preload_names, modules)
+
+    print(f"Mode {args.mode}, {args.workers} enfants")
+    print(f"{'processus':<10} {'RSS (Mo)':>10} {'PSS (Mo)':>10} {'privé (Mo)':>11}")
+    for role, values in [('parent', parent)] + [('enfant', values) for values in results]:
+        private = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+        print(f"{role:<10} {values.get('Rss', 0) / 1024:>10.1f} {values.get('Pss', 0) / 1024:>10.1f} {private / 1024:>11.1f}")
+
+    total_pss = sum(values.get('Pss', 0) for values in [parent] + results)
+    print(f"PSS moyen par enfant: {sum(values.get('Pss', 0) for values in results) / len(results) / 1024:.1f} Mo")
+    print(f"PSS total: {total_pss / 1024:.1f} Mo")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
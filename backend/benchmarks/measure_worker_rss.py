@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Mesure de la mémoire des workers gunicorn
+Lit /proc/<pid>/smaps_rollup (Linux) pour le processus maître et chacun de
+ses workers et affiche RSS, PSS et mémoire privée. Le PSS répartit les pages
+partagées entre les processus qui les utilisent : c'est la valeur à comparer
+avec et sans PRELOAD_MODELS (voir docs/performance.md).
+
+Usage:
+    python benchmarks/measure_worker_rss.py <pid du maître gunicorn>
+"""
+
+import sys
+
+FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def read_rollup(pid):
+    """
+    Lit les compteurs mémoire agrégés d'un processus
+    Args:
+        pid: Identifiant du processus
+    Returns:
+        dict: Compteurs en Ko
+    """
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts and parts[0].rstrip(':') in FIELDS:
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return values
+
+
+def children(pid):
+    """
+    Liste les processus enfants directs
+    """
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        return 2
+
+    master = int(sys.argv[1])
+    workers = children(master)
+
+    print(f"{'pid':>8} {'rôle':<8} {'RSS (Mo)':>10} {'PSS (Mo)':>10} {'privé (Mo)':>11}")
+    totals = {'Rss': 0, 'Pss': 0, 'private': 0}
+    worker_pss = []
+    for pid, role in [(master, 'maître')] + [(w, 'worker') for w in workers]:
+        values = read_rollup(pid)
+        private = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+        totals['Rss'] += values.get('Rss', 0)
+        totals['Pss'] += values.get('Pss', 0)
+        totals['private'] += private
+        if role == 'worker':
+            worker_pss.append(values.get('Pss', 0))
+        print(f"{pid:>8} {role:<8} {values.get('Rss', 0) / 1024:>10.1f} {values.get('Pss', 0) / 1024:>10.1f} {private / 1024:>11.1f}")
+
+    print(f"{'total':>8} {'':<8} {totals['Rss'] / 1024:>10.1f} {totals['Pss'] / 1024:>10.1f} {totals['private'] / 1024:>11.1f}")
+    if worker_pss:
+        print(f"PSS moyen par worker: {sum(worker_pss) / len(worker_pss) / 1024:.1f} Mo")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
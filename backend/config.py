@@ -33,13 +33,26 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 heure
     JWT_REFRESH_TOKEN_EXPIRES = 2592000  # 30 jours
     MFA_REQUIRED = os.getenv('MFA_REQUIRED', 'true').lower() in ('true', '1', 't')
+    AUTH_CACHE_SIZE = int(os.getenv('AUTH_CACHE_SIZE', 10000))  # Utilisateurs et clés API en cache par worker
+    AUTH_CACHE_TTL = int(os.getenv('AUTH_CACHE_TTL', 300))  # En secondes
     
     # Base de données
     SQLALCHEMY_DATABASE_URI = f"postgresql://{os.getenv('POSTGRES_USER', 'thewatcher')}:{os.getenv('POSTGRES_PASSWORD', 'thewatcher')}@{os.getenv('POSTGRES_HOST', 'localhost')}:{os.getenv('POSTGRES_PORT', '5432')}/{os.getenv('POSTGRES_DB', 'thewatcher')}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Réplique en lecture (facultative) pour les routes en lecture seule
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+    REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 15))  # Lectures sur le primaire après une écriture
+    
     # Elasticsearch
     ELASTIC_URL = os.getenv('ELASTIC_URL', 'http://localhost:9200')
+    ELASTIC_INDEXING = os.getenv('ELASTIC_INDEXING', 'true').lower() in ('true', '1', 't')
+    ELASTIC_INDEX = os.getenv('ELASTIC_INDEX', 'thewatcher-results')
+    ELASTIC_BULK_SIZE = int(os.getenv('ELASTIC_BULK_SIZE', 500))
+    ELASTIC_QUEUE_SIZE = int(os.getenv('ELASTIC_QUEUE_SIZE', 20000))
+    ELASTIC_ENQUEUE_TIMEOUT = float(os.getenv('ELASTIC_ENQUEUE_TIMEOUT', 0.05))  # En secondes, par document
+    ELASTIC_MAX_RETRIES = int(os.getenv('ELASTIC_MAX_RETRIES', 3))
     
     # Redis
     REDIS_URL = f"redis://:{os.getenv('REDIS_PASSWORD', '')}@{os.getenv('REDIS_HOST', 'localhost')}:{os.getenv('REDIS_PORT', '6379')}/0"
@@ -49,8 +62,29 @@ class Config:
     MAX_IMAGE_SIZE = int(os.getenv('MAX_IMAGE_SIZE', 5)) * 1024 * 1024  # En octets
     MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', 10))
     REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', 30))
+    
+    # Débit sortant par fournisseur, partagé entre les workers (fournisseur=requêtes par minute:capacité)
+    OUTBOUND_RATE_LIMIT_ENABLED = os.getenv('OUTBOUND_RATE_LIMIT_ENABLED', 'true').lower() in ('true', '1', 't')
+    OUTBOUND_RATE_LIMITS = os.getenv(
+        'OUTBOUND_RATE_LIMITS',
+        'google=10:2,yandex=10:2,tineye=10:2,google_vision=600:20,hunter=60:5,shodan=60:1'
+    )
+    OUTBOUND_RATE_LIMIT_DEFAULT = os.getenv('OUTBOUND_RATE_LIMIT_DEFAULT', '30:3')  # Fournisseurs non listés
+    OUTBOUND_RATE_LIMIT_MAX_WAIT = float(os.getenv('OUTBOUND_RATE_LIMIT_MAX_WAIT', 20))  # En secondes
+    
+    # Regroupement des recherches identiques simultanées, entre les workers via Redis
+    SINGLEFLIGHT_ENABLED = os.getenv('SINGLEFLIGHT_ENABLED', 'true').lower() in ('true', '1', 't')
+    WORKER_TIMEOUT = int(os.getenv('GUNICORN_TIMEOUT', 300))  # En secondes (timeout gunicorn, voir gunicorn.conf.py)
+    SINGLEFLIGHT_LOCK_TTL = int(os.getenv('SINGLEFLIGHT_LOCK_TTL', 300))  # En secondes (timeout gunicorn)
+    # Attente + durée d'une recherche exécutée localement < WORKER_TIMEOUT
+    SINGLEFLIGHT_WAIT_TIMEOUT = int(os.getenv('SINGLEFLIGHT_WAIT_TIMEOUT', 120))  # En secondes
+    SINGLEFLIGHT_RESULT_TTL = int(os.getenv('SINGLEFLIGHT_RESULT_TTL', 60))  # En secondes
     FACE_MATCH_THRESHOLD = float(os.getenv('FACE_MATCH_THRESHOLD', 80.0))
     
+    # Préchargement des modèles avant le fork des workers (gunicorn --preload)
+    PRELOAD_MODELS = os.getenv('PRELOAD_MODELS', 'false').lower() in ('true', '1', 't')
+    PRELOAD_MODULES = [m.strip() for m in os.getenv('PRELOAD_MODULES', 'FaceDetector,DataAggregator').split(',') if m.strip()]
+    
     # Services externes
     AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
     AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
@@ -62,6 +96,11 @@ class Config:
     MALTEGO_API_KEY = os.getenv('MALTEGO_API_KEY')
     SPIDERFOOT_URL = os.getenv('SPIDERFOOT_URL', 'http://localhost:5001/api')
     HUNTER_API_KEY = os.getenv('HUNTER_API_KEY')
+    HTML_PARSER = os.getenv('HTML_PARSER', 'auto')  # 'auto', 'selectolax', 'lxml' ou 'html.parser'
+    FETCH_HTTP_FIRST = os.getenv('FETCH_HTTP_FIRST', 'true').lower() in ('true', '1', 't')  # Navigateur en repli seulement
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))  # Connexions conservées par hôte
+    SCRAPER_SETTLE_TIMEOUT = float(os.getenv('SCRAPER_SETTLE_TIMEOUT', 5))  # Attente max. de la fin du chargement (secondes)
+    SCRAPER_SETTLE_WINDOW = float(os.getenv('SCRAPER_SETTLE_WINDOW', 0.5))  # Stabilité exigée des résultats (secondes)
     
     # Configuration proxy
     PROXY_ENABLED = os.getenv('PROXY_ENABLED', 'false').lower() in ('true', '1', 't')
@@ -74,9 +113,36 @@ class Config:
     
     # Directives éthiques
     ETHICAL_CHECK_ENABLED = os.getenv('ETHICAL_CHECK_ENABLED', 'true').lower() in ('true', '1', 't')
+    LEGAL_RULES_FILE = os.getenv('LEGAL_RULES_FILE')  # Par défaut: backend/legal_rules.json
+    LEGAL_RULES_RELOAD_INTERVAL = float(os.getenv('LEGAL_RULES_RELOAD_INTERVAL', 5))  # En secondes
     SAVE_SEARCH_HISTORY = os.getenv('SAVE_SEARCH_HISTORY', 'true').lower() in ('true', '1', 't')
     PRIVACY_CONSENT_REQUIRED = os.getenv('PRIVACY_CONSENT_REQUIRED', 'true').lower() in ('true', '1', 't')
     DATA_RETENTION_DAYS = int(os.getenv('DATA_RETENTION_DAYS', 30))
+    PARTITION_PRECREATE_DAYS = int(os.getenv('PARTITION_PRECREATE_DAYS', 7))  # Partitions créées à l'avance
+    
+    # Écriture différée des logs d'audit
+    AUDIT_QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', 10000))
+    AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 200))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', 1.0))  # En secondes
+    AUDIT_SPILL_FILE = os.getenv('AUDIT_SPILL_FILE')  # Par défaut: data/audit_spill.jsonl
+    
+    # Stockage des données de résultats volumineuses
+    RESULT_COMPRESS_THRESHOLD = int(os.getenv('RESULT_COMPRESS_THRESHOLD', 4096))  # En octets (JSON)
+    RESULT_OFFLOAD_THRESHOLD = int(os.getenv('RESULT_OFFLOAD_THRESHOLD', 262144))  # En octets (compressés)
+    RESULT_BLOB_DIR = os.getenv('RESULT_BLOB_DIR')  # Par défaut: data/blobs
+    
+    # Rapports
+    REPORT_GRAPH_FORMAT = os.getenv('REPORT_GRAPH_FORMAT', 'svg')  # 'svg' ou 'png'
+    REPORT_GRAPH_DPI = int(os.getenv('REPORT_GRAPH_DPI', 100))
+    REPORT_PRERENDER = os.getenv('REPORT_PRERENDER', 'true').lower() in ('true', '1', 't')
+    REPORT_PRERENDER_WORKERS = int(os.getenv('REPORT_PRERENDER_WORKERS', 2))
+    REPORT_CACHE_MAX_MB = int(os.getenv('REPORT_CACHE_MAX_MB', 500))
+    REPORT_CACHE_MAX_AGE_HOURS = int(os.getenv('REPORT_CACHE_MAX_AGE_HOURS', 72))
+    
+    # Extraction des lieux et organisations (spaCy, analyse par mots-clés si indisponible)
+    NLP_ENABLED = os.getenv('NLP_ENABLED', 'true').lower() in ('true', '1', 't')
+    NLP_MODEL = os.getenv('NLP_MODEL', 'xx_ent_wiki_sm')
+    NLP_BATCH_SIZE = int(os.getenv('NLP_BATCH_SIZE', 64))
     
     # Localisation
     DEFAULT_LANGUAGE = os.getenv('DEFAULT_LANGUAGE', 'fr')
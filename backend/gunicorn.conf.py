@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Configuration gunicorn
+Usage (depuis le répertoire backend): gunicorn -c gunicorn.conf.py
+
+Avec PRELOAD_MODELS=true, l'application (et les modèles listés dans
+PRELOAD_MODULES) est créée dans le processus maître avant le fork : les
+workers partagent alors ces pages mémoire en copie sur écriture.
+"""
+
+import os
+
+wsgi_app = 'app:create_app()'
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 300))
+preload_app = os.getenv('PRELOAD_MODELS', 'false').lower() in ('true', '1', 't')
+
+
+def on_starting(server):
+    """
+    Vérifie les partitions une fois, dans le processus maître, avant le
+    chargement de l'application (au cas où la tâche quotidienne n'a pas tourné)
+    """
+    from sqlalchemy import create_engine
+    from config import active_config
+    from utils.partitions import ensure_partitions
+
+    engine = create_engine(active_config.SQLALCHEMY_DATABASE_URI)
+    try:
+        with engine.begin() as connection:
+            ensure_partitions(connection, active_config.PARTITION_PRECREATE_DAYS)
+    except Exception as e:
+        server.log.warning(f"Partitions non vérifiées au démarrage: {str(e)}")
+    finally:
+        engine.dispose()
+
+
+def worker_exit(server, worker):
+    """
+    Écrit les logs d'audit et indexe les documents encore en file avant l'arrêt du worker
+    """
+    from utils.audit_queue import audit_queue
+    from utils.search_index import search_indexer
+    audit_queue.shutdown()
+    search_indexer.shutdown()
@@ -0,0 +1,15 @@
+-- TheWatcher - Index de l'historique des recherches
+--
+-- Les nouvelles bases les reçoivent via db.create_all() (voir models.py).
+-- Pour une base existante, exécuter ce script hors transaction :
+--     psql "$DATABASE_URL" -f migrations/001_history_indexes.sql
+-- CONCURRENTLY évite de bloquer les écritures pendant la construction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_search_history_user_created_id
+    ON search_history (user_id, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_search_results_search_id
+    ON search_results (search_id);
+
+ANALYZE search_history;
+ANALYZE search_results;
@@ -0,0 +1,59 @@
+-- TheWatcher - Partitionnement de audit_logs, search_history et search_results
+--
+-- Les nouvelles bases sont créées partitionnées par db.create_all() (voir
+-- models.py et utils/partitions.py). Pour une base existante, arrêter
+-- l'application puis exécuter :
+--     psql "$DATABASE_URL" -f migrations/002_partition_tables.sql
+--     flask --app app:create_app partitions
+--
+-- Chaque table existante est renommée en <table>_legacy puis attachée telle
+-- quelle comme première partition (de MINVALUE à la fin de la période en
+-- cours) : aucune donnée n'est copiée. `flask retention` en supprime les
+-- lignes expirées, puis la partition une fois entièrement expirée.
+
+BEGIN;
+
+-- La clé primaire de search_history inclut désormais created_at
+ALTER TABLE search_results DROP CONSTRAINT IF EXISTS search_results_search_id_fkey;
+
+DO $$
+DECLARE
+    t record;
+    bound timestamp;
+BEGIN
+    FOR t IN SELECT * FROM (VALUES
+        ('audit_logs', 'day'),
+        ('search_history', 'day'),
+        ('search_results', 'day')
+    ) AS v(name, unit) LOOP
+        bound := date_trunc(t.unit, now() AT TIME ZONE 'UTC') + ('1 ' || t.unit)::interval;
+
+        -- La clé de partitionnement ne peut pas être nulle
+        EXECUTE format('UPDATE %I SET created_at = now() AT TIME ZONE ''UTC'' WHERE created_at IS NULL', t.name);
+        EXECUTE format('ALTER TABLE %I ALTER COLUMN created_at SET NOT NULL', t.name);
+
+        -- Libérer les noms de la table, de sa clé primaire et de ses index
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', t.name, t.name || '_legacy');
+        EXECUTE format('ALTER TABLE %I RENAME CONSTRAINT %I TO %I', t.name || '_legacy', t.name || '_pkey', t.name || '_legacy_pkey');
+
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS, PRIMARY KEY (created_at, id)) PARTITION BY RANGE (created_at)',
+            t.name, t.name || '_legacy'
+        );
+        EXECUTE format(
+            'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (MINVALUE) TO (%L)',
+            t.name, t.name || '_legacy', bound
+        );
+    END LOOP;
+END $$;
+
+ALTER INDEX IF EXISTS ix_search_history_user_created_id RENAME TO ix_search_history_legacy_user_created_id;
+ALTER INDEX IF EXISTS ix_search_results_search_id RENAME TO ix_search_results_legacy_search_id;
+
+CREATE INDEX ix_search_history_user_created_id ON search_history (user_id, created_at, id);
+CREATE INDEX ix_search_results_search_id ON search_results (search_id);
+
+ALTER TABLE search_history ADD FOREIGN KEY (user_id) REFERENCES users (id);
+ALTER TABLE audit_logs ADD FOREIGN KEY (user_id) REFERENCES users (id);
+
+COMMIT;
@@ -0,0 +1,13 @@
+-- TheWatcher - Stockage compressé des données de résultats
+--
+-- Ajoute les colonnes de stockage de SearchResult (voir utils/payload_store.py).
+-- Les lignes existantes restent en JSONB et sont lues telles quelles.
+--     psql "$DATABASE_URL" -f migrations/003_result_payload_storage.sql
+
+ALTER TABLE search_results
+    ADD COLUMN IF NOT EXISTS data_codec varchar(10),
+    ADD COLUMN IF NOT EXISTS data_compressed bytea,
+    ADD COLUMN IF NOT EXISTS data_ref varchar(100);
+
+-- Les données déjà compressées ne gagnent rien à la compression pglz de TOAST
+ALTER TABLE search_results ALTER COLUMN data_compressed SET STORAGE EXTERNAL;
@@ -0,0 +1,11 @@
+-- TheWatcher - Partitions par défaut
+--
+-- Les lignes hors des plages créées (tâche de maintenance interrompue) vont
+-- dans la partition par défaut au lieu de faire échouer l'insertion. Elles en
+-- sont retirées par `flask partitions` quand la partition de leur plage est
+-- créée (voir utils/partitions.py).
+--     psql "$DATABASE_URL" -f migrations/004_default_partitions.sql
+
+CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT;
+CREATE TABLE IF NOT EXISTS search_history_default PARTITION OF search_history DEFAULT;
+CREATE TABLE IF NOT EXISTS search_results_default PARTITION OF search_results DEFAULT;
@@ -6,23 +6,111 @@ TheWatcher - Modèles de base de données
 Ce module définit les modèles SQLAlchemy pour l'application
 """
 
+import os
 import json
+import time
 import uuid
 import datetime
+import threading
+from flask import g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, LargeBinary, insert
+from sqlalchemy.orm import relationship, deferred
 import bcrypt
 
+from utils.payload_store import encode_payload, decode_payload
+
+# Clé de la base réplique dans SQLALCHEMY_BINDS
+REPLICA_BIND = 'replica'
+
+class RoutingSession(Session):
+    """
+    Session qui envoie les lectures des routes en lecture seule vers la réplique
+    
+    Une route décorée par utils.db_routing.use_replica active la réplique pour
+    la requête courante. Les écritures (flush, INSERT/UPDATE/DELETE) et tout le
+    travail hors requête (threads d'arrière-plan, commandes) restent sur le
+    primaire.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and not getattr(clause, 'is_dml', False)
+            and has_request_context()
+            and g.get('db_use_replica', False)
+        ):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 # Initialiser SQLAlchemy
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# État du générateur d'UUID v7 (monotone au sein du processus)
+_uuid7_lock = threading.Lock()
+_uuid7_last = [0, 0]  # [timestamp en ms, compteur sur 12 bits]
+
+def uuid7():
+    """
+    Génère un UUID ordonné dans le temps (version 7, RFC 9562)
+    
+    Les 48 premiers bits contiennent l'horodatage Unix en millisecondes : les
+    nouvelles clés s'ajoutent en fin d'index B-tree au lieu d'être réparties
+    aléatoirement comme avec uuid4 (moins de divisions de pages, meilleure
+    localité du cache). Les 12 bits suivants servent de compteur pour garder
+    l'ordre entre des identifiants générés dans la même milliseconde.
+    Returns:
+        uuid.UUID: Identifiant
+    """
+    random_bits = int.from_bytes(os.urandom(10), 'big')
+    
+    with _uuid7_lock:
+        timestamp = time.time_ns() // 1_000_000
+        if timestamp > _uuid7_last[0]:
+            counter = random_bits >> 69  # Compteur initialisé sur 11 bits, marge pour l'incrémenter
+        else:
+            timestamp = _uuid7_last[0]
+            counter = _uuid7_last[1] + 1
+            if counter > 0xFFF:
+                # Compteur épuisé : avancer d'une milliseconde
+                timestamp += 1
+                counter = 0
+        _uuid7_last[0], _uuid7_last[1] = timestamp, counter
+    
+    value = (timestamp & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= random_bits & 0x3FFFFFFFFFFFFFFF
+    return uuid.UUID(int=value)
+
+def uuid7_datetime(value):
+    """
+    Retourne l'horodatage contenu dans un UUID v7
+    Args:
+        value: Identifiant (uuid.UUID)
+    Returns:
+        datetime.datetime: Date de génération (UTC, naïve comme created_at),
+            ou None si l'identifiant n'est pas un UUID v7 (ex: ancien uuid4)
+    """
+    if value.version != 7:
+        return None
+    return datetime.datetime.utcfromtimestamp((value.int >> 80) / 1000)
+
+# Écart toléré entre l'horodatage d'un UUID v7 et le created_at de sa ligne
+UUID7_CREATED_AT_MARGIN = datetime.timedelta(hours=1)
 
 class Base(db.Model):
     """Classe de base pour tous les modèles"""
     __abstract__ = True
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
@@ -97,6 +185,14 @@ class User(Base):
 class SearchHistory(Base):
     """Modèle pour l'historique des recherches"""
     __tablename__ = 'search_history'
+    __table_args__ = (
+        # Historique d'un utilisateur, du plus récent au plus ancien (pagination par curseur)
+        Index('ix_search_history_user_created_id', 'user_id', 'created_at', 'id'),
+        {'postgresql_partition_by': 'RANGE (created_at)'}
+    )
+    
+    # Clé de partitionnement, incluse dans la clé primaire (voir utils/partitions.py)
+    created_at = Column(DateTime, primary_key=True, default=datetime.datetime.utcnow)
     
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
     search_type = Column(String(20), nullable=False)  # 'name', 'photo', etc.
@@ -111,24 +207,58 @@ class SearchHistory(Base):
     
     # Relations
     user = relationship('User', back_populates='searches')
-    results = relationship('SearchResult', back_populates='search')
+    results = relationship(
+        'SearchResult',
+        primaryjoin='SearchHistory.id == foreign(SearchResult.search_id)',
+        back_populates='search'
+    )
+    
+    @classmethod
+    def find(cls, search_id):
+        """
+        Retrouve une recherche par son identifiant
+        
+        La clé primaire est (created_at, id) : un filtre sur id seul parcourt
+        toutes les partitions. L'horodatage d'un UUID v7 borne created_at et
+        limite la lecture à la partition de la recherche.
+        Args:
+            search_id: Identifiant de la recherche (chaîne ou uuid.UUID)
+        Returns:
+            SearchHistory: Recherche trouvée, ou None
+        """
+        try:
+            search_id = search_id if isinstance(search_id, uuid.UUID) else uuid.UUID(str(search_id))
+        except ValueError:
+            return None
+        
+        query = cls.query.filter(cls.id == search_id)
+        generated_at = uuid7_datetime(search_id)
+        if generated_at is not None:
+            query = query.filter(cls.created_at.between(
+                generated_at - UUID7_CREATED_AT_MARGIN,
+                generated_at + UUID7_CREATED_AT_MARGIN
+            ))
+        return query.first()
     
     @staticmethod
     def create_from_request(request, user=None, search_type='', search_term='', results_count=0, execution_time=0):
         """
         Crée un nouvel enregistrement d'historique à partir d'une requête HTTP
         """
+        from utils.request_context import get_request_context
+        
+        context = get_request_context()
         search = SearchHistory(
             user_id=user.id if user else None,
             search_type=search_type,
             search_term=search_term,
             ip_address=request.remote_addr,
             user_agent=request.user_agent.string,
-            consent_given=request.headers.get('X-Ethical-Consent', '').lower() == 'true',
-            use_case=request.headers.get('X-Use-Case', ''),
+            consent_given=context.consent,
+            use_case=context.use_case or '',
             results_count=results_count,
             execution_time=execution_time,
-            search_parameters=request.json or {}
+            search_parameters=context.json or {}
         )
         db.session.add(search)
         db.session.commit()
@@ -138,20 +268,85 @@ class SearchHistory(Base):
 class SearchResult(Base):
     """Modèle pour les résultats de recherche"""
     __tablename__ = 'search_results'
+    __table_args__ = (
+        Index('ix_search_results_search_id', 'search_id'),
+        {'postgresql_partition_by': 'RANGE (created_at)'}
+    )
+    
+    created_at = Column(DateTime, primary_key=True, default=datetime.datetime.utcnow)
     
-    search_id = Column(UUID(as_uuid=True), ForeignKey('search_history.id'), nullable=False)
+    # Pas de clé étrangère : la clé primaire de search_history inclut created_at
+    search_id = Column(UUID(as_uuid=True), nullable=False)
     result_type = Column(String(50))  # 'social_profile', 'image_match', etc.
     source = Column(String(100))  # 'facebook', 'linkedin', etc.
     confidence = Column(Integer)  # 0-100
-    data = Column(JSONB)
+    
+    # Données du résultat, chargées à la demande (voir utils/payload_store.py) :
+    # JSONB si elles sont petites, sinon compressées en base ou déposées dans le
+    # magasin de blobs
+    data = deferred(Column(JSONB), group='payload')
+    data_codec = deferred(Column(String(10)), group='payload')  # 'zstd', 'zlib' ou None
+    data_compressed = deferred(Column(LargeBinary), group='payload')
+    data_ref = deferred(Column(String(100)), group='payload')
     
     # Relations
-    search = relationship('SearchHistory', back_populates='results')
+    search = relationship(
+        'SearchHistory',
+        primaryjoin='foreign(SearchResult.search_id) == SearchHistory.id',
+        back_populates='results'
+    )
+    
+    @property
+    def payload(self):
+        """
+        Données du résultat, décompressées ou lues dans le magasin de blobs si besoin
+        """
+        return decode_payload(self.data, self.data_codec, self.data_compressed, self.data_ref)
+    
+    def to_item(self):
+        """
+        Convertit le résultat en élément {result_type, source, confidence, data}
+        """
+        return {
+            'result_type': self.result_type,
+            'source': self.source,
+            'confidence': self.confidence,
+            'data': self.payload
+        }
+    
+    @staticmethod
+    def bulk_create(search_id, items):
+        """
+        Insère les éléments de résultat d'une recherche en une seule instruction
+        
+        L'insertion passe par le Core SQLAlchemy (executemany, regroupé en un
+        INSERT multi-VALUES par le dialecte PostgreSQL) sans créer d'objets ORM.
+        Les données volumineuses sont compressées ou déposées dans le magasin
+        de blobs. La transaction est validée par l'appelant.
+        Args:
+            search_id: Identifiant de la recherche
+            items: Éléments {result_type, source, confidence, data}
+        Returns:
+            int: Nombre de lignes insérées
+        """
+        if not items:
+            return 0
+        
+        now = datetime.datetime.utcnow()
+        rows = [
+            dict(item, **encode_payload(item['data']), id=uuid7(), search_id=search_id, created_at=now, updated_at=now)
+            for item in items
+        ]
+        db.session.execute(insert(SearchResult), rows)
+        return len(rows)
 
 
 class AuditLog(Base):
     """Modèle pour les logs d'audit de sécurité"""
     __tablename__ = 'audit_logs'
+    __table_args__ = {'postgresql_partition_by': 'RANGE (created_at)'}
+    
+    created_at = Column(DateTime, primary_key=True, default=datetime.datetime.utcnow)
     
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id'), nullable=True)
     action = Column(String(50), nullable=False)
@@ -161,12 +356,40 @@ class AuditLog(Base):
     details = Column(JSONB)
     status = Column(String(10))  # 'success', 'failure', 'denied'
     
+    @staticmethod
+    def build_record(user_id=None, action='access', resource=None, ip_address=None, user_agent=None, details=None, status='success'):
+        """
+        Construit un enregistrement d'audit prêt à être inséré
+        
+        L'identifiant et l'horodatage sont fixés ici, au moment de l'événement,
+        et non lors de l'écriture différée en base.
+        """
+        now = datetime.datetime.utcnow()
+        return {
+            'id': uuid7(),
+            'created_at': now,
+            'updated_at': now,
+            'user_id': user_id,
+            'action': action,
+            'resource': resource,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'details': details,
+            'status': status
+        }
+    
     @staticmethod
     def create_from_request(request, action='access', resource=None, user=None, details=None, status='success'):
         """
         Crée un nouvel enregistrement d'audit à partir d'une requête HTTP
+        
+        L'enregistrement est placé dans la file d'audit et écrit par lots en
+        arrière-plan (voir utils/audit_queue.py).
         """
-        log = AuditLog(
+        from utils.audit_queue import audit_queue
+        from utils.request_context import get_request_context
+        
+        record = AuditLog.build_record(
             user_id=user.id if user else None,
             action=action,
             resource=resource or request.path,
@@ -175,10 +398,9 @@ class AuditLog(Base):
             details=details or {
                 'method': request.method,
                 'params': request.args.to_dict(),
-                'json': request.get_json(silent=True)
+                'json': get_request_context().json
             },
             status=status
         )
-        db.session.add(log)
-        db.session.commit()
-        return log
+        audit_queue.enqueue(record)
+        return record
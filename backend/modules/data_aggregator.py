@@ -8,18 +8,463 @@ Ce module combine les différentes sources de données et génère des rapports
 
 import os
 import json
+import math
+import base64
 import logging
 import datetime
-import networkx as nx
-import matplotlib.pyplot as plt
-from PIL import Image, ImageDraw, ImageFont
+import tempfile
+import threading
 from io import BytesIO
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from config import active_config
+from utils.urls import canonicalize_url, merge_duplicate
+from utils.entity_extraction import extract_locations, extract_organizations, load_model
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
 
+# Couleurs des nœuds du graphe de relations selon leur type
+GRAPH_NODE_COLORS = {
+    'person': 'red',
+    'profile': 'blue',
+    'username': 'green',
+    'email': 'purple',
+    'organization': 'orange',
+    'location': 'yellow'
+}
+
+# Types MIME des formats de graphe supportés
+GRAPH_MIME_TYPES = {
+    'svg': 'image/svg+xml',
+    'png': 'image/png'
+}
+
+# Nombre maximum d'images affichées dans un rapport
+REPORT_MAX_IMAGES = 12
+
+# Répertoire des modèles HTML
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+# Environnement Jinja partagé : chaque modèle est compilé une seule fois par processus
+_template_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(['html']),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False
+)
+
+def _get_report_template():
+    """
+    Retourne le modèle de rapport compilé (mis en cache par l'environnement Jinja)
+    """
+    return _template_env.get_template('report.html')
+
+def preload_models():
+    """
+    Compile le modèle de rapport, charge matplotlib et le modèle NLP avant le fork des workers
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    _get_report_template()
+    load_model()
+    logger.info("Modèle de rapport et moteur de rendu préchargés")
+
+# Champs de provenance, exclus de la clé d'un élément sans URL
+PROVENANCE_KEYS = ('source', 'sources')
+
+def _item_key(item):
+    """
+    Clé de dédoublonnage d'un élément : URL canonique, à défaut son contenu
+    hors provenance (la même clé avant et après l'ajout de `sources`, donc
+    dans add() comme dans merge())
+    """
+    canonical = canonicalize_url(item.get('url'))
+    if canonical is not None:
+        return canonical
+    content = {key: value for key, value in item.items() if key not in PROVENANCE_KEYS}
+    return 'raw:' + json.dumps(content, sort_keys=True, default=str)
+
+class IncrementalAggregator:
+    """
+    État d'agrégation incrémental des données d'une personne
+
+    Les résultats partiels sont ajoutés au fil de l'eau avec add(), par
+    exemple dès qu'un moteur de recherche d'images a répondu, et snapshot()
+    renvoie à tout moment l'agrégat à jour. L'état ne contient que des
+    ensembles et des éléments indexés par clé (URL canonique, adresse email),
+    fusionnés champ par champ sans dépendre de l'ordre d'arrivée, et il est
+    sérialisé trié par clé : des états construits séparément, par exemple dans
+    plusieurs workers, se fusionnent avec merge() dans n'importe quel ordre et
+    donnent le même agrégat que si tous les résultats avaient été ajoutés au
+    même endroit.
+    """
+    
+    # Sources acceptées par add()
+    SOURCES = ('social_media', 'image_search', 'email_search')
+    
+    def __init__(self, name):
+        """
+        Initialise un état vide
+        Args:
+            name: Nom de la personne
+        """
+        self.name = name
+        self.updated_at = datetime.datetime.now().isoformat()
+        
+        # Dictionnaires utilisés comme ensembles (triés par clé à la sérialisation)
+        self._sources = {}
+        self._profiles = {}  # plateforme -> {clé: profil}
+        self._images = {}  # clé -> image
+        self._emails = {}  # adresse en minuscules -> email
+        self._locations = {}  # lieu en minuscules -> lieu
+        self._usernames = {}
+        self._aliases = {}
+        self._related_people = {}
+        self._organizations = {}
+        
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot = None
+        self._snapshot_version = -1
+    
+    def add(self, source, partial_result):
+        """
+        Ajoute un résultat partiel à l'agrégat
+        Args:
+            source: 'social_media', 'image_search' ou 'email_search'
+            partial_result: Données de la source, au format de aggregate_person_data
+                (par exemple {'yandex': {...}} pour un seul moteur d'images)
+        Returns:
+            IncrementalAggregator: L'agrégateur lui-même
+        """
+        if not partial_result:
+            return self
+        
+        if source not in self.SOURCES:
+            raise ValueError(f"Source d'agrégation inconnue: {source}")
+        
+        # Analyse NLP par lots, hors verrou : les autres ajouts ne l'attendent pas
+        try:
+            entities = self._extract_entities(source, partial_result)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'extraction des entités ({source}): {str(e)}")
+            entities = []
+        
+        with self._lock:
+            try:
+                self._sources[source] = True
+                if source == 'social_media':
+                    self._add_social(partial_result)
+                    for location in entities:
+                        self._put_location(location)
+                elif source == 'image_search':
+                    self._add_images(partial_result)
+                    for organization in entities:
+                        self._organizations[organization] = True
+                else:
+                    self._add_emails(partial_result)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'ajout d'un résultat partiel ({source}): {str(e)}")
+            
+            self._touch()
+        return self
+    
+    def merge(self, other):
+        """
+        Fusionne un autre état d'agrégation dans celui-ci
+        Args:
+            other: IncrementalAggregator, ou état sérialisé par to_dict
+        Returns:
+            IncrementalAggregator: L'agrégateur lui-même
+        """
+        if isinstance(other, IncrementalAggregator):
+            other = other.to_dict()
+        
+        with self._lock:
+            self._merge_state(other)
+        return self
+    
+    def snapshot(self):
+        """
+        Retourne l'agrégat à jour, au format de aggregate_person_data
+        
+        L'agrégat n'est recalculé que si des résultats ont été ajoutés depuis
+        le dernier appel.
+        Returns:
+            dict: Données agrégées
+        """
+        with self._lock:
+            if self._snapshot_version != self._version:
+                state = self._state()
+                aggregated_data = {
+                    'name': self.name,
+                    'updated_at': self.updated_at,
+                    'social_profiles': state['social_profiles'],
+                    'images': state['images'],
+                    'emails': state['emails'],
+                    'locations': state['locations'],
+                    'possible_usernames': state['possible_usernames'],
+                    'possible_aliases': state['possible_aliases'],
+                    'related_people': state['related_people'],
+                    'organizations': state['organizations'],
+                    'metadata': {
+                        'sources': state['sources'],
+                        'confidence': self._confidence(state)
+                    }
+                }
+                self._snapshot = aggregated_data
+                self._snapshot_version = self._version
+            
+            # Copie de surface : l'appelant peut remplacer des clés sans altérer le cache
+            return dict(self._snapshot, metadata=dict(self._snapshot['metadata']))
+    
+    def to_dict(self):
+        """
+        Sérialise l'état (JSON) pour le transmettre à un autre worker
+        Returns:
+            dict: État sérialisable
+        """
+        with self._lock:
+            return dict(self._state(), name=self.name, updated_at=self.updated_at)
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reconstruit un état sérialisé par to_dict
+        Args:
+            data: État sérialisé
+        Returns:
+            IncrementalAggregator: État reconstruit
+        """
+        aggregator = cls(data.get('name'))
+        aggregator.updated_at = ''
+        aggregator._merge_state(data)
+        return aggregator
+    
+    def _merge_state(self, state):
+        """
+        Fusionne un état sérialisé (verrou tenu)
+        """
+        for source in state.get('sources', []):
+            self._sources[source] = True
+        for platform, profiles in state.get('social_profiles', {}).items():
+            entries = self._profiles.setdefault(platform, {})
+            for profile in profiles:
+                self._put(entries, _item_key(profile), profile)
+        for image in state.get('images', []):
+            self._put(self._images, _item_key(image), image)
+        for email in state.get('emails', []):
+            self._put_email(email)
+        for location in state.get('locations', []):
+            self._put_location(location)
+        for key, values in (
+            ('possible_usernames', self._usernames),
+            ('possible_aliases', self._aliases),
+            ('related_people', self._related_people),
+            ('organizations', self._organizations)
+        ):
+            for value in state.get(key, []):
+                values[value] = True
+        
+        self.updated_at = max(self.updated_at, state.get('updated_at') or '')
+        self._version += 1
+    
+    def _touch(self):
+        """
+        Marque l'état comme modifié (verrou tenu)
+        """
+        self.updated_at = datetime.datetime.now().isoformat()
+        self._version += 1
+    
+    def _put(self, entries, key, item):
+        """
+        Ajoute un élément ou le fusionne avec celui de même clé (verrou tenu)
+        """
+        entry = entries.get(key)
+        if entry is None:
+            entry = dict(item)
+            entry['sources'] = sorted(set(item.get('sources') or ([item['source']] if item.get('source') else [])))
+            entries[key] = entry
+        else:
+            merge_duplicate(entry, item)
+    
+    def _put_email(self, email):
+        """
+        Ajoute un email ; une adresse trouvée plusieurs fois garde sa meilleure
+        confiance et, pour les autres champs, la plus petite valeur (verrou tenu)
+        """
+        address = email['address'].strip().lower()
+        known = self._emails.get(address)
+        if known is None:
+            self._emails[address] = dict(email)
+        else:
+            confidence = max(known.get('confidence') or 0, email.get('confidence') or 0)
+            for key, value in email.items():
+                if key != 'confidence' and (key not in known or str(value) < str(known[key])):
+                    known[key] = value
+            known['confidence'] = confidence
+    
+    def _put_location(self, location):
+        """
+        Ajoute un lieu ; parmi les graphies d'un même lieu, la plus petite est retenue (verrou tenu)
+        """
+        key = location.strip().lower()
+        known = self._locations.get(key)
+        if known is None or location < known:
+            self._locations[key] = location
+    
+    def _extract_entities(self, source, partial_result):
+        """
+        Extrait en un seul lot les lieux des descriptions de profils ou les
+        organisations des titres de sites associés
+        Returns:
+            list: Lieux (social_media) ou organisations (image_search)
+        """
+        if source == 'social_media':
+            descriptions = [
+                profile['description']
+                for profiles in partial_result.get('profiles', {}).values()
+                for profile in profiles
+                if isinstance(profile, dict) and profile.get('description')
+            ]
+            batches = extract_locations(descriptions)
+        elif source == 'image_search':
+            titles = [
+                website['title']
+                for search_engine, results in partial_result.items()
+                if search_engine in ['google', 'yandex']
+                for website in results.get('websites', [])
+                if website.get('title')
+            ]
+            batches = extract_organizations(titles)
+        else:
+            return []
+        
+        return [entity for entities in batches for entity in entities]
+    
+    def _add_social(self, social_data):
+        """
+        Ajoute des profils sociaux par plateforme, dédoublonnés par URL canonique
+        """
+        for platform, profiles in social_data.get('profiles', {}).items():
+            entries = self._profiles.setdefault(platform, {})
+            
+            for profile in profiles:
+                if not isinstance(profile, dict):
+                    continue
+                self._put(entries, _item_key(profile), dict(profile, source=profile.get('source', platform)))
+                
+                # Extraire des noms d'utilisateur possibles à partir des URLs
+                url = profile.get('url', '') or ''
+                if platform == 'twitter' and 'twitter.com/' in url:
+                    username = url.split('twitter.com/')[1].split('/')[0].split('?')[0]
+                    self._usernames[username] = True
+                elif platform == 'instagram' and 'instagram.com/' in url:
+                    username = url.split('instagram.com/')[1].split('/')[0].split('?')[0]
+                    self._usernames[username] = True
+    
+    def _add_images(self, image_data):
+        """
+        Ajoute les résultats d'un ou plusieurs moteurs de recherche d'images
+        """
+        for search_engine, results in image_data.items():
+            if search_engine == 'google_api' and 'web_entities' in results:
+                # Ajouter les entités reconnues par Google Vision
+                for entity in results.get('web_entities', []):
+                    description = entity.get('description', '')
+                    score = entity.get('score', 0)
+                    
+                    if score > 0.7:  # Haute confiance
+                        if any(word in description.lower() for word in ['person', 'people', 'celebrity']):
+                            # C'est probablement un nom de personne
+                            if description.lower() != self.name.lower():
+                                self._aliases[description] = True
+                        elif any(word in description.lower() for word in ['company', 'corporation', 'organization']):
+                            # C'est probablement une organisation
+                            self._organizations[description] = True
+            
+            # Ajouter les images trouvées (fusionnées entre moteurs par URL canonique)
+            if search_engine in ['google', 'yandex', 'tineye'] and 'similar_images' in results:
+                for image in results.get('similar_images', []):
+                    if isinstance(image, dict) and 'url' in image:
+                        image = {
+                            'url': image['url'],
+                            'source': search_engine,
+                            'page_url': image.get('page_url', None)
+                        }
+                        self._put(self._images, _item_key(image), image)
+            
+            # Ajouter le meilleur guess de Google
+            if search_engine == 'google' and 'best_guess' in results:
+                best_guess = results.get('best_guess')
+                if best_guess and best_guess.lower() != self.name.lower():
+                    self._aliases[best_guess] = True
+    
+    def _add_emails(self, email_data):
+        """
+        Ajoute les emails trouvés et l'organisation associée
+        """
+        for email in email_data.get('emails', []):
+            if isinstance(email, dict) and 'value' in email:
+                self._put_email({
+                    'address': email['value'],
+                    'confidence': email.get('confidence', 0),
+                    'source': 'hunter.io'
+                })
+                
+                # Extraire le nom d'utilisateur de l'email
+                self._usernames[email['value'].split('@')[0]] = True
+        
+        # Ajouter l'organisation si disponible
+        if email_data.get('organization'):
+            self._organizations[email_data['organization']] = True
+    
+    def _state(self):
+        """
+        Copie de l'état sous forme de listes triées par clé (verrou tenu)
+        """
+        return {
+            'sources': sorted(self._sources),
+            'social_profiles': {
+                platform: [dict(profile, sources=list(profile['sources'])) for _, profile in sorted(self._profiles[platform].items())]
+                for platform in sorted(self._profiles)
+            },
+            'images': [dict(image, sources=list(image['sources'])) for _, image in sorted(self._images.items())],
+            'emails': [dict(email) for _, email in sorted(self._emails.items())],
+            'locations': [location for _, location in sorted(self._locations.items())],
+            'possible_usernames': sorted(self._usernames),
+            'possible_aliases': sorted(self._aliases),
+            'related_people': sorted(self._related_people),
+            'organizations': sorted(self._organizations)
+        }
+    
+    @staticmethod
+    def _confidence(state):
+        """
+        Calcule le score de confiance global d'un état
+        """
+        confidence = 0
+        if state['social_profiles']:
+            confidence += 20 * min(len(state['social_profiles']), 5) / 5  # Max 20 points pour les profils sociaux
+        
+        if state['images']:
+            confidence += 15 * min(len(state['images']), 10) / 10  # Max 15 points pour les images
+        
+        if state['emails']:
+            confidence += 25 * min(len(state['emails']), 3) / 3  # Max 25 points pour les emails
+        
+        if state['locations']:
+            confidence += 15 * min(len(state['locations']), 3) / 3  # Max 15 points pour les localisations
+        
+        if state['possible_usernames']:
+            confidence += 15 * min(len(state['possible_usernames']), 5) / 5  # Max 15 points pour les usernames
+        
+        if state['organizations']:
+            confidence += 10 * min(len(state['organizations']), 3) / 3  # Max 10 points pour les organisations
+        
+        return min(round(confidence), 100)
+
 class DataAggregator:
     """Classe pour l'agrégation et l'analyse des données OSINT"""
     
@@ -30,6 +475,8 @@ class DataAggregator:
             config: Configuration à utiliser (par défaut: active_config)
         """
         self.config = config or active_config
+        self.graph_format = self.config.REPORT_GRAPH_FORMAT
+        self.graph_dpi = self.config.REPORT_GRAPH_DPI
         
         # Créer le répertoire de sortie pour les rapports
         self.reports_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'reports')
@@ -47,154 +494,11 @@ class DataAggregator:
             dict: Données agrégées
         """
         try:
-            # Initialiser le dictionnaire de résultats
-            aggregated_data = {
-                'name': name,
-                'updated_at': datetime.datetime.now().isoformat(),
-                'social_profiles': {},
-                'images': [],
-                'emails': [],
-                'locations': [],
-                'possible_usernames': set(),
-                'possible_aliases': set(),
-                'related_people': set(),
-                'organizations': set(),
-                'metadata': {
-                    'sources': [],
-                    'confidence': 0
-                }
-            }
-            
-            # Ajouter les données sociales
-            if social_data:
-                aggregated_data['metadata']['sources'].append('social_media')
-                
-                # Ajouter les profils sociaux par plateforme
-                for platform, profiles in social_data.get('profiles', {}).items():
-                    if not platform in aggregated_data['social_profiles']:
-                        aggregated_data['social_profiles'][platform] = []
-                    
-                    aggregated_data['social_profiles'][platform].extend(profiles)
-                    
-                    # Extraire des noms d'utilisateur possibles à partir des URLs
-                    for profile in profiles:
-                        url = profile.get('url', '')
-                        if platform == 'twitter' and 'twitter.com/' in url:
-                            username = url.split('twitter.com/')[1].split('/')[0].split('?')[0]
-                            aggregated_data['possible_usernames'].add(username)
-                        elif platform == 'instagram' and 'instagram.com/' in url:
-                            username = url.split('instagram.com/')[1].split('/')[0].split('?')[0]
-                            aggregated_data['possible_usernames'].add(username)
-                        
-                        # Extraire des lieux possibles à partir des descriptions
-                        description = profile.get('description', '')
-                        if description:
-                            # Analyse simpliste - une analyse NLP serait meilleure ici
-                            keywords = ['à', 'in', 'from', 'located', 'based']
-                            for keyword in keywords:
-                                if f" {keyword} " in f" {description} ":
-                                    parts = description.split(f" {keyword} ")
-                                    if len(parts) > 1:
-                                        location_part = parts[1].split('.')[0].split(',')[0].strip()
-                                        if len(location_part) > 2 and len(location_part) < 30:
-                                            aggregated_data['locations'].append(location_part)
-            
-            # Ajouter les données d'image
-            if image_data:
-                aggregated_data['metadata']['sources'].append('image_search')
-                
-                # Ajouter les résultats de recherche d'images
-                for search_engine, results in image_data.items():
-                    if search_engine == 'google_api' and 'web_entities' in results:
-                        # Ajouter les entités reconnues par Google Vision
-                        for entity in results.get('web_entities', []):
-                            description = entity.get('description', '')
-                            score = entity.get('score', 0)
-                            
-                            if score > 0.7:  # Haute confiance
-                                if any(word in description.lower() for word in ['person', 'people', 'celebrity']):
-                                    # C'est probablement un nom de personne
-                                    if description.lower() != name.lower():
-                                        aggregated_data['possible_aliases'].add(description)
-                                elif any(word in description.lower() for word in ['company', 'corporation', 'organization']):
-                                    # C'est probablement une organisation
-                                    aggregated_data['organizations'].add(description)
-                    
-                    # Ajouter les images trouvées
-                    if search_engine in ['google', 'yandex', 'tineye'] and 'similar_images' in results:
-                        for image in results.get('similar_images', []):
-                            if isinstance(image, dict) and 'url' in image:
-                                aggregated_data['images'].append({
-                                    'url': image['url'],
-                                    'source': search_engine,
-                                    'page_url': image.get('page_url', None)
-                                })
-                    
-                    # Ajouter le meilleur guess de Google
-                    if search_engine == 'google' and 'best_guess' in results:
-                        best_guess = results.get('best_guess')
-                        if best_guess and best_guess.lower() != name.lower():
-                            aggregated_data['possible_aliases'].add(best_guess)
-                    
-                    # Ajouter les sites web associés
-                    if search_engine in ['google', 'yandex'] and 'websites' in results:
-                        for website in results.get('websites', []):
-                            # Analyser le titre et la description pour trouver des organisations
-                            if 'title' in website:
-                                title = website.get('title', '')
-                                if any(word in title.lower() for word in ['company', 'inc', 'ltd', 'corporation', 'corp', 'group']):
-                                    aggregated_data['organizations'].add(title)
-            
-            # Ajouter les données d'email
-            if email_data:
-                aggregated_data['metadata']['sources'].append('email_search')
-                
-                # Ajouter les emails trouvés
-                if 'emails' in email_data:
-                    for email in email_data.get('emails', []):
-                        if isinstance(email, dict) and 'value' in email:
-                            email_obj = {
-                                'address': email['value'],
-                                'confidence': email.get('confidence', 0),
-                                'source': 'hunter.io'
-                            }
-                            aggregated_data['emails'].append(email_obj)
-                            
-                            # Extraire le nom d'utilisateur de l'email
-                            username = email['value'].split('@')[0]
-                            aggregated_data['possible_usernames'].add(username)
-                
-                # Ajouter l'organisation si disponible
-                if 'organization' in email_data and email_data['organization']:
-                    aggregated_data['organizations'].add(email_data['organization'])
-            
-            # Convertir les ensembles en listes
-            aggregated_data['possible_usernames'] = list(aggregated_data['possible_usernames'])
-            aggregated_data['possible_aliases'] = list(aggregated_data['possible_aliases'])
-            aggregated_data['related_people'] = list(aggregated_data['related_people'])
-            aggregated_data['organizations'] = list(aggregated_data['organizations'])
-            
-            # Calculer un score de confiance global
-            confidence = 0
-            if aggregated_data['social_profiles']:
-                confidence += 20 * min(len(aggregated_data['social_profiles']), 5) / 5  # Max 20 points pour les profils sociaux
-            
-            if aggregated_data['images']:
-                confidence += 15 * min(len(aggregated_data['images']), 10) / 10  # Max 15 points pour les images
-            
-            if aggregated_data['emails']:
-                confidence += 25 * min(len(aggregated_data['emails']), 3) / 3  # Max 25 points pour les emails
-            
-            if aggregated_data['locations']:
-                confidence += 15 * min(len(aggregated_data['locations']), 3) / 3  # Max 15 points pour les localisations
-            
-            if aggregated_data['possible_usernames']:
-                confidence += 15 * min(len(aggregated_data['possible_usernames']), 5) / 5  # Max 15 points pour les usernames
-            
-            if aggregated_data['organizations']:
-                confidence += 10 * min(len(aggregated_data['organizations']), 3) / 3  # Max 10 points pour les organisations
-            
-            aggregated_data['metadata']['confidence'] = min(round(confidence), 100)
+            aggregator = IncrementalAggregator(name)
+            aggregator.add('social_media', social_data)
+            aggregator.add('image_search', image_data)
+            aggregator.add('email_search', email_data)
+            aggregated_data = aggregator.snapshot()
             
             logger.info(f"Agrégation des données pour '{name}' terminée avec un score de confiance de {aggregated_data['metadata']['confidence']}%")
             return aggregated_data
@@ -210,83 +514,109 @@ class DataAggregator:
                 }
             }
     
-    def generate_network_graph(self, person_data):
+    def _collect_graph_nodes(self, person_data):
+        """
+        Liste les nœuds périphériques du graphe (le nœud central est la personne)
+        Args:
+            person_data: Données agrégées d'une personne
+        Returns:
+            list: Liste de tuples (identifiant, libellé, couleur), sans doublons
+        """
+        nodes = {}
+        
+        # Ajouter les profils sociaux
+        for platform, profiles in person_data.get('social_profiles', {}).items():
+            for i, profile in enumerate(profiles):
+                nodes[f"{platform}_{i}"] = (profile.get('name', platform), GRAPH_NODE_COLORS['profile'])
+        
+        # Ajouter les noms d'utilisateur possibles
+        for username in person_data.get('possible_usernames', []):
+            nodes[username] = (username, GRAPH_NODE_COLORS['username'])
+        
+        # Ajouter les emails
+        for email in person_data.get('emails', []):
+            email_address = email.get('address', '')
+            if email_address:
+                nodes[email_address] = (email_address, GRAPH_NODE_COLORS['email'])
+        
+        # Ajouter les organisations
+        for org in person_data.get('organizations', []):
+            nodes[org] = (org, GRAPH_NODE_COLORS['organization'])
+        
+        # Ajouter les localisations
+        for location in person_data.get('locations', []):
+            nodes[location] = (location, GRAPH_NODE_COLORS['location'])
+        
+        # Le nœud central ne doit pas apparaître en périphérie
+        nodes.pop(person_data['name'], None)
+        
+        return [(node_id, label, color) for node_id, (label, color) in nodes.items()]
+    
+    def generate_network_graph(self, person_data, output_format=None):
         """
         Génère un graphe de réseau pour visualiser les relations
+        
+        Le graphe est toujours une étoile centrée sur la personne : les nœuds
+        sont placés sur un cercle (disposition radiale déterministe) au lieu
+        d'une simulation de forces. Le rendu utilise une figure Agg locale,
+        sans l'état global de pyplot, et peut donc être appelé depuis
+        plusieurs threads.
         Args:
             person_data: Données agrégées d'une personne
+            output_format: 'svg' ou 'png' (par défaut: REPORT_GRAPH_FORMAT)
         Returns:
             BytesIO: Objet contenant l'image du graphe
         """
         try:
-            # Créer un graphe dirigé
-            G = nx.DiGraph()
-            
-            # Ajouter le nœud principal
-            G.add_node(person_data['name'], type='person', color='red')
-            
-            # Ajouter les profils sociaux
-            for platform, profiles in person_data.get('social_profiles', {}).items():
-                for i, profile in enumerate(profiles):
-                    node_id = f"{platform}_{i}"
-                    G.add_node(node_id, label=profile.get('name', platform), type='profile', color='blue')
-                    G.add_edge(person_data['name'], node_id)
-            
-            # Ajouter les noms d'utilisateur possibles
-            for username in person_data.get('possible_usernames', []):
-                G.add_node(username, type='username', color='green')
-                G.add_edge(person_data['name'], username)
-            
-            # Ajouter les emails
-            for email in person_data.get('emails', []):
-                email_address = email.get('address', '')
-                if email_address:
-                    G.add_node(email_address, type='email', color='purple')
-                    G.add_edge(person_data['name'], email_address)
-            
-            # Ajouter les organisations
-            for org in person_data.get('organizations', []):
-                G.add_node(org, type='organization', color='orange')
-                G.add_edge(person_data['name'], org)
-            
-            # Ajouter les localisations
-            for location in person_data.get('locations', []):
-                G.add_node(location, type='location', color='yellow')
-                G.add_edge(person_data['name'], location)
-            
-            # Créer l'image
-            plt.figure(figsize=(12, 8))
-            
-            # Positions des nœuds
-            pos = nx.spring_layout(G)
+            # Import différé : matplotlib n'est chargé que lorsqu'un graphe est demandé
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.collections import LineCollection
+            
+            output_format = output_format or self.graph_format
+            nodes = self._collect_graph_nodes(person_data)
+            
+            # Disposition radiale : la personne au centre, les autres nœuds sur le cercle
+            count = max(len(nodes), 1)
+            positions = [
+                (math.cos(2 * math.pi * i / count), math.sin(2 * math.pi * i / count))
+                for i in range(len(nodes))
+            ]
+            
+            # Créer une figure indépendante de pyplot
+            fig = Figure(figsize=(12, 8))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot(111)
+            
+            # Dessiner les liens en une seule collection
+            ax.add_collection(LineCollection(
+                [[(0, 0), position] for position in positions],
+                colors='black', linewidths=1.0, alpha=0.5, zorder=1
+            ))
             
             # Dessiner les nœuds avec des couleurs différentes selon le type
-            node_colors = [G.nodes[n].get('color', 'gray') for n in G.nodes()]
-            nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=500, alpha=0.8)
-            
-            # Dessiner les liens
-            nx.draw_networkx_edges(G, pos, width=1.0, alpha=0.5)
+            xs = [0] + [x for x, _ in positions]
+            ys = [0] + [y for _, y in positions]
+            colors = [GRAPH_NODE_COLORS['person']] + [color for _, _, color in nodes]
+            ax.scatter(xs, ys, c=colors, s=500, alpha=0.8, zorder=2)
             
             # Ajouter les labels
-            labels = {}
-            for n in G.nodes():
-                if G.nodes[n].get('type') == 'profile':
-                    labels[n] = G.nodes[n].get('label', n)
-                else:
-                    labels[n] = n
-            nx.draw_networkx_labels(G, pos, labels, font_size=10, font_family='sans-serif')
+            labels = [person_data['name']] + [label for _, label, _ in nodes]
+            for label, x, y in zip(labels, xs, ys):
+                ax.text(x, y, label, fontsize=10, family='sans-serif', ha='center', va='center', zorder=3)
             
             # Ajouter un titre
-            plt.title(f"Réseau de relations pour {person_data['name']}")
+            ax.set_title(f"Réseau de relations pour {person_data['name']}")
             
             # Enlever les axes
-            plt.axis('off')
+            ax.set_xlim(-1.3, 1.3)
+            ax.set_ylim(-1.3, 1.3)
+            ax.set_axis_off()
             
             # Sauvegarder l'image dans un buffer
             img_buf = BytesIO()
-            plt.savefig(img_buf, format='png', dpi=300, bbox_inches='tight')
+            fig.savefig(img_buf, format=output_format, dpi=self.graph_dpi, bbox_inches='tight')
             img_buf.seek(0)
-            plt.close()
             
             return img_buf
         
@@ -294,264 +624,98 @@ class DataAggregator:
             logger.error(f"Erreur lors de la génération du graphe: {str(e)}")
             return None
     
-    def generate_report(self, person_data, include_graph=True):
+    def new_report_path(self, person_data):
         """
-        Génère un rapport complet en format HTML
+        Construit le chemin d'un nouveau fichier de rapport
         Args:
             person_data: Données agrégées d'une personne
-            include_graph: Inclure un graphe de réseau
         Returns:
-            str: Rapport au format HTML
+            str: Chemin du fichier de rapport
         """
-        try:
-            # Nom sécurisé pour le fichier
-            safe_name = ''.join(c if c.isalnum() else '_' for c in person_data['name'])
-            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-            report_file = os.path.join(self.reports_dir, f"{safe_name}_{timestamp}.html")
-            
-            # Générer le graphe si demandé
-            graph_data = None
-            if include_graph:
-                graph_buf = self.generate_network_graph(person_data)
-                if graph_buf:
-                    graph_data = base64.b64encode(graph_buf.getvalue()).decode('utf-8')
-            
-            # Générer le HTML
-            html = f"""<!DOCTYPE html>
-<html lang="fr">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Rapport OSINT: {person_data['name']}</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            color: #333;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-        header {{
-            background-color: #2c3e50;
-            color: white;
-            padding: 20px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-        }}
-        h1, h2, h3 {{
-            margin-top: 0;
-        }}
-        .confidence {{
-            float: right;
-            background-color: {'#4CAF50' if person_data['metadata']['confidence'] > 70 else '#FF9800' if person_data['metadata']['confidence'] > 40 else '#F44336'};
-            color: white;
-            padding: 5px 10px;
-            border-radius: 3px;
-        }}
-        .section {{
-            background-color: #f9f9f9;
-            padding: 15px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .profile {{
-            margin-bottom: 10px;
-            padding-bottom: 10px;
-            border-bottom: 1px solid #ddd;
-        }}
-        .profile:last-child {{
-            border-bottom: none;
-        }}
-        .email {{
-            margin-bottom: 5px;
-        }}
-        .network-graph {{
-            text-align: center;
-            margin-top: 20px;
-        }}
-        .timestamp {{
-            text-align: right;
-            font-style: italic;
-            color: #888;
-            font-size: 0.8em;
-            margin-top: 30px;
-        }}
-        footer {{
-            margin-top: 30px;
-            text-align: center;
-            font-size: 0.8em;
-            color: #888;
-        }}
-        .legal-notice {{
-            background-color: #f8f8f8;
-            border-left: 4px solid #ccc;
-            padding: 10px;
-            font-size: 0.9em;
-            margin-top: 20px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>Rapport OSINT</h1>
-            <div class="confidence">Niveau de confiance: {person_data['metadata']['confidence']}%</div>
-        </header>
-        
-        <section class="section">
-            <h2>Informations sur la personne</h2>
-            <p><strong>Nom:</strong> {person_data['name']}</p>
-            
-            {f'<p><strong>Alias possibles:</strong> {", ".join(person_data.get("possible_aliases", []))}</p>' if person_data.get('possible_aliases') else ''}
-            
-            {f'<p><strong>Noms d\'utilisateur possibles:</strong> {", ".join(person_data.get("possible_usernames", []))}</p>' if person_data.get('possible_usernames') else ''}
-            
-            {f'<p><strong>Localisations:</strong> {", ".join(person_data.get("locations", []))}</p>' if person_data.get('locations') else ''}
-            
-            {f'<p><strong>Organisations:</strong> {", ".join(person_data.get("organizations", []))}</p>' if person_data.get('organizations') else ''}
-        </section>
-        
-        <section class="section">
-            <h2>Profils sur les réseaux sociaux</h2>
-            
-            {self._generate_social_profiles_html(person_data.get('social_profiles', {}))}
-        </section>
-        
-        <section class="section">
-            <h2>Adresses Email</h2>
-            
-            {self._generate_emails_html(person_data.get('emails', []))}
-        </section>
-        
-        <section class="section">
-            <h2>Images associées</h2>
-            
-            {self._generate_images_html(person_data.get('images', []))}
-        </section>
-        
-        {f'''<section class="section">
-            <h2>Graphe de relations</h2>
-            <div class="network-graph">
-                <img src="data:image/png;base64,{graph_data}" alt="Graphe de relations" style="max-width:100%;">
-            </div>
-        </section>''' if graph_data else ''}
-        
-        <div class="timestamp">
-            Rapport généré le {datetime.datetime.now().strftime('%d/%m/%Y à %H:%M:%S')}
-        </div>
-        
-        <div class="legal-notice">
-            <p><strong>Notice légale:</strong> Ce rapport est généré à des fins d'information dans le cadre légal applicable. 
-            L'utilisation de ces informations doit respecter les lois sur la protection des données (RGPD, CCPA, etc.) 
-            et ne doit pas porter atteinte à la vie privée des personnes concernées.</p>
-        </div>
-        
-        <footer>
-            <p>Généré par TheWatcher - Outil OSINT Éthique</p>
-        </footer>
-    </div>
-</body>
-</html>
-"""
-            
-            # Sauvegarder le rapport
-            with open(report_file, 'w', encoding='utf-8') as f:
-                f.write(html)
-            
-            logger.info(f"Rapport généré avec succès: {report_file}")
-            return html, report_file
-        
-        except Exception as e:
-            logger.error(f"Erreur lors de la génération du rapport: {str(e)}")
-            return f"<html><body><h1>Erreur</h1><p>{str(e)}</p></body></html>", None
+        # Nom sécurisé pour le fichier
+        safe_name = ''.join(c if c.isalnum() else '_' for c in person_data['name'])
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        return os.path.join(self.reports_dir, f"{safe_name}_{timestamp}.html")
     
-    def _generate_social_profiles_html(self, social_profiles):
+    def _graph_data_uri(self, person_data):
         """
-        Génère le HTML pour la section des profils sociaux
+        Génère le graphe de relations sous forme d'URI data: intégrable au rapport
         Args:
-            social_profiles: Dictionnaire des profils par plateforme
+            person_data: Données agrégées d'une personne
         Returns:
-            str: HTML généré
+            str: URI data: du graphe, ou None en cas d'échec
         """
-        if not social_profiles:
-            return "<p>Aucun profil social trouvé.</p>"
-        
-        html = ""
-        
-        for platform, profiles in social_profiles.items():
-            html += f"<h3>{platform.capitalize()}</h3>"
-            
-            if not profiles:
-                html += "<p>Aucun profil trouvé.</p>"
-                continue
-            
-            for profile in profiles:
-                html += f"""<div class="profile">
-                    <p><strong>{profile.get('name', 'N/A')}</strong></p>
-                    <p><a href="{profile.get('url', '#')}" target="_blank">{profile.get('url', 'N/A')}</a></p>
-                    {f'<p>{profile.get("description", "")}</p>' if profile.get('description') else ''}
-                </div>"""
+        graph_buf = self.generate_network_graph(person_data)
+        if not graph_buf:
+            return None
         
-        return html
+        graph_mime = GRAPH_MIME_TYPES.get(self.graph_format, 'image/png')
+        return f"data:{graph_mime};base64,{base64.b64encode(graph_buf.getvalue()).decode('utf-8')}"
     
-    def _generate_emails_html(self, emails):
+    def stream_report(self, person_data, include_graph=True, report_file=None):
         """
-        Génère le HTML pour la section des emails
+        Génère le rapport HTML de manière incrémentale
+        
+        Les fragments sont produits au fil du rendu du modèle précompilé et
+        écrits en parallèle dans le fichier de rapport, ce qui permet de les
+        envoyer directement dans la réponse HTTP sans construire le document
+        complet en mémoire. Chaque rendu écrit dans son propre fichier
+        temporaire (.part), publié par renommage une fois le rendu terminé :
+        deux rendus simultanés du même rapport (pré-rendu et requête, ou deux
+        workers) ne se mélangent pas, le dernier terminé remplace l'autre.
         Args:
-            emails: Liste des emails
-        Returns:
-            str: HTML généré
+            person_data: Données agrégées d'une personne
+            include_graph: Inclure un graphe de réseau
+            report_file: Fichier de destination (par défaut: new_report_path)
+        Yields:
+            str: Fragments HTML successifs
         """
-        if not emails:
-            return "<p>Aucune adresse email trouvée.</p>"
+        report_file = report_file or self.new_report_path(person_data)
+        partial_file = None
+        completed = False
         
-        html = ""
+        try:
+            template = _get_report_template()
+            
+            with tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', dir=os.path.dirname(report_file),
+                prefix=f"{os.path.basename(report_file)}.", suffix='.part', delete=False
+            ) as f:
+                partial_file = f.name
+                for chunk in template.generate(
+                    person=person_data,
+                    graph=(lambda: self._graph_data_uri(person_data)) if include_graph else None,
+                    max_images=REPORT_MAX_IMAGES,
+                    generated_at=datetime.datetime.now().strftime('%d/%m/%Y à %H:%M:%S')
+                ):
+                    f.write(chunk)
+                    yield chunk
+            
+            os.replace(partial_file, report_file)
+            completed = True
+            logger.info(f"Rapport généré avec succès: {report_file}")
         
-        for email in emails:
-            confidence = email.get('confidence', 0)
-            confidence_color = '#4CAF50' if confidence > 80 else '#FF9800' if confidence > 50 else '#F44336'
-            
-            html += f"""<div class="email">
-                <p>
-                    <strong>{email.get('address', 'N/A')}</strong>
-                    <span style="float:right; background-color:{confidence_color}; color:white; padding:2px 5px; border-radius:3px; font-size:0.8em;">
-                        {confidence}%
-                    </span>
-                </p>
-                <p><small>Source: {email.get('source', 'N/A')}</small></p>
-            </div>"""
-        
-        return html
+        except Exception as e:
+            logger.error(f"Erreur lors de la génération du rapport: {str(e)}")
+        
+        finally:
+            # Ne pas laisser de rapport partiel (erreur ou client déconnecté)
+            if not completed and partial_file and os.path.exists(partial_file):
+                os.remove(partial_file)
     
-    def _generate_images_html(self, images):
+    def generate_report(self, person_data, include_graph=True):
         """
-        Génère le HTML pour la section des images
+        Génère un rapport complet en format HTML
         Args:
-            images: Liste des images
+            person_data: Données agrégées d'une personne
+            include_graph: Inclure un graphe de réseau
         Returns:
-            str: HTML généré
+            tuple: (rapport au format HTML, chemin du fichier de rapport)
         """
-        if not images:
-            return "<p>Aucune image trouvée.</p>"
-        
-        html = "<div style='display:flex; flex-wrap:wrap; gap:10px;'>"
-        
-        for image in images[:12]:  # Limiter à 12 images
-            html += f"""<div style="width:150px; margin-bottom:10px;">
-                <a href="{image.get('url', '#')}" target="_blank">
-                    <img src="{image.get('url', '#')}" alt="Image" style="max-width:100%; max-height:150px; object-fit:contain;">
-                </a>
-                <p><small>Source: {image.get('source', 'N/A')}</small></p>
-            </div>"""
-        
-        html += "</div>"
+        report_file = self.new_report_path(person_data)
+        html = ''.join(self.stream_report(person_data, include_graph, report_file))
         
-        if len(images) > 12:
-            html += f"<p><em>+ {len(images) - 12} autres images non affichées</em></p>"
+        if not os.path.exists(report_file):
+            return "<html><body><h1>Erreur</h1><p>Erreur lors de la génération du rapport</p></body></html>", None
         
-        return html
+        return html, report_file
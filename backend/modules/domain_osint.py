@@ -16,6 +16,7 @@ from datetime import datetime
 from urllib.parse import urlparse
 
 from config import active_config
+from utils.rate_limiter import outbound_limiter, proxy_key
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -292,6 +293,9 @@ class DomainInvestigator:
             return {"error": "API Shodan non configurée"}
         
         try:
+            # Jeton du fournisseur (débit sortant partagé entre les workers)
+            outbound_limiter.acquire('shodan', proxy_key(self.config))
+            
             # Rechercher le domaine dans Shodan
             results = self.shodan_api.search(f"hostname:{domain}")
             
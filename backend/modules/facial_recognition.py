@@ -21,6 +21,17 @@ from config import active_config
 # Configuration du logger
 logger = logging.getLogger(__name__)
 
+def preload_models():
+    """
+    Initialise les modèles dlib avant le fork des workers
+    
+    L'import de face_recognition charge déjà les détecteurs et le modèle
+    d'encodage ; une détection sur une image vide alloue en plus les
+    structures initialisées au premier appel.
+    """
+    face_recognition.face_locations(np.zeros((32, 32, 3), dtype=np.uint8))
+    logger.info("Modèles de reconnaissance faciale préchargés")
+
 class FaceDetector:
     """Classe pour la détection et reconnaissance faciale"""
     
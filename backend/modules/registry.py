@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Registre des modules OSINT
+Ce module charge les modules OSINT à la demande : leurs dépendances lourdes
+(dlib, selenium, boto3, matplotlib...) ne sont importées qu'à la première
+utilisation, et non au démarrage de chaque worker.
+"""
+
+import gc
+import sys
+import logging
+import importlib
+import threading
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Classe exposée -> module qui la définit
+OSINT_MODULES = {
+    'FaceDetector': 'modules.facial_recognition',
+    'ReverseImageSearch': 'modules.reverse_search',
+    'SocialOSINT': 'modules.social_osint',
+    'DataAggregator': 'modules.data_aggregator',
+    'DomainInvestigator': 'modules.domain_osint'
+}
+
+_loaded_classes = {}
+_lock = threading.Lock()
+
+def get_module_class(name):
+    """
+    Retourne une classe OSINT en important son module à la première utilisation
+    Args:
+        name: Nom de la classe (clé de OSINT_MODULES)
+    Returns:
+        type: Classe demandée
+    """
+    cls = _loaded_classes.get(name)
+    if cls is not None:
+        return cls
+
+    if name not in OSINT_MODULES:
+        raise KeyError(f"Module OSINT inconnu: {name}")
+
+    with _lock:
+        if name not in _loaded_classes:
+            module = importlib.import_module(OSINT_MODULES[name])
+            _loaded_classes[name] = getattr(module, name)
+            logger.info(f"Module OSINT chargé: {OSINT_MODULES[name]}")
+
+    return _loaded_classes[name]
+
+def loaded_modules():
+    """
+    Liste les classes OSINT déjà chargées dans ce processus
+    Returns:
+        list: Noms des classes chargées
+    """
+    return list(_loaded_classes)
+
+def preload(names):
+    """
+    Charge des modules OSINT et leur état lourd en lecture seule avant le fork
+    
+    Chaque module peut exposer une fonction `preload_models()` qui initialise
+    ses modèles. Les objets créés sont ensuite gelés (gc.freeze) afin que le
+    ramasse-miettes des workers ne modifie pas leurs pages mémoire, qui restent
+    ainsi partagées en copie sur écriture avec le processus maître.
+    Args:
+        names: Noms des classes à précharger (clés de OSINT_MODULES)
+    """
+    for name in names:
+        try:
+            cls = get_module_class(name)
+            hook = getattr(sys.modules[cls.__module__], 'preload_models', None)
+            if hook:
+                hook()
+        except Exception as e:
+            logger.error(f"Erreur lors du préchargement de {name}: {str(e)}")
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Modules préchargés avant fork: {', '.join(loaded_modules())}")
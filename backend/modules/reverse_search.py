@@ -9,15 +9,12 @@ Ce module gère les fonctionnalités de recherche d'images inversée
 import os
 import re
 import json
-import time
 import logging
 import requests
 import base64
 from urllib.parse import urlencode, quote_plus
 from PIL import Image
 from io import BytesIO
-import random
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -26,6 +23,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
 from config import active_config
+from utils.rate_limiter import outbound_limiter, proxy_key
+from utils.result_pages import parse_google_images, parse_yandex_images, parse_tineye
+from utils.readiness import LOGGING_PREFS, NetworkMonitor, wait_for_results
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -56,6 +56,7 @@ class ReverseImageSearch:
         }
         
         # Initialiser Selenium si disponible
+        self.network = None
         self.selenium_enabled = self._init_selenium()
     
     def _init_selenium(self):
@@ -73,6 +74,9 @@ class ReverseImageSearch:
             chrome_options.add_argument("--disable-gpu")
             chrome_options.add_argument(f"user-agent={self.headers['User-Agent']}")
             
+            # Événements réseau (CDP) pour savoir quand une page a fini de charger
+            chrome_options.set_capability('goog:loggingPrefs', LOGGING_PREFS)
+            
             # Ajouter un proxy si configuré
             if self.config.PROXY_ENABLED:
                 proxy_url = f"{self.config.PROXY_TYPE}://{self.config.PROXY_HOST}:{self.config.PROXY_PORT}"
@@ -86,6 +90,7 @@ class ReverseImageSearch:
             # Initialiser le WebDriver
             self.driver = webdriver.Chrome(options=chrome_options)
             self.driver.set_page_load_timeout(self.timeout)
+            self.network = NetworkMonitor(self.driver)
             logger.info("Selenium WebDriver initialisé avec succès")
             return True
         
@@ -181,6 +186,9 @@ class ReverseImageSearch:
                 ]
             }
             
+            # Jeton du fournisseur (débit sortant partagé entre les workers)
+            outbound_limiter.acquire('google_vision', proxy_key(self.config))
+            
             # Envoyer la requête
             response = requests.post(
                 api_url,
@@ -227,8 +235,11 @@ class ReverseImageSearch:
             return {'error': 'Selenium non disponible'}
         
         try:
-            # Délai aléatoire pour éviter la détection
-            time.sleep(random.uniform(1, 3))
+            # Jeton du fournisseur (débit sortant partagé entre les workers)
+            outbound_limiter.acquire('google', proxy_key(self.config))
+            
+            # Oublier les requêtes réseau de la recherche précédente
+            self.network.reset()
             
             # Accéder à Google Images
             self.driver.get('https://images.google.com/')
@@ -258,52 +269,11 @@ class ReverseImageSearch:
                 EC.presence_of_element_located((By.ID, "search"))
             )
             
-            # Attendre un peu pour que tous les résultats se chargent
-            time.sleep(3)
-            
-            # Extraire les résultats
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
+            # Attendre que le nombre de résultats se stabilise et que le réseau soit au repos
+            wait_for_results(self.driver, ".isv-r, .Psd1Cc", self.network, config=self.config)
             
-            # Analyser les résultats
-            results = {
-                'similar_images': [],
-                'websites': [],
-                'best_guess': None
-            }
-            
-            # Récupérer les sites web contenant l'image
-            website_elements = soup.select(".Psd1Cc")
-            for element in website_elements:
-                title_elem = element.select_one(".MLSGY")
-                url_elem = element.select_one(".KjWMVd")
-                description_elem = element.select_one(".VjqMgc")
-                
-                if title_elem and url_elem:
-                    results['websites'].append({
-                        'title': title_elem.get_text(),
-                        'url': url_elem.get('href'),
-                        'description': description_elem.get_text() if description_elem else ''
-                    })
-            
-            # Récupérer la meilleure supposition (best guess)
-            best_guess_elem = soup.select_one(".fKDtNb")
-            if best_guess_elem:
-                results['best_guess'] = best_guess_elem.get_text()
-            
-            # Récupérer les images similaires
-            similar_images_elements = soup.select(".isv-r")
-            for element in similar_images_elements:
-                img_elem = element.select_one("img.Q4LuWd")
-                link_elem = element.select_one("a")
-                
-                if img_elem and link_elem:
-                    img_url = img_elem.get('src')
-                    if img_url and not img_url.startswith('data:'):
-                        results['similar_images'].append({
-                            'url': img_url,
-                            'page_url': link_elem.get('href') if link_elem.get('href') and link_elem.get('href').startswith('http') else None
-                        })
+            # Extraire les résultats (seuls les conteneurs de résultats sont analysés)
+            results = parse_google_images(self.driver.page_source)
             
             logger.info(f"Recherche Google Images réussie: {len(results['websites'])} sites web et {len(results['similar_images'])} images similaires trouvées")
             return results
@@ -333,8 +303,11 @@ class ReverseImageSearch:
             return {'error': 'Selenium non disponible'}
         
         try:
-            # Délai aléatoire pour éviter la détection
-            time.sleep(random.uniform(2, 4))
+            # Jeton du fournisseur (débit sortant partagé entre les workers)
+            outbound_limiter.acquire('yandex', proxy_key(self.config))
+            
+            # Oublier les requêtes réseau de la recherche précédente
+            self.network.reset()
             
             # Accéder à Yandex Images
             self.driver.get('https://yandex.com/images/')
@@ -358,52 +331,11 @@ class ReverseImageSearch:
                 EC.presence_of_element_located((By.CSS_SELECTOR, ".serp-list"))
             )
             
-            # Attendre un peu pour que tous les résultats se chargent
-            time.sleep(3)
+            # Attendre que le nombre de résultats se stabilise et que le réseau soit au repos
+            wait_for_results(self.driver, ".serp-item", self.network, config=self.config)
             
-            # Extraire les résultats
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Analyser les résultats
-            results = {
-                'similar_images': [],
-                'websites': [],
-                'categories': []
-            }
-            
-            # Récupérer les sites web
-            website_elements = soup.select(".serp-item")
-            for element in website_elements:
-                title_elem = element.select_one(".serp-item__title")
-                link_elem = element.select_one(".serp-item__link")
-                thumb_elem = element.select_one(".serp-item__thumb")
-                
-                if title_elem and link_elem:
-                    site_info = {
-                        'title': title_elem.get_text(),
-                        'url': link_elem.get('href'),
-                        'thumbnail': thumb_elem.get('src') if thumb_elem else None
-                    }
-                    
-                    # Vérifier si c'est une image ou un site web
-                    if thumb_elem and 'thumb' in str(thumb_elem):
-                        results['similar_images'].append(site_info)
-                    else:
-                        results['websites'].append(site_info)
-            
-            # Récupérer les catégories suggérées
-            category_elements = soup.select(".cbir-recognition__group")
-            for element in category_elements:
-                category_name = element.select_one(".cbir-recognition__group-title")
-                category_items = element.select(".cbir-recognition__label")
-                
-                if category_name:
-                    category = {
-                        'name': category_name.get_text(),
-                        'items': [item.get_text() for item in category_items if item]
-                    }
-                    results['categories'].append(category)
+            # Extraire les résultats (seuls les conteneurs de résultats sont analysés)
+            results = parse_yandex_images(self.driver.page_source)
             
             logger.info(f"Recherche Yandex réussie: {len(results['websites'])} sites web et {len(results['similar_images'])} images similaires trouvées")
             return results
@@ -433,8 +365,11 @@ class ReverseImageSearch:
             return {'error': 'Selenium non disponible'}
         
         try:
-            # Délai aléatoire pour éviter la détection
-            time.sleep(random.uniform(2, 5))
+            # Jeton du fournisseur (débit sortant partagé entre les workers)
+            outbound_limiter.acquire('tineye', proxy_key(self.config))
+            
+            # Oublier les requêtes réseau de la recherche précédente
+            self.network.reset()
             
             # Accéder à TinEye
             self.driver.get('https://tineye.com/')
@@ -452,57 +387,11 @@ class ReverseImageSearch:
                 EC.presence_of_element_located((By.CLASS_NAME, "match-row"))
             )
             
-            # Attendre un peu pour que tous les résultats se chargent
-            time.sleep(3)
+            # Attendre que le nombre de résultats se stabilise et que le réseau soit au repos
+            wait_for_results(self.driver, ".match-row", self.network, config=self.config)
             
-            # Extraire les résultats
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Analyser les résultats
-            results = {
-                'matches': [],
-                'total_results': 0,
-                'domains': []
-            }
-            
-            # Récupérer le nombre total de résultats
-            total_results_elem = soup.select_one(".matches strong")
-            if total_results_elem:
-                try:
-                    results['total_results'] = int(total_results_elem.get_text().replace(',', ''))
-                except ValueError:
-                    pass
-            
-            # Récupérer les correspondances
-            match_elements = soup.select(".match-row")
-            for element in match_elements:
-                image_tag = element.select_one(".match-img img")
-                link_tag = element.select_one(".match-details .item-link a")
-                domain_tag = element.select_one(".match-details .domains a")
-                size_tag = element.select_one(".match-details .image-detail-size")
-                
-                if image_tag and link_tag:
-                    match = {
-                        'thumbnail': image_tag.get('src'),
-                        'url': link_tag.get('href'),
-                        'domain': domain_tag.get_text() if domain_tag else None,
-                        'size': size_tag.get_text() if size_tag else None
-                    }
-                    results['matches'].append(match)
-            
-            # Récupérer les domaines
-            domain_elements = soup.select(".sidebar-domains .domain-link")
-            for element in domain_elements:
-                domain_name = element.select_one(".domain-name")
-                domain_count = element.select_one(".domain-count")
-                
-                if domain_name and domain_count:
-                    domain = {
-                        'name': domain_name.get_text(),
-                        'count': domain_count.get_text().strip('()')
-                    }
-                    results['domains'].append(domain)
+            # Extraire les résultats (seuls les conteneurs de résultats sont analysés)
+            results = parse_tineye(self.driver.page_source)
             
             logger.info(f"Recherche TinEye réussie: {results['total_results']} correspondances trouvées")
             return results
@@ -537,14 +426,8 @@ class ReverseImageSearch:
         if self.selenium_enabled:
             results['google'] = self.google_search(image_path)
             
-            # Pause pour éviter la détection
-            time.sleep(random.uniform(3, 6))
-            
             results['yandex'] = self.yandex_search(image_path)
             
-            # Pause pour éviter la détection
-            time.sleep(random.uniform(3, 6))
-            
             results['tineye'] = self.tineye_search(image_path)
         
         return results
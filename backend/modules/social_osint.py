@@ -14,7 +14,6 @@ import logging
 import requests
 import subprocess
 import random
-from bs4 import BeautifulSoup
 from urllib.parse import quote_plus
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -24,6 +23,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException
 
 from config import active_config
+from utils.rate_limiter import outbound_limiter, proxy_key
+from utils.result_pages import parse_google_results
+from utils.fetcher import page_fetcher
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -54,8 +56,9 @@ class SocialOSINT:
             'Upgrade-Insecure-Requests': '1',
         }
         
-        # Initialiser Selenium si disponible
-        self.selenium_enabled = self._init_selenium()
+        # Selenium n'est démarré qu'au premier besoin (voir _get_driver)
+        self.driver = None
+        self._selenium_failed = False
     
     def _init_selenium(self):
         """
@@ -91,6 +94,37 @@ class SocialOSINT:
             logger.error(f"Erreur lors de l'initialisation de Selenium: {str(e)}")
             return False
     
+    def _get_driver(self):
+        """
+        Retourne le WebDriver, démarré au premier appel
+        Returns:
+            WebDriver: Navigateur, ou None si Selenium est indisponible
+        """
+        if self.driver is None and not self._selenium_failed:
+            self._selenium_failed = not self._init_selenium()
+        return self.driver
+    
+    def _browser_page_source(self, url):
+        """
+        Charge une page de résultats Google dans le navigateur
+        Args:
+            url: Adresse de la page
+        Returns:
+            str: Source de la page, ou None si Selenium est indisponible
+        """
+        driver = self._get_driver()
+        if driver is None:
+            logger.warning("Selenium non disponible pour le repli navigateur")
+            return None
+        
+        driver.get(url)
+        
+        # Attendre les résultats
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.ID, "search"))
+        )
+        return driver.page_source
+    
     def close(self):
         """Ferme les ressources"""
         if hasattr(self, 'driver') and self.driver:
@@ -180,6 +214,9 @@ class SocialOSINT:
             # Préparer la requête
             api_url = f"https://api.hunter.io/v2/domain-search?domain={domain}&api_key={self.hunter_api_key}"
             
+            # Jeton du fournisseur (débit sortant partagé entre les workers)
+            outbound_limiter.acquire('hunter', proxy_key(self.config))
+            
             # Envoyer la requête
             response = requests.get(
                 api_url,
@@ -227,10 +264,6 @@ class SocialOSINT:
         Returns:
             dict: Résultats de la recherche
         """
-        if not self.selenium_enabled:
-            logger.warning("Selenium non disponible pour la recherche LinkedIn")
-            return {'error': 'Selenium non disponible'}
-        
         try:
             # Construire la requête
             query = f"{name}"
@@ -243,39 +276,26 @@ class SocialOSINT:
             # Délai aléatoire pour éviter la détection
             time.sleep(random.uniform(1, 3))
             
-            # Charger la page
-            self.driver.get(search_url)
-            
-            # Attendre les résultats
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "search"))
+            # Charger la page (requête HTTP, navigateur si nécessaire), chaque
+            # requête prenant un jeton Google, l'hôte réellement interrogé
+            html, fetched_with, _ = page_fetcher.fetch(
+                'linkedin', search_url, self._browser_page_source,
+                headers=self.headers, ready_marker='id="search"', provider='google'
             )
+            if html is None:
+                return {'error': 'Selenium non disponible'}
             
-            # Extraire les résultats
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            
+            # Extraire les résultats (seul le conteneur de résultats est analysé)
             results = []
             
             # Récupérer les liens de profils LinkedIn
-            for g in soup.select('.g'):
-                link_elem = g.select_one('a')
-                title_elem = g.select_one('h3')
-                description_elem = g.select_one('.VwiC3b')
-                
-                if link_elem and title_elem:
-                    url = link_elem['href']
-                    # Vérifier que c'est bien un profil LinkedIn
-                    if 'linkedin.com/in/' in url:
-                        profile = {
-                            'name': title_elem.get_text(),
-                            'url': url,
-                            'description': description_elem.get_text() if description_elem else None
-                        }
-                        results.append(profile)
+            for result in parse_google_results(html):
+                # Vérifier que c'est bien un profil LinkedIn
+                if 'linkedin.com/in/' in result['url']:
+                    results.append(result)
             
             logger.info(f"Recherche LinkedIn réussie: {len(results)} profils trouvés pour '{query}'")
-            return {'profiles': results}
+            return {'profiles': results, 'fetched_with': fetched_with}
         
         except TimeoutException as e:
             logger.error(f"Timeout lors de la recherche LinkedIn: {str(e)}")
@@ -298,10 +318,6 @@ class SocialOSINT:
         Returns:
             dict: Résultats de la recherche
         """
-        if not self.selenium_enabled:
-            logger.warning("Selenium non disponible pour la recherche Facebook")
-            return {'error': 'Selenium non disponible'}
-        
         try:
             # Construire la requête
             query = f"{name}"
@@ -314,39 +330,26 @@ class SocialOSINT:
             # Délai aléatoire pour éviter la détection
             time.sleep(random.uniform(1, 3))
             
-            # Charger la page
-            self.driver.get(search_url)
-            
-            # Attendre les résultats
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "search"))
+            # Charger la page (requête HTTP, navigateur si nécessaire), chaque
+            # requête prenant un jeton Google, l'hôte réellement interrogé
+            html, fetched_with, _ = page_fetcher.fetch(
+                'facebook', search_url, self._browser_page_source,
+                headers=self.headers, ready_marker='id="search"', provider='google'
             )
+            if html is None:
+                return {'error': 'Selenium non disponible'}
             
-            # Extraire les résultats
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            
+            # Extraire les résultats (seul le conteneur de résultats est analysé)
             results = []
             
             # Récupérer les liens de profils Facebook
-            for g in soup.select('.g'):
-                link_elem = g.select_one('a')
-                title_elem = g.select_one('h3')
-                description_elem = g.select_one('.VwiC3b')
-                
-                if link_elem and title_elem:
-                    url = link_elem['href']
-                    # Vérifier que c'est bien un profil ou une page Facebook
-                    if 'facebook.com/' in url and not 'facebook.com/search' in url:
-                        profile = {
-                            'name': title_elem.get_text(),
-                            'url': url,
-                            'description': description_elem.get_text() if description_elem else None
-                        }
-                        results.append(profile)
+            for result in parse_google_results(html):
+                # Vérifier que c'est bien un profil ou une page Facebook
+                if 'facebook.com/' in result['url'] and not 'facebook.com/search' in result['url']:
+                    results.append(result)
             
             logger.info(f"Recherche Facebook réussie: {len(results)} profils trouvés pour '{query}'")
-            return {'profiles': results}
+            return {'profiles': results, 'fetched_with': fetched_with}
         
         except TimeoutException as e:
             logger.error(f"Timeout lors de la recherche Facebook: {str(e)}")
@@ -369,10 +372,6 @@ class SocialOSINT:
         Returns:
             dict: Résultats de la recherche
         """
-        if not self.selenium_enabled:
-            logger.warning("Selenium non disponible pour la recherche Twitter")
-            return {'error': 'Selenium non disponible'}
-        
         try:
             # Construire la requête
             query = f"{name}"
@@ -385,39 +384,26 @@ class SocialOSINT:
             # Délai aléatoire pour éviter la détection
             time.sleep(random.uniform(1, 3))
             
-            # Charger la page
-            self.driver.get(search_url)
-            
-            # Attendre les résultats
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "search"))
+            # Charger la page (requête HTTP, navigateur si nécessaire), chaque
+            # requête prenant un jeton Google, l'hôte réellement interrogé
+            html, fetched_with, _ = page_fetcher.fetch(
+                'twitter', search_url, self._browser_page_source,
+                headers=self.headers, ready_marker='id="search"', provider='google'
             )
+            if html is None:
+                return {'error': 'Selenium non disponible'}
             
-            # Extraire les résultats
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            
+            # Extraire les résultats (seul le conteneur de résultats est analysé)
             results = []
             
             # Récupérer les liens de profils Twitter
-            for g in soup.select('.g'):
-                link_elem = g.select_one('a')
-                title_elem = g.select_one('h3')
-                description_elem = g.select_one('.VwiC3b')
-                
-                if link_elem and title_elem:
-                    url = link_elem['href']
-                    # Vérifier que c'est bien un profil Twitter
-                    if 'twitter.com/' in url and not any(x in url for x in ['twitter.com/search', 'twitter.com/hashtag']):
-                        profile = {
-                            'name': title_elem.get_text(),
-                            'url': url,
-                            'description': description_elem.get_text() if description_elem else None
-                        }
-                        results.append(profile)
+            for result in parse_google_results(html):
+                # Vérifier que c'est bien un profil Twitter
+                if 'twitter.com/' in result['url'] and not any(x in result['url'] for x in ['twitter.com/search', 'twitter.com/hashtag']):
+                    results.append(result)
             
             logger.info(f"Recherche Twitter réussie: {len(results)} profils trouvés pour '{query}'")
-            return {'profiles': results}
+            return {'profiles': results, 'fetched_with': fetched_with}
         
         except TimeoutException as e:
             logger.error(f"Timeout lors de la recherche Twitter: {str(e)}")
@@ -440,10 +426,6 @@ class SocialOSINT:
         Returns:
             dict: Résultats de la recherche
         """
-        if not self.selenium_enabled:
-            logger.warning("Selenium non disponible pour la recherche Instagram")
-            return {'error': 'Selenium non disponible'}
-        
         try:
             # Construire la requête
             query = f"{name}"
@@ -456,39 +438,26 @@ class SocialOSINT:
             # Délai aléatoire pour éviter la détection
             time.sleep(random.uniform(1, 3))
             
-            # Charger la page
-            self.driver.get(search_url)
-            
-            # Attendre les résultats
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "search"))
+            # Charger la page (requête HTTP, navigateur si nécessaire), chaque
+            # requête prenant un jeton Google, l'hôte réellement interrogé
+            html, fetched_with, _ = page_fetcher.fetch(
+                'instagram', search_url, self._browser_page_source,
+                headers=self.headers, ready_marker='id="search"', provider='google'
             )
+            if html is None:
+                return {'error': 'Selenium non disponible'}
             
-            # Extraire les résultats
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            
+            # Extraire les résultats (seul le conteneur de résultats est analysé)
             results = []
             
             # Récupérer les liens de profils Instagram
-            for g in soup.select('.g'):
-                link_elem = g.select_one('a')
-                title_elem = g.select_one('h3')
-                description_elem = g.select_one('.VwiC3b')
-                
-                if link_elem and title_elem:
-                    url = link_elem['href']
-                    # Vérifier que c'est bien un profil Instagram
-                    if 'instagram.com/' in url and not 'instagram.com/p/' in url:
-                        profile = {
-                            'name': title_elem.get_text(),
-                            'url': url,
-                            'description': description_elem.get_text() if description_elem else None
-                        }
-                        results.append(profile)
+            for result in parse_google_results(html):
+                # Vérifier que c'est bien un profil Instagram
+                if 'instagram.com/' in result['url'] and not 'instagram.com/p/' in result['url']:
+                    results.append(result)
             
             logger.info(f"Recherche Instagram réussie: {len(results)} profils trouvés pour '{query}'")
-            return {'profiles': results}
+            return {'profiles': results, 'fetched_with': fetched_with}
         
         except TimeoutException as e:
             logger.error(f"Timeout lors de la recherche Instagram: {str(e)}")
@@ -516,13 +485,15 @@ class SocialOSINT:
             'name': name,
             'location': location,
             'company': company,
-            'profiles': {}
+            'profiles': {},
+            'fetch': {}  # Plateforme -> chemin de récupération ('http' ou 'browser')
         }
         
         # Recherche sur LinkedIn
         linkedin_results = self.search_linkedin(name, company)
         if 'profiles' in linkedin_results:
             results['profiles']['linkedin'] = linkedin_results['profiles']
+            results['fetch']['linkedin'] = linkedin_results['fetched_with']
         
         # Pause pour éviter la détection
         time.sleep(random.uniform(2, 5))
@@ -531,6 +502,7 @@ class SocialOSINT:
         facebook_results = self.search_facebook(name, location)
         if 'profiles' in facebook_results:
             results['profiles']['facebook'] = facebook_results['profiles']
+            results['fetch']['facebook'] = facebook_results['fetched_with']
         
         # Pause pour éviter la détection
         time.sleep(random.uniform(2, 5))
@@ -539,6 +511,7 @@ class SocialOSINT:
         twitter_results = self.search_twitter(name)
         if 'profiles' in twitter_results:
             results['profiles']['twitter'] = twitter_results['profiles']
+            results['fetch']['twitter'] = twitter_results['fetched_with']
         
         # Pause pour éviter la détection
         time.sleep(random.uniform(2, 5))
@@ -547,6 +520,7 @@ class SocialOSINT:
         instagram_results = self.search_instagram(name)
         if 'profiles' in instagram_results:
             results['profiles']['instagram'] = instagram_results['profiles']
+            results['fetch']['instagram'] = instagram_results['fetched_with']
         
         # Calculer les statistiques
         total_profiles = sum(len(profiles) for platform, profiles in results['profiles'].items())
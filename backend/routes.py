@@ -10,17 +10,24 @@ import os
 import json
 import time
 import uuid
+import hashlib
 import logging
-from flask import Blueprint, request, jsonify, send_file, abort
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime
+from flask import Blueprint, Response, current_app, g, request, jsonify, send_file, abort, stream_with_context
+from sqlalchemy.orm import undefer_group
 from werkzeug.utils import secure_filename
 
 from models import db, User, SearchHistory, SearchResult
-from modules.facial_recognition import FaceDetector
-from modules.reverse_search import ReverseImageSearch
-from modules.social_osint import SocialOSINT
-from modules.data_aggregator import DataAggregator
-from utils.legal_check import validate_use_case
+from modules.registry import get_module_class
+from utils.report_cache import report_cache
+from utils.result_persistence import flatten_results, count_items, content_hash, build_report_data
+from utils.pagination import keyset_page, approximate_count
+from utils.search_index import search_indexer, build_documents
+from utils.export import EXPORT_FORMATS, stream_export, parquet_available
+from utils.db_routing import use_replica, mark_recent_write
+from utils.auth import auth_required, get_current_user_id
+from utils.request_context import get_request_context
+from utils.singleflight import singleflight
 from utils.logging import audit_log
 
 # Configuration du logger
@@ -46,6 +53,55 @@ def allowed_file(filename):
     """
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def file_digest(file_path):
+    """
+    Calcule l'empreinte SHA-256 du contenu d'un fichier
+    Args:
+        file_path: Chemin du fichier
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def persist_search_results(search_history, results):
+    """
+    Enregistre les résultats d'une recherche sous forme d'éléments individuels
+    
+    Les éléments sont insérés en une seule instruction, dans la même
+    transaction que la mise à jour de l'historique, puis le rapport
+    correspondant est planifié pour un pré-rendu en arrière-plan.
+    Args:
+        search_history: Entrée d'historique de la recherche
+        results: Résultats renvoyés par les modules OSINT
+    Returns:
+        list: Éléments de résultat enregistrés
+    """
+    items = flatten_results(search_history.search_type, results)
+    search_history.results_count = count_items(items)
+    SearchResult.bulk_create(search_history.id, items)
+    db.session.commit()
+    
+    # Les prochaines lectures de l'utilisateur doivent voir cette recherche
+    mark_recent_write(search_history.user_id)
+    
+    # Indexer les résultats dans Elasticsearch (en arrière-plan)
+    search_indexer.enqueue(build_documents(search_history, items))
+    
+    # Pré-rendre le rapport en arrière-plan pour les téléchargements à venir
+    if current_app.config['REPORT_PRERENDER']:
+        search_type, search_term = search_history.search_type, search_history.search_term
+        report_cache.prerender(
+            str(search_history.id),
+            content_hash(items),
+            lambda: build_report_data(search_type, search_term, items)
+        )
+    
+    return items
+
 def register_routes(app):
     """
     Enregistre les routes dans l'application Flask
@@ -63,6 +119,7 @@ def register_routes(app):
 
 # Routes pour l'authentification
 @api_bp.route('/auth/login', methods=['POST'])
+@use_replica
 def login():
     """Route pour l'authentification"""
     data = request.json
@@ -103,22 +160,44 @@ def login():
         "user": user.to_dict()
     }), 200
 
+# Route pour générer (ou renouveler) la clé API de l'utilisateur connecté
+@api_bp.route('/auth/api-key', methods=['POST'])
+@auth_required()
+def rotate_api_key():
+    """Route pour générer une nouvelle clé API ; l'ancienne est révoquée"""
+    current_user_id = get_current_user_id()
+    
+    user = User.query.filter_by(id=current_user_id).first()
+    if not user:
+        return jsonify({"error": "Utilisateur non trouvé"}), 404
+    
+    api_key = user.generate_api_key()
+    db.session.commit()  # Diffuse l'invalidation de l'ancienne clé (voir utils/auth.py)
+    
+    audit_log(current_user_id, 'api_key_rotated', 'auth/api-key', request.remote_addr, None, 'success')
+    
+    return jsonify({
+        "message": "Clé API générée",
+        "api_key": api_key
+    }), 200
+
 # Routes pour la recherche par photo
 @api_bp.route('/search/photo', methods=['POST'])
-@jwt_required(optional=True)
+@auth_required(optional=True)
 def search_by_photo():
     """Route pour la recherche par photo"""
-    # Récupérer l'identité de l'utilisateur connecté (si disponible)
-    current_user_id = get_jwt_identity()
+    # En-têtes, corps et identité lus une seule fois pour la requête
+    context = get_request_context()
+    current_user_id = context.user_id
     
     # Vérifier que le consentement éthique est présent
-    if request.headers.get('X-Ethical-Consent', '').lower() != 'true':
+    if not context.consent:
         audit_log(current_user_id, 'search_denied', 'search/photo', request.remote_addr, {'reason': 'no_consent'}, 'denied')
         return jsonify({"error": "Consentement éthique requis"}), 403
     
     # Vérifier le cas d'usage
-    use_case = request.headers.get('X-Use-Case')
-    if not validate_use_case(use_case):
+    use_case = context.use_case
+    if not context.use_case_valid:
         audit_log(current_user_id, 'search_denied', 'search/photo', request.remote_addr, {'reason': 'invalid_use_case', 'use_case': use_case}, 'denied')
         return jsonify({"error": "Cas d'usage non valide"}), 403
     
@@ -156,18 +235,17 @@ def search_by_photo():
             user_agent=request.user_agent.string,
             consent_given=True,
             use_case=use_case,
-            search_parameters=request.form.to_dict()
+            search_parameters=context.form
         )
         db.session.add(search_history)
         db.session.commit()
         
-        # Initialiser les modules OSINT
-        face_detector = FaceDetector()
-        reverse_search = ReverseImageSearch()
+        # Initialiser le module de détection de visages
+        face_detector = get_module_class('FaceDetector')()
         
         # Options de recherche
-        search_engines = request.form.get('search_engines', 'all')
-        detect_faces = request.form.get('detect_faces', 'true').lower() in ('true', '1', 't')
+        search_engines = context.form.get('search_engines', 'all')
+        detect_faces = context.form.get('detect_faces', 'true').lower() in ('true', '1', 't')
         
         results = {}
         
@@ -192,46 +270,37 @@ def search_by_photo():
                     aws_results = face_detector.aws_face_analysis(file_path)
                     results['face_detection']['aws_analysis'] = aws_results
         
-        # Recherche d'image inversée
-        if search_engines == 'all':
-            image_search_results = reverse_search.search_all(file_path)
-        else:
-            image_search_results = {}
-            engines = search_engines.split(',')
-            if 'google' in engines and hasattr(reverse_search, 'google_search'):
-                image_search_results['google'] = reverse_search.google_search(file_path)
-            if 'google_api' in engines and hasattr(reverse_search, 'google_search_api'):
-                image_search_results['google_api'] = reverse_search.google_search_api(file_path)
-            if 'yandex' in engines and hasattr(reverse_search, 'yandex_search'):
-                image_search_results['yandex'] = reverse_search.yandex_search(file_path)
-            if 'tineye' in engines and hasattr(reverse_search, 'tineye_search'):
-                image_search_results['tineye'] = reverse_search.tineye_search(file_path)
-        
-        results['image_search'] = image_search_results
-        
-        # Fermer les ressources
-        reverse_search.close()
+        def run_image_search():
+            # Recherche d'image inversée (le module est fermé même en cas d'erreur)
+            reverse_search = get_module_class('ReverseImageSearch')()
+            try:
+                if search_engines == 'all':
+                    return reverse_search.search_all(file_path)
+                
+                image_search_results = {}
+                engines = search_engines.split(',')
+                if 'google' in engines and hasattr(reverse_search, 'google_search'):
+                    image_search_results['google'] = reverse_search.google_search(file_path)
+                if 'google_api' in engines and hasattr(reverse_search, 'google_search_api'):
+                    image_search_results['google_api'] = reverse_search.google_search_api(file_path)
+                if 'yandex' in engines and hasattr(reverse_search, 'yandex_search'):
+                    image_search_results['yandex'] = reverse_search.yandex_search(file_path)
+                if 'tineye' in engines and hasattr(reverse_search, 'tineye_search'):
+                    image_search_results['tineye'] = reverse_search.tineye_search(file_path)
+                return image_search_results
+            finally:
+                reverse_search.close()
+        
+        # Une recherche de la même image (même contenu, mêmes moteurs) en cours est partagée
+        engines_key = ','.join(sorted(engine.strip() for engine in search_engines.split(',')))
+        results['image_search'] = singleflight.do(f"image:{file_digest(file_path)}:{engines_key}", run_image_search)
         
         # Calculer le temps d'exécution
         execution_time = int((time.time() - start_time) * 1000)  # En millisecondes
         
-        # Mettre à jour l'historique des recherches
+        # Mettre à jour l'historique et enregistrer les résultats
         search_history.execution_time = execution_time
-        search_history.results_count = len(str(results).split(','))
-        db.session.commit()
-        
-        # Créer des entrées pour les résultats
-        for source, result in results.items():
-            search_result = SearchResult(
-                search_id=search_history.id,
-                result_type=source,
-                source='TheWatcher',
-                confidence=90,
-                data=result
-            )
-            db.session.add(search_result)
-        
-        db.session.commit()
+        persist_search_results(search_history, results)
         
         # Journaliser la recherche réussie
         audit_log(current_user_id, 'search_success', 'search/photo', request.remote_addr, {'file': file.filename}, 'success')
@@ -264,25 +333,26 @@ def search_by_photo():
 
 # Routes pour la recherche par nom
 @api_bp.route('/search/person', methods=['POST'])
-@jwt_required(optional=True)
+@auth_required(optional=True)
 def search_by_person():
     """Route pour la recherche par nom de personne"""
-    # Récupérer l'identité de l'utilisateur connecté (si disponible)
-    current_user_id = get_jwt_identity()
+    # En-têtes, corps et identité lus une seule fois pour la requête
+    context = get_request_context()
+    current_user_id = context.user_id
     
     # Vérifier que le consentement éthique est présent
-    if request.headers.get('X-Ethical-Consent', '').lower() != 'true':
+    if not context.consent:
         audit_log(current_user_id, 'search_denied', 'search/person', request.remote_addr, {'reason': 'no_consent'}, 'denied')
         return jsonify({"error": "Consentement éthique requis"}), 403
     
     # Vérifier le cas d'usage
-    use_case = request.headers.get('X-Use-Case')
-    if not validate_use_case(use_case):
+    use_case = context.use_case
+    if not context.use_case_valid:
         audit_log(current_user_id, 'search_denied', 'search/person', request.remote_addr, {'reason': 'invalid_use_case', 'use_case': use_case}, 'denied')
         return jsonify({"error": "Cas d'usage non valide"}), 403
     
     # Récupérer les données du formulaire
-    data = request.json
+    data = context.json
     
     # Vérifier si le nom est présent
     if not data or not data.get('name'):
@@ -310,22 +380,24 @@ def search_by_person():
         db.session.add(search_history)
         db.session.commit()
         
-        # Initialiser le module OSINT social
-        social_osint = SocialOSINT()
-        
-        # Effectuer la recherche
-        results = social_osint.search_person(name, location, company)
+        def run_search():
+            # Initialiser le module OSINT social, effectuer la recherche puis fermer les ressources
+            social_osint = get_module_class('SocialOSINT')()
+            try:
+                return social_osint.search_person(name, location, company)
+            finally:
+                social_osint.close()
         
-        # Fermer les ressources
-        social_osint.close()
+        # Une recherche identique en cours (autre requête ou autre worker) est partagée
+        search_key = '|'.join((value or '').strip().lower() for value in (name, location, company))
+        results = singleflight.do(f"person:{search_key}", run_search)
         
         # Calculer le temps d'exécution
         execution_time = int((time.time() - start_time) * 1000)  # En millisecondes
         
-        # Mettre à jour l'historique des recherches
+        # Mettre à jour l'historique et enregistrer les résultats
         search_history.execution_time = execution_time
-        search_history.results_count = sum(len(profiles) for platform, profiles in results.get('profiles', {}).items())
-        db.session.commit()
+        persist_search_results(search_history, results)
         
         # Journaliser la recherche réussie
         audit_log(current_user_id, 'search_success', 'search/person', request.remote_addr, {'name': name}, 'success')
@@ -354,25 +426,26 @@ def search_by_person():
 
 # Routes pour la recherche par nom d'utilisateur
 @api_bp.route('/search/username', methods=['POST'])
-@jwt_required(optional=True)
+@auth_required(optional=True)
 def search_by_username():
     """Route pour la recherche par nom d'utilisateur"""
-    # Récupérer l'identité de l'utilisateur connecté (si disponible)
-    current_user_id = get_jwt_identity()
+    # En-têtes, corps et identité lus une seule fois pour la requête
+    context = get_request_context()
+    current_user_id = context.user_id
     
     # Vérifier que le consentement éthique est présent
-    if request.headers.get('X-Ethical-Consent', '').lower() != 'true':
+    if not context.consent:
         audit_log(current_user_id, 'search_denied', 'search/username', request.remote_addr, {'reason': 'no_consent'}, 'denied')
         return jsonify({"error": "Consentement éthique requis"}), 403
     
     # Vérifier le cas d'usage
-    use_case = request.headers.get('X-Use-Case')
-    if not validate_use_case(use_case):
+    use_case = context.use_case
+    if not context.use_case_valid:
         audit_log(current_user_id, 'search_denied', 'search/username', request.remote_addr, {'reason': 'invalid_use_case', 'use_case': use_case}, 'denied')
         return jsonify({"error": "Cas d'usage non valide"}), 403
     
     # Récupérer les données du formulaire
-    data = request.json
+    data = context.json
     
     # Vérifier si le nom d'utilisateur est présent
     if not data or not data.get('username'):
@@ -398,22 +471,23 @@ def search_by_username():
         db.session.add(search_history)
         db.session.commit()
         
-        # Initialiser le module OSINT social
-        social_osint = SocialOSINT()
+        def run_search():
+            # Initialiser le module OSINT social, effectuer la recherche puis fermer les ressources
+            social_osint = get_module_class('SocialOSINT')()
+            try:
+                return social_osint.search_username(username)
+            finally:
+                social_osint.close()
         
-        # Effectuer la recherche
-        results = social_osint.search_username(username)
-        
-        # Fermer les ressources
-        social_osint.close()
+        # Une recherche identique en cours (autre requête ou autre worker) est partagée
+        results = singleflight.do(f"username:{username.strip().lstrip('@').lower()}", run_search)
         
         # Calculer le temps d'exécution
         execution_time = int((time.time() - start_time) * 1000)  # En millisecondes
         
-        # Mettre à jour l'historique des recherches
+        # Mettre à jour l'historique et enregistrer les résultats
         search_history.execution_time = execution_time
-        search_history.results_count = len(results.get('accounts', {}))
-        db.session.commit()
+        persist_search_results(search_history, results)
         
         # Journaliser la recherche réussie
         audit_log(current_user_id, 'search_success', 'search/username', request.remote_addr, {'username': username}, 'success')
@@ -442,14 +516,20 @@ def search_by_username():
 
 # Route pour générer un rapport
 @api_bp.route('/report/<search_id>', methods=['GET'])
-@jwt_required(optional=True)
+@auth_required(optional=True)
+@use_replica
 def generate_report(search_id):
     """Route pour générer un rapport à partir d'une recherche"""
     # Récupérer l'identité de l'utilisateur connecté (si disponible)
-    current_user_id = get_jwt_identity()
+    current_user_id = get_current_user_id()
     
     # Rechercher l'historique de recherche
-    search_history = SearchHistory.query.get(search_id)
+    search_history = SearchHistory.find(search_id)
+    
+    # Recherche pas encore répliquée (ex: recherche anonyme toute récente) : relire sur le primaire
+    if not search_history and g.get('db_use_replica'):
+        g.db_use_replica = False
+        search_history = SearchHistory.find(search_id)
     
     if not search_history:
         return jsonify({"error": "Recherche non trouvée"}), 404
@@ -461,90 +541,41 @@ def generate_report(search_id):
     
     try:
         # Récupérer les résultats de recherche
-        search_results = SearchResult.query.filter_by(search_id=search_id).all()
+        # La borne sur created_at limite la lecture aux partitions postérieures à la recherche
+        search_results = SearchResult.query.options(undefer_group('payload')).filter(
+            SearchResult.search_id == search_history.id,
+            SearchResult.created_at >= search_history.created_at
+        ).all()
         
         if not search_results:
             return jsonify({"error": "Aucun résultat trouvé pour cette recherche"}), 404
         
-        # Compiler les résultats
-        combined_results = {}
-        for result in search_results:
-            combined_results[result.result_type] = result.data
+        items = [result.to_item() for result in search_results]
+        results_hash = content_hash(items)
+        download_name = f"rapport_{search_id}.html"
         
-        # Initialiser l'agrégateur de données
-        data_aggregator = DataAggregator()
-        
-        # Générer le rapport en fonction du type de recherche
-        if search_history.search_type == 'person':
-            # Pour une recherche par nom
-            person_data = combined_results.get('person_search', {})
-            
-            # Générer le rapport HTML
-            html, report_file = data_aggregator.generate_report(person_data)
-            
-            # Journaliser la génération du rapport
-            audit_log(current_user_id, 'report_generated', f'report/{search_id}', request.remote_addr, {'file': report_file}, 'success')
-            
-            # Retourner le rapport
-            return send_file(report_file, as_attachment=True, download_name=os.path.basename(report_file))
+        # Servir directement un rapport déjà rendu pour ces résultats
+        report_file = report_cache.get(search_id, results_hash)
+        if report_file:
+            audit_log(current_user_id, 'report_generated', f'report/{search_id}', request.remote_addr, {'file': report_file, 'cached': True}, 'success')
+            return send_file(report_file, as_attachment=True, download_name=download_name, mimetype='text/html')
         
-        elif search_history.search_type == 'username':
-            # Pour une recherche par nom d'utilisateur
-            username_data = combined_results.get('username_search', {})
-            
-            # Générer le rapport HTML
-            html, report_file = data_aggregator.generate_report(username_data)
-            
-            # Journaliser la génération du rapport
-            audit_log(current_user_id, 'report_generated', f'report/{search_id}', request.remote_addr, {'file': report_file}, 'success')
-            
-            # Retourner le rapport
-            return send_file(report_file, as_attachment=True, download_name=os.path.basename(report_file))
-        
-        elif search_history.search_type == 'photo':
-            # Pour une recherche par photo
-            # Le traitement est plus complexe car il faut agréger différentes sources
-            aggregated_data = {
-                'name': search_history.search_term,
-                'social_profiles': {},
-                'images': [],
-                'metadata': {
-                    'sources': ['image_search'],
-                    'confidence': 50
-                }
-            }
-            
-            # Ajouter les résultats de la recherche d'image
-            if 'image_search' in combined_results:
-                image_results = combined_results['image_search']
-                
-                # Traiter chaque moteur de recherche
-                for engine, results in image_results.items():
-                    if engine == 'google' and 'similar_images' in results:
-                        for image in results['similar_images']:
-                            aggregated_data['images'].append({
-                                'url': image.get('url', ''),
-                                'source': engine
-                            })
-                    
-                    if engine == 'yandex' and 'similar_images' in results:
-                        for image in results['similar_images']:
-                            aggregated_data['images'].append({
-                                'url': image.get('url', ''),
-                                'source': engine
-                            })
-            
-            # Générer le rapport HTML
-            html, report_file = data_aggregator.generate_report(aggregated_data)
-            
-            # Journaliser la génération du rapport
-            audit_log(current_user_id, 'report_generated', f'report/{search_id}', request.remote_addr, {'file': report_file}, 'success')
-            
-            # Retourner le rapport
-            return send_file(report_file, as_attachment=True, download_name=os.path.basename(report_file))
+        # Préparer les données du rapport en fonction du type de recherche
+        report_data = build_report_data(search_history.search_type, search_history.search_term, items)
         
-        else:
+        if report_data is None:
             return jsonify({"error": "Type de recherche non pris en charge pour la génération de rapport"}), 400
+        
+        # Journaliser la génération du rapport
+        audit_log(current_user_id, 'report_generated', f'report/{search_id}', request.remote_addr, {'file': report_cache.path_for(search_id, results_hash), 'cached': False}, 'success')
+        
+        # Le rapport est envoyé au fil du rendu tout en étant enregistré dans le cache
+        response = Response(
+            stream_with_context(report_cache.stream(search_id, results_hash, report_data)),
+            mimetype='text/html'
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        return response
     
     except Exception as e:
         logger.error(f"Erreur lors de la génération du rapport: {str(e)}")
@@ -559,28 +590,33 @@ def generate_report(search_id):
 
 # Route pour l'historique des recherches
 @api_bp.route('/history', methods=['GET'])
-@jwt_required()
+@auth_required()
+@use_replica
 def search_history():
     """Route pour récupérer l'historique des recherches de l'utilisateur"""
     # Récupérer l'identité de l'utilisateur connecté
-    current_user_id = get_jwt_identity()
+    current_user_id = get_current_user_id()
     
-    # Paramètres de pagination
-    page = request.args.get('page', 1, type=int)
+    # Paramètres de pagination (curseur renvoyé par la page précédente)
+    cursor = request.args.get('cursor')
     per_page = request.args.get('per_page', 10, type=int)
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
     
     # Limiter le nombre de résultats par page
-    per_page = min(per_page, 50)
+    per_page = max(1, min(per_page, 50))
     
     try:
         # Récupérer l'historique de recherche
-        history = SearchHistory.query.filter_by(user_id=current_user_id).order_by(
-            SearchHistory.created_at.desc()
-        ).paginate(page=page, per_page=per_page)
+        query = SearchHistory.query.filter_by(user_id=current_user_id)
+        
+        try:
+            history, next_cursor = keyset_page(query, SearchHistory, per_page, cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
         # Formater les résultats
         results = []
-        for item in history.items:
+        for item in history:
             results.append({
                 'id': str(item.id),
                 'search_type': item.search_type,
@@ -590,14 +626,19 @@ def search_history():
                 'execution_time': item.execution_time
             })
         
+        pagination = {
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+        
+        # Total facultatif, estimé par le planificateur (pas de COUNT(*) à chaque page)
+        if include_total:
+            pagination['total_estimate'] = approximate_count(db.session, query)
+        
         return jsonify({
             'history': results,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': history.total,
-                'pages': history.pages
-            }
+            'pagination': pagination
         }), 200
     
     except Exception as e:
@@ -606,3 +647,77 @@ def search_history():
             "error": "Erreur lors de la récupération de l'historique",
             "details": str(e)
         }), 500
+
+# Route pour rechercher dans les résultats des recherches passées
+@api_bp.route('/history/search', methods=['GET'])
+@auth_required()
+def search_history_results():
+    """Route pour retrouver une URL, un nom d'utilisateur ou un email dans l'historique"""
+    # Récupérer l'identité de l'utilisateur connecté
+    current_user_id = get_current_user_id()
+    
+    query = request.args.get('q', '').strip()
+    field = request.args.get('field')
+    size = max(1, min(request.args.get('size', 20, type=int), 100))
+    
+    if not query:
+        return jsonify({"error": "Paramètre 'q' requis"}), 400
+    
+    if field and field not in ('url', 'username', 'email'):
+        return jsonify({"error": "Champ non valide (url, username ou email)"}), 400
+    
+    if not search_indexer.enabled:
+        return jsonify({"error": "Indexation Elasticsearch désactivée"}), 503
+    
+    try:
+        results = search_indexer.search(current_user_id, query, field, size)
+        
+        return jsonify({
+            'query': query,
+            'field': field,
+            'results': results,
+            'count': len(results)
+        }), 200
+    
+    except Exception as e:
+        logger.error(f"Erreur lors de la recherche dans l'historique: {str(e)}")
+        return jsonify({
+            "error": "Erreur lors de la recherche dans l'historique",
+            "details": str(e)
+        }), 500
+
+# Route pour exporter l'historique et les résultats
+@api_bp.route('/history/export', methods=['GET'])
+@auth_required()
+@use_replica
+def export_history():
+    """Route pour exporter l'historique des recherches et leurs résultats (NDJSON, CSV ou Parquet)"""
+    # Récupérer l'identité de l'utilisateur connecté
+    current_user_id = get_current_user_id()
+    
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Format non valide ({', '.join(EXPORT_FORMATS)})"}), 400
+    
+    if export_format == 'parquet' and not parquet_available():
+        return jsonify({"error": "Export Parquet indisponible (pyarrow non installé)"}), 501
+    
+    # Période facultative (dates ISO 8601)
+    try:
+        since = datetime.fromisoformat(request.args['since']) if request.args.get('since') else None
+        until = datetime.fromisoformat(request.args['until']) if request.args.get('until') else None
+    except ValueError:
+        return jsonify({"error": "Dates non valides (format ISO 8601 attendu)"}), 400
+    
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    download_name = f"historique_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    
+    audit_log(current_user_id, 'history_export', 'history/export', request.remote_addr, {'format': export_format, 'since': request.args.get('since'), 'until': request.args.get('until')}, 'success')
+    
+    # Les lignes sont lues et envoyées par lots, au fil de l'export
+    response = Response(
+        stream_with_context(stream_export(export_format, current_user_id, since, until)),
+        mimetype=mimetype
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+    return response
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Tests de l'agrégation incrémentale
+Des états construits séparément (un par worker) doivent donner le même
+agrégat quels que soient l'ordre et le regroupement de leurs fusions.
+"""
+
+import itertools
+
+import pytest
+
+from modules.data_aggregator import IncrementalAggregator
+
+
+NAME = 'Jean Dupont'
+
+# Résultats partiels dont les éléments se recoupent sous des formes d'URL différentes
+PARTIALS = [
+    ('image_search', {'google': {'similar_images': [
+        {'url': 'http://www.photos.example/jd.jpg?utm_source=g', 'page_url': 'https://blog.example/a'},
+        {'url': 'https://cdn.example/1.png', 'page_url': None}
+    ]}}),
+    ('image_search', {'yandex': {'similar_images': [
+        {'url': 'https://photos.example/jd.jpg', 'page_url': 'https://news.example/b'},
+        {'url': 'https://cdn.example/2.png'}
+    ]}}),
+    ('image_search', {'tineye': {'similar_images': [
+        {'url': 'https://m.photos.example/jd.jpg/', 'page_url': None},
+        {'url': 'https://cdn.example/1.png', 'page_url': 'https://forum.example/c'}
+    ]}}),
+    ('social_media', {'profiles': {
+        'twitter': [{'url': 'https://twitter.com/jdupont?ref_src=x', 'name': 'Jean D.'}],
+        'linkedin': [{'url': 'https://www.linkedin.com/in/jdupont/', 'name': 'Jean Dupont', 'description': 'Développeur à Paris'}]
+    }}),
+    ('social_media', {'profiles': {
+        'twitter': [{'url': 'https://mobile.twitter.com/jdupont', 'name': 'Jean Dupont', 'description': 'based in paris'}]
+    }}),
+    ('email_search', {'emails': [{'value': 'JD@example.com', 'confidence': 40}], 'organization': 'Example'}),
+    ('email_search', {'emails': [{'value': 'jd@example.com', 'confidence': 90}]})
+]
+
+
+def build(partials):
+    aggregator = IncrementalAggregator(NAME)
+    for source, partial in partials:
+        aggregator.add(source, partial)
+    return aggregator
+
+
+def merged(states):
+    """
+    Fusionne des états sérialisés dans l'ordre donné
+    """
+    aggregator = IncrementalAggregator.from_dict(states[0])
+    for state in states[1:]:
+        aggregator.merge(state)
+    return aggregator
+
+
+def comparable(aggregator):
+    state = aggregator.to_dict()
+    state.pop('updated_at')
+    return state
+
+
+@pytest.fixture(scope='module')
+def worker_states():
+    # Un état par résultat partiel, comme si chaque moteur avait répondu à un worker différent
+    return [build([partial]).to_dict() for partial in PARTIALS]
+
+
+def test_merge_order_does_not_matter(worker_states):
+    first, second = worker_states[0], worker_states[1]
+    assert comparable(merged([first, second])) == comparable(merged([second, first]))
+
+
+def test_all_merge_orders_give_the_same_state(worker_states):
+    reference = comparable(merged(worker_states))
+    for order in itertools.islice(itertools.permutations(worker_states), 0, None, 97):
+        assert comparable(merged(list(order))) == reference
+
+
+def test_merge_grouping_does_not_matter(worker_states):
+    left = merged([merged(worker_states[:3]).to_dict(), merged(worker_states[3:]).to_dict()])
+    right = merged([merged(worker_states[::2]).to_dict(), merged(worker_states[1::2]).to_dict()])
+    assert comparable(left) == comparable(right) == comparable(merged(worker_states))
+
+
+def test_merged_state_matches_single_aggregator(worker_states):
+    assert comparable(merged(worker_states)) == comparable(build(PARTIALS))
+
+
+def test_duplicates_are_merged_deterministically(worker_states):
+    state = merged(list(reversed(worker_states))).to_dict()
+
+    images = {image['url']: image for image in state['images']}
+    photo = images['http://www.photos.example/jd.jpg?utm_source=g']
+    assert photo['sources'] == ['google', 'tineye', 'yandex']
+    assert photo['source'] == 'google'
+    assert photo['page_url'] == 'https://blog.example/a'
+    assert images['https://cdn.example/1.png']['page_url'] == 'https://forum.example/c'
+    assert len(state['images']) == 3
+
+    twitter, = state['social_profiles']['twitter']
+    assert twitter['url'] == 'https://mobile.twitter.com/jdupont'
+    assert twitter['description'] == 'based in paris'
+
+    email, = state['emails']
+    assert email['address'] == 'JD@example.com'
+    assert email['confidence'] == 90
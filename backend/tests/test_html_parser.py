@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Tests de l'analyse des pages de résultats
+Chaque parseur disponible, restreint ou non aux conteneurs de résultats, doit
+extraire les mêmes résultats que BeautifulSoup avec html.parser sur toute la
+page (pages de benchmarks/fixtures/ et conteneurs imbriqués).
+"""
+
+import os
+
+import pytest
+
+from utils.html_parser import available_parsers, parse_html
+from utils.result_pages import parse_google_images, parse_yandex_images, parse_tineye, parse_google_results
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+# Page enregistrée -> fonction d'extraction
+PAGES = {
+    'google_images.html': parse_google_images,
+    'yandex_images.html': parse_yandex_images,
+    'tineye.html': parse_tineye,
+    'google_search.html': parse_google_results
+}
+
+# Conteneurs de résultats imbriqués (#islrg dans #search, .sidebar-domains dans .results...)
+NESTED_PAGES = {
+    'google_images': (parse_google_images, """
+        <html><body><div id="search">
+          <div class="Psd1Cc"><a class="KjWMVd" href="https://site.example/a"><span class="MLSGY">Site A</span></a></div>
+          <div id="topstuff"><div class="fKDtNb">jean dupont</div></div>
+          <div id="islrg">
+            <div class="isv-r"><a href="https://site.example/p"><img class="Q4LuWd" src="https://img.example/1.jpg"></a></div>
+          </div>
+        </div></body></html>
+    """),
+    'yandex_images': (parse_yandex_images, """
+        <html><body><div class="serp-list">
+          <div class="serp-item"><a class="serp-item__link" href="https://site.example/b"><span class="serp-item__title">B</span></a></div>
+          <div class="cbir-recognition"><div class="cbir-recognition__group">
+            <span class="cbir-recognition__group-title">Personnes</span><span class="cbir-recognition__label">Jean</span>
+          </div></div>
+        </div></body></html>
+    """),
+    'tineye': (parse_tineye, """
+        <html><body><div class="results">
+          <div class="matches"><strong>1,204</strong></div>
+          <div class="match-row"><div class="match-img"><img src="https://img.example/t.jpg"></div>
+            <div class="match-details"><div class="item-link"><a href="https://site.example/c">c</a></div></div></div>
+          <div class="sidebar-domains"><div class="domain-link"><span class="domain-name">site.example</span><span class="domain-count">(3)</span></div></div>
+        </div></body></html>
+    """),
+    'google_search': (parse_google_results, """
+        <html><body><div id="search"><div id="search">
+          <div class="g"><a href="https://www.linkedin.com/in/jdupont"><h3>Jean Dupont</h3></a></div>
+        </div></div></body></html>
+    """)
+}
+
+
+def read_fixture(page):
+    with open(os.path.join(FIXTURES_DIR, page), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('scoped', [True, False])
+@pytest.mark.parametrize('parser', available_parsers())
+@pytest.mark.parametrize('page', sorted(PAGES))
+def test_fixture_results_match_reference(page, parser, scoped):
+    extract = PAGES[page]
+    html = read_fixture(page)
+    expected = extract(html, parser='html.parser', scoped=False)
+    assert any(expected.values()) if isinstance(expected, dict) else expected
+    assert extract(html, parser=parser, scoped=scoped) == expected
+
+
+@pytest.mark.parametrize('parser', available_parsers())
+@pytest.mark.parametrize('name', sorted(NESTED_PAGES))
+def test_nested_containers_are_not_duplicated(name, parser):
+    extract, html = NESTED_PAGES[name]
+    expected = extract(html, parser='html.parser', scoped=False)
+    assert extract(html, parser=parser, scoped=True) == expected
+
+
+@pytest.mark.parametrize('parser', available_parsers())
+@pytest.mark.parametrize('scope', ['#search, #islrg', 'div#search, div#islrg'])
+def test_nested_scope_keeps_outermost_container(parser, scope):
+    html = '<div id="search"><div id="islrg"><p class="r">1</p></div><p class="r">2</p></div><p class="r">3</p>'
+    document = parse_html(html, scope, parser)
+    assert [node.get_text() for node in document.select('.r')] == ['1', '2']
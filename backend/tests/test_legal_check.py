@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Tests de la vérification de conformité
+Les règles compilées doivent rendre la même décision et le même motif de rejet
+que la vérification d'origine (une recherche par mot-clé puis par motif, dans
+l'ordre des règles).
+"""
+
+import re
+import random
+
+import pytest
+
+from utils.legal_check import (
+    PolicyEngine, SENSITIVE_KEYWORDS, REGEX_PATTERNS, ALLOWED_BY_USE_CASE, violation_reason
+)
+
+
+class RulesConfig:
+    """Configuration minimale du moteur de règles"""
+    LEGAL_RULES_FILE = None  # legal_rules.json du dépôt
+    LEGAL_RULES_RELOAD_INTERVAL = 3600
+
+
+def legacy_check(text, use_case):
+    """
+    Vérification d'origine (avant la compilation des règles)
+    Returns:
+        tuple: (is_compliant, reason)
+    """
+    for keyword in SENSITIVE_KEYWORDS:
+        if re.search(r'\b' + re.escape(keyword) + r'\b', text.lower()):
+            return False, f"Détection d'un mot-clé sensible: '{keyword}'"
+
+    for pattern_name, pattern in REGEX_PATTERNS.items():
+        if re.findall(pattern, text):
+            if use_case == 'identity_verification' and pattern_name in ['email', 'phone']:
+                continue
+            return False, f"Détection d'information sensible de type {pattern_name}"
+
+    return True, "Conforme"
+
+
+def compiled_check(engine, text, use_case):
+    """
+    Décision et motif des règles compilées (comme check_ethical_compliance)
+    """
+    violations = engine.find_violations(text, use_case)
+    if not violations:
+        return True, "Conforme"
+    return False, violation_reason(violations[0])
+
+
+def random_text(rng):
+    """
+    Construit un texte mêlant mots, mots-clés et informations personnelles,
+    souvent collés ou chevauchants
+    """
+    digits = lambda n: ''.join(rng.choice('0123456789') for _ in range(n))
+    pieces = [
+        lambda: rng.choice(['jean', 'dupont', 'paris', 'company', 'Ex', 'expert', 'spying', 'wife.', 'HACK']),
+        lambda: rng.choice(SENSITIVE_KEYWORDS),
+        lambda: f"{rng.choice(['a', 'j.doe', 'x_1'])}@{rng.choice(['b', 'mail'])}.{rng.choice(['com', 'fr', 'io'])}",
+        lambda: rng.choice(['', '+33 ', '(']) + digits(3) + rng.choice(['', '-', '.', ' ', ') ']) + digits(3) + rng.choice(['', '-', ' ']) + digits(4),
+        lambda: f"{digits(3)}-{digits(2)}-{digits(4)}",
+        lambda: rng.choice(['-', ' ', '']).join(digits(4) for _ in range(4)),
+        lambda: digits(rng.randint(1, 12)),
+        lambda: rng.choice(['-', '.', '@', ' ', '(', ')', '+'])
+    ]
+    return rng.choice(['', ' ']).join(rng.choice(pieces)() for _ in range(rng.randint(1, 6)))
+
+
+def dense_text(rng):
+    """
+    Construit un texte de fragments de chiffres et de séparateurs collés, où
+    les correspondances des motifs se chevauchent
+    """
+    fragments = ['1', '12', '123', '1234', '-', ' ', '.', '(', ')', '+', 'a', '@b.co', 'x.']
+    return ''.join(rng.choice(fragments) for _ in range(rng.randint(3, 14)))
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return PolicyEngine(RulesConfig())
+
+
+def test_repository_rules_match_defaults(engine):
+    rules = engine.rules()
+    assert list(rules.patterns) == list(REGEX_PATTERNS)
+    assert rules.keywords == SENSITIVE_KEYWORDS
+    assert {use_case: set(names) for use_case, names in rules.allowed.items()} == {
+        use_case: set(names) for use_case, names in ALLOWED_BY_USE_CASE.items()
+    }
+
+
+@pytest.mark.parametrize('text, use_case, expected', [
+    ('a@b.com 4111-1111-1111-1111', None, "Détection d'information sensible de type email"),
+    ('x 5551234567 123-45-6789', None, "Détection d'information sensible de type phone"),
+    ('123)1234123@b.co', None, "Détection d'information sensible de type email"),
+    ('a@b.com 4111-1111-1111-1111', 'identity_verification', "Détection d'information sensible de type credit_card"),
+    ('mon ex a@b.com', 'identity_verification', "Détection d'un mot-clé sensible: 'ex'"),
+    ('jean dupont', None, "Conforme"),
+])
+def test_reason_examples(engine, text, use_case, expected):
+    assert compiled_check(engine, text, use_case)[1] == expected
+
+
+@pytest.mark.parametrize('generate', [random_text, dense_text])
+@pytest.mark.parametrize('use_case', [None, 'identity_verification', 'pentest'])
+def test_matches_legacy_check(engine, generate, use_case):
+    rng = random.Random(f"{generate.__name__}-{use_case}")
+    for _ in range(20000):
+        text = generate(rng)
+        assert compiled_check(engine, text, use_case) == legacy_check(text, use_case), text
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Tests de la pagination par curseur
+Le curseur doit restituer la position encodée, un curseur invalide doit lever
+ValueError (la route répond 400), et le parcours des pages avec keyset_page
+doit rendre chaque élément une seule fois, y compris à created_at égal
+(départage par id). Les pages sont parcourues sur SQLite.
+"""
+
+import base64
+import datetime
+import json
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, Column, DateTime, Integer, Uuid
+from sqlalchemy.orm import declarative_base, Session
+
+from utils.pagination import encode_cursor, decode_cursor, keyset_page
+
+
+Base = declarative_base()
+
+
+class Item(Base):
+    """Élément paginé (mêmes colonnes de tri que SearchHistory)"""
+    __tablename__ = 'items'
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    created_at = Column(DateTime, nullable=False)
+    user_id = Column(Integer, nullable=False)
+
+
+START = datetime.datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _add_items(session, dates, user_id=1):
+    items = [Item(id=uuid.uuid4(), created_at=created_at, user_id=user_id) for created_at in dates]
+    session.add_all(items)
+    session.commit()
+    return items
+
+
+def _all_pages(session, per_page, user_id=1):
+    query = session.query(Item).filter_by(user_id=user_id)
+    pages, cursor = [], None
+    while True:
+        items, cursor = keyset_page(query, Item, per_page, cursor)
+        pages.append(items)
+        if cursor is None:
+            return pages
+
+
+def _expected_order(items):
+    return [item.id for item in sorted(items, key=lambda item: (item.created_at, item.id), reverse=True)]
+
+
+@pytest.mark.parametrize('created_at', [START, START.replace(microsecond=123456),
+                                        datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)])
+def test_cursor_round_trip(created_at):
+    item_id = uuid.uuid4()
+    cursor = encode_cursor(created_at, item_id)
+    assert decode_cursor(cursor) == (created_at, item_id)
+    assert '=' not in cursor
+
+
+def _b64(payload):
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+@pytest.mark.parametrize('cursor', [
+    '',
+    'x',
+    '!!!!',
+    'é',
+    _b64('not json'),
+    _b64(json.dumps({'created_at': START.isoformat()})),
+    _b64(json.dumps([START.isoformat()])),
+    _b64(json.dumps([START.isoformat(), str(uuid.uuid4()), 'extra'])),
+    _b64(json.dumps(['hier', str(uuid.uuid4())])),
+    _b64(json.dumps([START.isoformat(), 'pas-un-uuid'])),
+    _b64(json.dumps([None, None])),
+])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_page_rejects_malformed_cursor(session):
+    _add_items(session, [START])
+    with pytest.raises(ValueError):
+        keyset_page(session.query(Item), Item, 10, 'invalide')
+
+
+@pytest.mark.parametrize('per_page', [1, 2, 3, 7, 20])
+def test_pages_cover_all_items_once(session, per_page):
+    items = _add_items(session, [START + datetime.timedelta(minutes=i) for i in range(20)])
+    pages = _all_pages(session, per_page)
+
+    assert [item.id for page in pages for item in page] == _expected_order(items)
+    assert all(len(page) == per_page for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= per_page
+
+
+@pytest.mark.parametrize('per_page', [1, 2, 4, 5])
+def test_equal_created_at_tie_break_by_id(session, per_page):
+    # Plusieurs éléments par date : la limite de page tombe au milieu d'un groupe
+    dates = [START] * 5 + [START + datetime.timedelta(seconds=1)] * 3 + [START - datetime.timedelta(seconds=1)] * 4
+    items = _add_items(session, dates)
+    pages = _all_pages(session, per_page)
+
+    seen = [item.id for page in pages for item in page]
+    assert seen == _expected_order(items)
+    assert len(set(seen)) == len(items)
+
+
+def test_last_page_has_no_cursor(session):
+    _add_items(session, [START + datetime.timedelta(minutes=i) for i in range(4)])
+    query = session.query(Item)
+
+    items, cursor = keyset_page(query, Item, 4)
+    assert len(items) == 4
+    assert cursor is None
+
+    items, cursor = keyset_page(query, Item, 3)
+    assert len(items) == 3
+    items, cursor = keyset_page(query, Item, 3, cursor)
+    assert len(items) == 1
+    assert cursor is None
+
+
+def test_empty_query(session):
+    assert keyset_page(session.query(Item), Item, 10) == ([], None)
+
+
+def test_cursor_respects_query_filter(session):
+    mine = _add_items(session, [START + datetime.timedelta(minutes=i) for i in range(5)], user_id=1)
+    _add_items(session, [START + datetime.timedelta(minutes=i, seconds=30) for i in range(5)], user_id=2)
+
+    pages = _all_pages(session, 2, user_id=1)
+    assert [item.id for page in pages for item in page] == _expected_order(mine)
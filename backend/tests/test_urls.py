@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Tests de la canonicalisation et du dédoublonnage des URL
+Les variantes d'une même ressource (schéma, préfixe d'hôte, port par défaut,
+/ final, paramètres de suivi, ordre des paramètres) doivent avoir la même
+forme canonique, et la fusion des doublons ne doit pas dépendre de leur ordre.
+"""
+
+import itertools
+
+import pytest
+
+from utils.urls import canonicalize_url, merge_duplicate
+
+
+# URL -> forme canonique attendue
+CANONICAL_CASES = [
+    # Schéma
+    ('http://example.com/a', 'https://example.com/a'),
+    ('https://example.com/a', 'https://example.com/a'),
+    ('HTTPS://Example.COM/a', 'https://example.com/a'),
+    ('//example.com/a', 'https://example.com/a'),
+    # Préfixes d'hôte
+    ('https://www.example.com/a', 'https://example.com/a'),
+    ('https://m.example.com/a', 'https://example.com/a'),
+    ('https://mobile.example.com/a', 'https://example.com/a'),
+    ('https://mbasic.facebook.com/jdupont', 'https://facebook.com/jdupont'),
+    ('https://www.m.example.com/a', 'https://example.com/a'),
+    ('https://www.example.co/a', 'https://example.co/a'),
+    ('https://m.co/a', 'https://m.co/a'),
+    ('https://www.com/a', 'https://www.com/a'),
+    ('https://example.com./a', 'https://example.com/a'),
+    # Ports
+    ('http://example.com:80/a', 'https://example.com/a'),
+    ('https://example.com:443/a', 'https://example.com/a'),
+    ('https://example.com:8080/a', 'https://example.com:8080/a'),
+    # Chemin
+    ('https://example.com/a/', 'https://example.com/a'),
+    ('https://example.com/', 'https://example.com'),
+    ('https://example.com', 'https://example.com'),
+    ('https://example.com//a///b/', 'https://example.com/a/b'),
+    ('https://example.com/caf%C3%A9', 'https://example.com/caf%C3%A9'),
+    ('https://example.com/café', 'https://example.com/caf%C3%A9'),
+    # Paramètres de suivi
+    ('https://example.com/a?utm_source=x&utm_medium=y', 'https://example.com/a'),
+    ('https://example.com/a?fbclid=abc', 'https://example.com/a'),
+    ('https://example.com/a?id=1&gclid=abc&UTM_Campaign=z', 'https://example.com/a?id=1'),
+    ('https://instagram.com/p/x/?igshid=abc', 'https://instagram.com/p/x'),
+    # Ordre des paramètres
+    ('https://example.com/a?b=2&a=1', 'https://example.com/a?a=1&b=2'),
+    ('https://example.com/a?a=1&b=2', 'https://example.com/a?a=1&b=2'),
+    ('https://example.com/a?q=', 'https://example.com/a?q='),
+    # Fragment
+    ('https://example.com/a#section', 'https://example.com/a'),
+    # Espaces
+    ('  https://example.com/a  ', 'https://example.com/a'),
+]
+
+# Entrées qui ne sont pas des URL http(s)
+INVALID_CASES = [None, 42, '', 'example.com/a', 'ftp://example.com/a', 'mailto:jd@example.com',
+                 'javascript:void(0)', 'https://', 'http://[::1/a']
+
+# Groupes de variantes d'une même ressource
+EQUIVALENT_GROUPS = [
+    ['http://www.example.com/profile/', 'https://example.com/profile',
+     'https://m.example.com:443/profile?utm_source=twitter', 'https://EXAMPLE.com//profile#top'],
+    ['https://example.com/search?q=jean&page=2', 'http://www.example.com/search?page=2&q=jean&fbclid=1'],
+]
+
+
+@pytest.mark.parametrize('url, expected', CANONICAL_CASES)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize('url', INVALID_CASES)
+def test_canonicalize_url_rejects_non_http(url):
+    assert canonicalize_url(url) is None
+
+
+@pytest.mark.parametrize('group', EQUIVALENT_GROUPS)
+def test_canonicalize_url_equivalent_variants(group):
+    assert len({canonicalize_url(url) for url in group}) == 1
+
+
+@pytest.mark.parametrize('url, expected', CANONICAL_CASES)
+def test_canonicalize_url_is_idempotent(url, expected):
+    assert canonicalize_url(expected) == expected
+
+
+# Doublons d'un même résultat, chacun avec sa source
+DUPLICATES = [
+    {'url': 'https://example.com/a', 'title': 'Jean Dupont', 'snippet': '', 'source': 'google'},
+    {'url': 'http://www.example.com/a/', 'title': None, 'snippet': 'Profil de Jean', 'source': 'bing'},
+    {'url': 'https://m.example.com/a', 'title': 'Jean P. Dupont', 'source': 'yandex'},
+]
+
+
+def _merge_all(items):
+    entry = dict(items[0], sources=[items[0]['source']])
+    for item in items[1:]:
+        merge_duplicate(entry, item)
+    return entry
+
+
+def test_merge_duplicate_fills_missing_fields():
+    entry = _merge_all(DUPLICATES)
+    assert entry['title'] == 'Jean Dupont'
+    assert entry['snippet'] == 'Profil de Jean'
+    assert entry['sources'] == ['bing', 'google', 'yandex']
+
+
+@pytest.mark.parametrize('order', list(itertools.permutations(range(len(DUPLICATES)))))
+def test_merge_duplicate_order_independent(order):
+    assert _merge_all([DUPLICATES[i] for i in order]) == _merge_all(DUPLICATES)
+
+
+def test_merge_duplicate_merges_partial_states():
+    # Deux états partiels déjà fusionnés, réunis dans un sens puis dans l'autre
+    left = _merge_all(DUPLICATES[:2])
+    right = _merge_all(DUPLICATES[2:])
+    first = dict(left, sources=list(left['sources']))
+    merge_duplicate(first, right)
+    second = dict(right, sources=list(right['sources']))
+    merge_duplicate(second, left)
+    assert first == second
+    assert first['sources'] == ['bing', 'google', 'yandex']
+
+
+def test_merge_duplicate_without_source():
+    entry = {'url': 'https://example.com/a', 'sources': ['google']}
+    merge_duplicate(entry, {'url': 'https://example.com/a', 'title': 'A'})
+    assert entry == {'url': 'https://example.com/a', 'title': 'A', 'sources': ['google']}
+
+
+def test_merge_duplicate_custom_source_key():
+    entry = {'url': 'https://example.com/a', 'engine': 'google', 'sources': ['google']}
+    merge_duplicate(entry, {'url': 'https://example.com/a', 'engine': 'bing'}, source_key='engine')
+    assert entry['sources'] == ['bing', 'google']
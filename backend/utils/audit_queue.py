@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - File d'écriture différée des logs d'audit
+Les enregistrements d'audit sont placés dans une file mémoire bornée puis
+insérés par lots depuis un thread d'arrière-plan, hors du chemin de latence
+des requêtes. Les enregistrements qui ne peuvent pas être écrits (file pleine,
+base indisponible) sont déversés dans un fichier local et rejoués ensuite.
+Un enregistrement rejeté par la base (contrainte, valeur invalide) est isolé
+par bissection du lot et mis en quarantaine, sans bloquer le reste du lot.
+"""
+
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import datetime
+import threading
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, DataError
+
+from models import db, AuditLog
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Colonnes à reconvertir lors de la relecture du fichier de déversement
+UUID_FIELDS = ('id', 'user_id')
+DATETIME_FIELDS = ('created_at', 'updated_at')
+
+# Intervalle entre deux tentatives de rejeu du fichier de déversement (en secondes)
+SPILL_REPLAY_INTERVAL = 60
+
+class AuditQueue:
+    """File d'audit à écriture différée et par lots"""
+
+    def __init__(self, app=None):
+        """
+        Initialise la file d'audit
+        Args:
+            app: Application Flask (facultatif, voir init_app)
+        """
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configure la file pour une application Flask
+        Args:
+            app: Application Flask
+        """
+        self.app = app
+        self.batch_size = app.config['AUDIT_BATCH_SIZE']
+        self.flush_interval = app.config['AUDIT_FLUSH_INTERVAL']
+        self.spill_file = app.config['AUDIT_SPILL_FILE'] or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'audit_spill.jsonl'
+        )
+        self.rejected_file = f"{os.path.splitext(self.spill_file)[0]}_rejected.jsonl"
+        os.makedirs(os.path.dirname(self.spill_file), exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=app.config['AUDIT_QUEUE_SIZE'])
+        app.extensions['audit_queue'] = self
+        atexit.register(self.shutdown)
+
+    def enqueue(self, record):
+        """
+        Ajoute un enregistrement d'audit à la file (non bloquant)
+        Args:
+            record: Enregistrement (voir AuditLog.build_record)
+        """
+        self._ensure_worker()
+
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            logger.warning("File d'audit pleine, enregistrement déversé sur disque")
+            self._spill([record])
+
+    def _ensure_worker(self):
+        """
+        Démarre le thread d'écriture dans le processus courant
+
+        Le démarrage est différé jusqu'au premier enregistrement : un thread
+        créé avant le fork des workers gunicorn n'existerait pas dans ces
+        derniers.
+        """
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+
+        with self._start_lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+
+            if self._pid != os.getpid():
+                # Processus enfant : repartir d'une file vide
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._stop = threading.Event()
+
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """
+        Boucle du thread d'écriture : rejoue le déversement puis écrit par lots
+        """
+        self._replay_spill()
+        next_replay = time.monotonic() + SPILL_REPLAY_INTERVAL
+
+        while not self._stop.is_set():
+            batch = self._next_batch(self.flush_interval)
+            if batch:
+                self._flush(batch)
+            elif time.monotonic() >= next_replay:
+                # File au repos : reprendre ce qui a été déversé pendant une indisponibilité
+                self._replay_spill()
+                next_replay = time.monotonic() + SPILL_REPLAY_INTERVAL
+
+    def _next_batch(self, timeout):
+        """
+        Attend un premier enregistrement puis vide la file jusqu'à la taille de lot
+        """
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch):
+        """
+        Insère un lot d'enregistrements en une seule instruction
+
+        Si la base rejette le lot (IntegrityError, DataError), il est coupé en
+        deux et chaque moitié réessayée : seuls les enregistrements fautifs sont
+        mis en quarantaine. Les autres erreurs (base indisponible) déversent le
+        lot sur disque pour un rejeu ultérieur.
+        Returns:
+            int: Nombre d'enregistrements écrits
+        """
+        try:
+            with self.app.app_context():
+                try:
+                    db.session.execute(insert(AuditLog), batch)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+            return len(batch)
+        except (IntegrityError, DataError) as e:
+            if len(batch) == 1:
+                logger.error(f"Log d'audit rejeté par la base, mis en quarantaine: {str(e.orig)}")
+                self._spill(batch, self.rejected_file)
+                return 0
+            middle = len(batch) // 2
+            return self._flush(batch[:middle]) + self._flush(batch[middle:])
+        except Exception as e:
+            logger.error(f"Erreur lors de l'écriture des logs d'audit: {str(e)}")
+            self._spill(batch)
+            return 0
+
+    def _spill(self, records, path=None):
+        """
+        Ajoute des enregistrements au fichier de déversement (JSON Lines)
+        Args:
+            records: Enregistrements
+            path: Fichier cible (par défaut: fichier de déversement, rejoué)
+        """
+        lines = ''.join(json.dumps(record, default=str) + '\n' for record in records)
+        try:
+            with self._spill_lock, open(path or self.spill_file, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except Exception as e:
+            logger.error(f"Impossible de déverser {len(records)} logs d'audit: {str(e)}")
+
+    def _replay_spill(self):
+        """
+        Rejoue les enregistrements déversés par ce processus ou un précédent
+        """
+        replay_file = f"{self.spill_file}.{os.getpid()}.replay"
+        try:
+            with self._spill_lock:
+                os.rename(self.spill_file, replay_file)
+        except OSError:
+            return  # Rien à rejouer (ou déjà repris par un autre worker)
+
+        records = []
+        with open(replay_file, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(self._decode(line))
+                except ValueError as e:
+                    # Ligne illisible (écriture interrompue) : la conserver sans bloquer le rejeu
+                    logger.error(f"Log d'audit déversé illisible, mis en quarantaine: {str(e)}")
+                    with self._spill_lock, open(self.rejected_file, 'a', encoding='utf-8') as rejected:
+                        rejected.write(line if line.endswith('\n') else line + '\n')
+
+        written = 0
+        for start in range(0, len(records), self.batch_size):
+            written += self._flush(records[start:start + self.batch_size])
+
+        os.remove(replay_file)
+        logger.info(f"{written}/{len(records)} logs d'audit déversés ont été rejoués")
+
+    @staticmethod
+    def _decode(line):
+        """
+        Reconvertit un enregistrement relu depuis le fichier de déversement
+        """
+        record = json.loads(line)
+        for field in UUID_FIELDS:
+            if record.get(field):
+                record[field] = uuid.UUID(str(record[field]))
+        for field in DATETIME_FIELDS:
+            if record.get(field):
+                record[field] = datetime.datetime.fromisoformat(record[field])
+        return record
+
+    def shutdown(self, timeout=5.0):
+        """
+        Arrête le thread d'écriture et écrit les enregistrements restants
+        Args:
+            timeout: Temps maximal d'attente du thread (en secondes)
+        """
+        if self._queue is None or self._pid != os.getpid():
+            return
+
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        for start in range(0, len(remaining), self.batch_size):
+            self._flush(remaining[start:start + self.batch_size])
+
+        if remaining:
+            logger.info(f"{len(remaining)} logs d'audit écrits à l'arrêt")
+
+
+# File partagée par l'application (voir init_app dans create_app)
+audit_queue = AuditQueue()
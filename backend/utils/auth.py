@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Authentification par clé API et cache des utilisateurs
+Les clients automatisés s'authentifient avec l'en-tête X-API-Key. La
+correspondance clé -> utilisateur (et identifiant -> utilisateur pour les JWT)
+est conservée dans un cache LRU à durée de vie limitée propre à chaque
+processus, pour éviter une requête sur la table users à chaque appel. Une
+rotation de clé ou une désactivation est diffusée à tous les workers par
+Redis (pub/sub) et invalide leurs entrées.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from functools import wraps
+from collections import OrderedDict, namedtuple
+
+from flask import request, jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from sqlalchemy import event, inspect
+
+from config import active_config
+from models import User, RoutingSession
+from utils.request_context import get_request_context
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# En-tête portant la clé API
+API_KEY_HEADER = 'X-API-Key'
+
+# Canal Redis des invalidations (message: identifiant de l'utilisateur)
+INVALIDATION_CHANNEL = 'thewatcher:auth:invalidate'
+
+# Colonnes dont la modification invalide le cache
+AUTH_COLUMNS = ('api_key', 'is_active', 'is_admin')
+
+# Vue d'un utilisateur conservée en cache (pas d'objet ORM lié à une session)
+CachedUser = namedtuple('CachedUser', ('id', 'username', 'is_active', 'is_admin'))
+
+class UserCache:
+    """Cache LRU à durée de vie limitée des utilisateurs authentifiés"""
+
+    def __init__(self, config=None):
+        """
+        Initialise le cache
+        Args:
+            config: Configuration à utiliser (par défaut: active_config)
+        """
+        self.config = config or active_config
+        self.max_size = self.config.AUTH_CACHE_SIZE
+        self.ttl = self.config.AUTH_CACHE_TTL
+
+        self._entries = OrderedDict()  # clé -> (expiration, CachedUser ou None)
+        self._keys_by_user = {}  # identifiant -> clés du cache
+        self._lock = threading.Lock()
+
+        self._listener = None
+        self._listener_pid = None
+        self._stop = threading.Event()
+
+    def get(self, key):
+        """
+        Retourne une entrée valide du cache
+        Returns:
+            tuple: (trouvé, CachedUser ou None)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def put(self, key, user):
+        """
+        Ajoute une entrée (user à None : clé inconnue, mise en cache négative)
+        """
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, user)
+            if user is not None:
+                self._keys_by_user.setdefault(str(user.id), set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        """
+        Retire une entrée et sa référence dans l'index par utilisateur (verrou tenu)
+        """
+        entry = self._entries.pop(key, None)
+        if entry and entry[1] is not None:
+            keys = self._keys_by_user.get(str(entry[1].id))
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[str(entry[1].id)]
+
+    def invalidate_user(self, user_id):
+        """
+        Retire toutes les entrées d'un utilisateur
+        Args:
+            user_id: Identifiant de l'utilisateur
+        """
+        with self._lock:
+            for key in list(self._keys_by_user.get(str(user_id), ())):
+                self._remove(key)
+
+    def clear(self):
+        """
+        Vide le cache
+        """
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def ensure_listener(self):
+        """
+        Démarre l'écoute des invalidations dans le processus courant (après le fork)
+        """
+        if self._listener_pid == os.getpid() and self._listener and self._listener.is_alive():
+            return
+
+        with self._lock:
+            if self._listener_pid == os.getpid() and self._listener and self._listener.is_alive():
+                return
+
+            if self._listener_pid != os.getpid():
+                # Processus enfant : les entrées héritées n'ont pas reçu les invalidations
+                self._entries.clear()
+                self._keys_by_user.clear()
+                self._stop = threading.Event()
+
+            self._listener_pid = os.getpid()
+            self._listener = threading.Thread(target=self._listen, name='auth-invalidation', daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        """
+        Boucle d'écoute du canal d'invalidation, avec reconnexion
+        """
+        import redis
+
+        delay = 1
+        while not self._stop.is_set():
+            try:
+                client = redis.Redis.from_url(self.config.REDIS_URL, socket_connect_timeout=1.0, health_check_interval=30)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+
+                # Des messages ont pu être perdus pendant la déconnexion
+                self.clear()
+                delay = 1
+
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message['type'] == 'message':
+                        self.invalidate_user(message['data'].decode('utf-8'))
+            except Exception as e:
+                logger.error(f"Erreur sur le canal d'invalidation des utilisateurs: {str(e)}")
+                self._stop.wait(delay)
+                delay = min(delay * 2, 30)
+
+
+# Cache partagé par les routes du processus
+user_cache = UserCache()
+
+def _snapshot(user):
+    """
+    Construit la vue en cache d'un utilisateur
+    """
+    return CachedUser(user.id, user.username, user.is_active, user.is_admin)
+
+def _api_key_cache_key(api_key):
+    """
+    Clé de cache d'une clé API (la clé elle-même n'est pas conservée en mémoire)
+    """
+    return 'key:' + hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+def authenticate_api_key(api_key):
+    """
+    Retrouve l'utilisateur d'une clé API, via le cache
+    Args:
+        api_key: Clé API fournie par le client
+    Returns:
+        CachedUser: Utilisateur actif, ou None si la clé est inconnue ou l'utilisateur désactivé
+    """
+    user_cache.ensure_listener()
+    key = _api_key_cache_key(api_key)
+
+    found, user = user_cache.get(key)
+    if not found:
+        record = User.query.filter_by(api_key=api_key).first()
+        user = _snapshot(record) if record else None
+        user_cache.put(key, user)
+
+    return user if user and user.is_active else None
+
+def load_user(user_id):
+    """
+    Retrouve un utilisateur par identifiant, via le cache
+    Args:
+        user_id: Identifiant de l'utilisateur
+    Returns:
+        CachedUser: Utilisateur, ou None s'il n'existe pas
+    """
+    user_cache.ensure_listener()
+    key = f"user:{user_id}"
+
+    found, user = user_cache.get(key)
+    if not found:
+        record = User.query.filter_by(id=user_id).first()
+        user = _snapshot(record) if record else None
+        user_cache.put(key, user)
+
+    return user
+
+def publish_invalidation(user_id):
+    """
+    Invalide les entrées d'un utilisateur dans ce processus et dans les autres workers
+    Args:
+        user_id: Identifiant de l'utilisateur
+    """
+    user_cache.invalidate_user(user_id)
+
+    try:
+        from utils.redis_client import get_redis
+        get_redis().publish(INVALIDATION_CHANNEL, str(user_id))
+    except Exception as e:
+        logger.error(f"Erreur lors de la diffusion de l'invalidation de {user_id}: {str(e)}")
+
+def get_current_user_id():
+    """
+    Retourne l'identifiant de l'utilisateur authentifié (clé API ou JWT)
+    Returns:
+        Identifiant de l'utilisateur, ou None si la requête est anonyme
+    """
+    context = get_request_context()
+    if context.identity_resolved:
+        return context.user_id
+    return get_jwt_identity()
+
+def auth_required(optional=False):
+    """
+    Décorateur d'authentification par clé API (X-API-Key) ou par JWT
+
+    Remplace @jwt_required : l'utilisateur est vérifié (existant et actif)
+    à partir du cache, sans requête en base dans le cas courant.
+    Args:
+        optional: Autoriser les requêtes anonymes
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            context = get_request_context()
+            api_key = request.headers.get(API_KEY_HEADER)
+
+            if api_key:
+                user = authenticate_api_key(api_key)
+                if user is None:
+                    return jsonify({"error": "Clé API non valide"}), 401
+                context.set_identity(user.id, user)
+                return view(*args, **kwargs)
+
+            verify_jwt_in_request(optional=optional)
+            user_id = get_jwt_identity()
+            user = None
+            if user_id is not None:
+                user = load_user(user_id)
+                if user is None or not user.is_active:
+                    return jsonify({"error": "Compte inexistant ou désactivé"}), 401
+
+            context.set_identity(user_id, user)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@event.listens_for(User, 'after_update')
+def _track_auth_changes(mapper, connection, target):
+    """
+    Note les utilisateurs dont la clé API ou le statut a changé
+    """
+    state = inspect(target)
+    if state.session is not None and any(state.attrs[column].history.has_changes() for column in AUTH_COLUMNS):
+        state.session.info.setdefault('auth_invalidations', set()).add(str(target.id))
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _publish_auth_changes(session):
+    """
+    Diffuse les invalidations une fois la modification validée
+    """
+    for user_id in session.info.pop('auth_invalidations', ()):
+        publish_invalidation(user_id)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_auth_changes(session):
+    """
+    Oublie les invalidations d'une transaction annulée
+    """
+    session.info.pop('auth_invalidations', None)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Routage des lectures vers la réplique PostgreSQL
+Les routes en lecture seule lisent sur la réplique lorsqu'elle est configurée
+(DATABASE_REPLICA_URL). Après une écriture propre à un utilisateur (une
+recherche), ses lectures restent sur le primaire pendant REPLICA_STICKY_SECONDS
+afin qu'il retrouve immédiatement ce qu'il vient d'écrire malgré le retard de
+réplication.
+"""
+
+import logging
+from functools import wraps
+
+from flask import g, current_app
+
+from models import REPLICA_BIND
+from utils.redis_client import get_redis
+from utils.auth import get_current_user_id
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Préfixe des clés Redis de maintien sur le primaire
+STICKY_KEY_PREFIX = 'thewatcher:db:sticky:'
+
+def mark_recent_write(user_id):
+    """
+    Maintient les lectures d'un utilisateur sur le primaire après une écriture
+    Args:
+        user_id: Identifiant de l'utilisateur (ignoré si None)
+    """
+    if not user_id or REPLICA_BIND not in current_app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+
+    try:
+        get_redis().set(f"{STICKY_KEY_PREFIX}{user_id}", 1, ex=current_app.config['REPLICA_STICKY_SECONDS'])
+    except Exception as e:
+        logger.error(f"Erreur lors du marquage d'écriture récente: {str(e)}")
+
+def is_sticky(user_id):
+    """
+    Indique si les lectures d'un utilisateur doivent rester sur le primaire
+    
+    En cas d'erreur Redis, le primaire est choisi : une lecture plus coûteuse
+    vaut mieux qu'une lecture périmée.
+    Args:
+        user_id: Identifiant de l'utilisateur
+    Returns:
+        bool: True si l'utilisateur a écrit récemment
+    """
+    if not user_id:
+        return False
+
+    try:
+        return bool(get_redis().exists(f"{STICKY_KEY_PREFIX}{user_id}"))
+    except Exception as e:
+        logger.error(f"Erreur lors de la vérification d'écriture récente: {str(e)}")
+        return True
+
+def use_replica(view):
+    """
+    Décorateur des routes en lecture seule : leurs lectures vont à la réplique
+    
+    À placer sous @auth_required pour que l'identité de l'utilisateur soit connue.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if REPLICA_BIND in current_app.config.get('SQLALCHEMY_BINDS', {}):
+            try:
+                user_id = get_current_user_id()
+            except Exception:
+                user_id = None
+            g.db_use_replica = not is_sticky(user_id)
+        return view(*args, **kwargs)
+    return wrapper
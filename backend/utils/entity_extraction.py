@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Extraction des lieux et des organisations
+Les descriptions de profils et les titres de sites sont analysés par lots avec
+spaCy (nlp.pipe) : le modèle NER est chargé une seule fois par processus (avant
+le fork si les modèles sont préchargés), avec les composants inutiles
+désactivés. Si spaCy ou le modèle ne sont pas installés, l'analyse par mots-clés
+d'origine est utilisée.
+"""
+
+import logging
+import threading
+
+from config import active_config
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Étiquettes NER retenues (modèles anglais : GPE/LOC, français et multilingue : LOC)
+LOCATION_LABELS = {'LOC', 'GPE'}
+ORGANIZATION_LABELS = {'ORG'}
+
+# Composants conservés : la reconnaissance d'entités et ce dont elle dépend
+NLP_KEEP_PIPES = {'tok2vec', 'transformer', 'ner', 'entity_ruler'}
+
+# Analyse par mots-clés (sans spaCy)
+LOCATION_KEYWORDS = ['à', 'in', 'from', 'located', 'based']
+ORGANIZATION_WORDS = ['company', 'inc', 'ltd', 'corporation', 'corp', 'group']
+
+_nlp = None
+_nlp_failed = False
+_lock = threading.Lock()
+
+def load_model(config=None):
+    """
+    Charge le modèle NER du processus, à la première utilisation
+    Args:
+        config: Configuration à utiliser (par défaut: active_config)
+    Returns:
+        Language: Pipeline spaCy, ou None si l'extraction NLP n'est pas disponible
+    """
+    global _nlp, _nlp_failed
+
+    if _nlp is not None or _nlp_failed:
+        return _nlp
+
+    config = config or active_config
+    with _lock:
+        if _nlp is not None or _nlp_failed:
+            return _nlp
+
+        if not config.NLP_ENABLED:
+            _nlp_failed = True
+            return None
+
+        try:
+            import spacy
+            nlp = spacy.load(config.NLP_MODEL)
+            disabled = [name for name in nlp.pipe_names if name not in NLP_KEEP_PIPES]
+            nlp.select_pipes(disable=disabled)
+            _nlp = nlp
+            logger.info(f"Modèle NLP chargé: {config.NLP_MODEL} (composants actifs: {', '.join(nlp.pipe_names)})")
+        except Exception as e:
+            _nlp_failed = True
+            logger.warning(f"Modèle NLP {config.NLP_MODEL} indisponible, analyse par mots-clés utilisée: {str(e)}")
+
+    return _nlp
+
+def _pipe(nlp, texts, labels, batch_size):
+    """
+    Analyse des textes par lots et retourne les entités des étiquettes demandées
+    """
+    results = []
+    for doc in nlp.pipe(texts, batch_size=batch_size):
+        entities = []
+        for ent in doc.ents:
+            value = ent.text.strip()
+            if ent.label_ in labels and value not in entities:
+                entities.append(value)
+        results.append(entities)
+    return results
+
+def keyword_locations(description):
+    """
+    Recherche des lieux après des mots-clés ('à', 'in', 'from'...)
+    Args:
+        description: Texte à analyser
+    Returns:
+        list: Lieux trouvés
+    """
+    locations = []
+    for keyword in LOCATION_KEYWORDS:
+        if f" {keyword} " in f" {description} ":
+            parts = description.split(f" {keyword} ")
+            if len(parts) > 1:
+                location_part = parts[1].split('.')[0].split(',')[0].strip()
+                if len(location_part) > 2 and len(location_part) < 30:
+                    locations.append(location_part)
+    return locations
+
+def keyword_organizations(title):
+    """
+    Retient un titre comme organisation s'il contient un mot caractéristique
+    Args:
+        title: Titre à analyser
+    Returns:
+        list: Le titre, ou une liste vide
+    """
+    if any(word in title.lower() for word in ORGANIZATION_WORDS):
+        return [title]
+    return []
+
+def extract_locations(texts, batch_size=None, config=None):
+    """
+    Extrait les lieux mentionnés dans des descriptions
+    Args:
+        texts: Descriptions à analyser
+        batch_size: Taille des lots (par défaut: NLP_BATCH_SIZE)
+        config: Configuration à utiliser (par défaut: active_config)
+    Returns:
+        list: Lieux trouvés, une liste par texte
+    """
+    config = config or active_config
+    texts = list(texts)
+    nlp = load_model(config) if texts else None
+
+    if nlp is None:
+        return [keyword_locations(text) for text in texts]
+    return _pipe(nlp, texts, LOCATION_LABELS, batch_size or config.NLP_BATCH_SIZE)
+
+def extract_organizations(texts, batch_size=None, config=None):
+    """
+    Extrait les organisations mentionnées dans des titres
+    Args:
+        texts: Titres à analyser
+        batch_size: Taille des lots (par défaut: NLP_BATCH_SIZE)
+        config: Configuration à utiliser (par défaut: active_config)
+    Returns:
+        list: Organisations trouvées, une liste par texte
+    """
+    config = config or active_config
+    texts = list(texts)
+    nlp = load_model(config) if texts else None
+
+    if nlp is None:
+        return [keyword_organizations(text) for text in texts]
+    return _pipe(nlp, texts, ORGANIZATION_LABELS, batch_size or config.NLP_BATCH_SIZE)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Export de l'historique des recherches
+Ce module exporte l'historique d'un utilisateur joint à ses résultats en NDJSON,
+CSV ou Parquet. Les lignes sont lues par un curseur côté serveur (yield_per) en
+colonnes simples, sans objets ORM : la mémoire utilisée ne dépend pas du nombre
+de lignes exportées.
+"""
+
+import io
+import csv
+import json
+import logging
+
+from sqlalchemy import select, and_
+
+from models import db, SearchHistory, SearchResult
+from utils.payload_store import decode_payload
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Colonnes exportées, dans l'ordre
+EXPORT_COLUMNS = (
+    ('search_id', SearchHistory.id),
+    ('search_type', SearchHistory.search_type),
+    ('search_term', SearchHistory.search_term),
+    ('searched_at', SearchHistory.created_at),
+    ('use_case', SearchHistory.use_case),
+    ('results_count', SearchHistory.results_count),
+    ('execution_time', SearchHistory.execution_time),
+    ('result_id', SearchResult.id),
+    ('result_type', SearchResult.result_type),
+    ('source', SearchResult.source),
+    ('confidence', SearchResult.confidence),
+    ('data', SearchResult.data)
+)
+
+# Colonnes de stockage lues en plus de data pour restituer les données compressées
+PAYLOAD_COLUMNS = (SearchResult.data_codec, SearchResult.data_compressed, SearchResult.data_ref)
+
+# Format -> (type MIME, extension)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
+def export_rows(user_id, since=None, until=None, batch_size=1000):
+    """
+    Lit l'historique d'un utilisateur joint à ses résultats, par lots
+    Args:
+        user_id: Identifiant de l'utilisateur
+        since: Date de début (facultatif)
+        until: Date de fin exclue (facultatif)
+        batch_size: Nombre de lignes lues par aller-retour
+    Yields:
+        list: Lots de tuples dans l'ordre de EXPORT_COLUMNS
+    """
+    statement = select(*(column for _, column in EXPORT_COLUMNS), *PAYLOAD_COLUMNS).outerjoin(
+        SearchResult,
+        and_(
+            SearchResult.search_id == SearchHistory.id,
+            # Limite la lecture aux partitions postérieures à la recherche
+            SearchResult.created_at >= SearchHistory.created_at
+        )
+    ).where(SearchHistory.user_id == user_id)
+
+    if since:
+        statement = statement.where(SearchHistory.created_at >= since)
+    if until:
+        statement = statement.where(SearchHistory.created_at < until)
+
+    statement = statement.order_by(SearchHistory.created_at, SearchHistory.id).execution_options(yield_per=batch_size)
+
+    result = db.session.execute(statement)
+    try:
+        for partition in result.partitions():
+            # Remplacer les colonnes de stockage par les données restituées
+            yield [
+                (*row[:len(EXPORT_COLUMNS) - 1], decode_payload(*row[len(EXPORT_COLUMNS) - 1:]))
+                for row in partition
+            ]
+    finally:
+        result.close()
+
+def _json_value(value):
+    """
+    Convertit une valeur non sérialisable (UUID, date) en chaîne
+    """
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+def _csv_value(value):
+    """
+    Convertit une valeur pour une cellule CSV (JSON pour les structures)
+    """
+    if value is None or isinstance(value, (str, int)):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return _json_value(value)
+
+def stream_ndjson(batches):
+    """
+    Produit un document JSON par ligne
+    Args:
+        batches: Lots produits par export_rows
+    Yields:
+        str: Lignes NDJSON d'un lot
+    """
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for batch in batches:
+        yield ''.join(
+            json.dumps(dict(zip(names, row)), default=_json_value, ensure_ascii=False) + '\n'
+            for row in batch
+        )
+
+def stream_csv(batches):
+    """
+    Produit un CSV avec en-tête ; la colonne data est sérialisée en JSON
+    Args:
+        batches: Lots produits par export_rows
+    Yields:
+        str: Lignes CSV d'un lot
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    yield buffer.getvalue()
+
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+
+class _ChunkSink:
+    """Fichier en écriture seule qui accumule les octets écrits jusqu'au prochain envoi"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def stream_parquet(batches):
+    """
+    Produit un fichier Parquet, un groupe de lignes par lot
+
+    Nécessite pyarrow (import différé : les autres formats n'en dépendent pas).
+    Args:
+        batches: Lots produits par export_rows
+    Yields:
+        bytes: Octets du fichier au fil de l'écriture
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('search_id', pa.string()),
+        ('search_type', pa.string()),
+        ('search_term', pa.string()),
+        ('searched_at', pa.timestamp('us')),
+        ('use_case', pa.string()),
+        ('results_count', pa.int32()),
+        ('execution_time', pa.int32()),
+        ('result_id', pa.string()),
+        ('result_type', pa.string()),
+        ('source', pa.string()),
+        ('confidence', pa.int32()),
+        ('data', pa.string())
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for batch in batches:
+            columns = list(zip(*batch))
+            arrays = []
+            for (name, _), field, values in zip(EXPORT_COLUMNS, schema, columns):
+                if name == 'data':
+                    values = [json.dumps(v, ensure_ascii=False) if v is not None else None for v in values]
+                elif name in ('search_id', 'result_id'):
+                    values = [str(v) if v is not None else None for v in values]
+                arrays.append(pa.array(values, type=field.type))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+def parquet_available():
+    """
+    Indique si l'export Parquet est disponible (pyarrow installé)
+    """
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def stream_export(export_format, user_id, since=None, until=None, batch_size=1000):
+    """
+    Exporte l'historique d'un utilisateur dans le format demandé
+    Args:
+        export_format: 'ndjson', 'csv' ou 'parquet'
+        user_id: Identifiant de l'utilisateur
+        since: Date de début (facultatif)
+        until: Date de fin exclue (facultatif)
+        batch_size: Nombre de lignes lues par aller-retour
+    Returns:
+        generator: Fragments du fichier exporté
+    """
+    batches = export_rows(user_id, since, until, batch_size)
+
+    if export_format == 'ndjson':
+        return stream_ndjson(batches)
+    if export_format == 'csv':
+        return stream_csv(batches)
+    if export_format == 'parquet':
+        return stream_parquet(batches)
+
+    raise ValueError(f"Format d'export non pris en charge: {export_format}")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Récupération des pages de résultats
+Une page de résultats statique (recherche Google site:...) est d'abord
+demandée par une simple requête HTTP, sur des connexions réutilisées. Le
+navigateur Selenium n'est utilisé qu'en repli, lorsque la réponse est un mur
+de consentement ou une page qui exige JavaScript pour afficher ses résultats.
+Chaque requête, HTTP ou navigateur, prend un jeton du fournisseur contacté
+(utils/rate_limiter.py). Une page de blocage anti-robot est un échec : une
+nouvelle requête depuis la même adresse serait bloquée aussi. Le chemin
+emprunté est retourné et compté pour chaque requête.
+"""
+
+import logging
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import active_config
+from utils.rate_limiter import outbound_limiter, proxy_key
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Chemins de récupération
+FETCH_HTTP = 'http'
+FETCH_BROWSER = 'browser'
+FETCH_BLOCKED = 'blocked'
+
+# Indices d'un mur de consentement (l'hôte final ou le contenu de la page)
+CONSENT_HOSTS = ('consent.google.com', 'consent.youtube.com')
+CONSENT_MARKERS = ('before you continue', 'avant d\'accéder à google', 'action="https://consent.')
+
+# Indices d'une page qui exige JavaScript ou d'un blocage anti-robot
+JAVASCRIPT_MARKERS = ('/httpservice/retry/enablejs', 'please enable javascript', 'activez javascript')
+BLOCKED_PATHS = ('/sorry/',)
+
+def browser_reason(response, ready_marker=None):
+    """
+    Indique pourquoi une réponse HTTP ne suffit pas et nécessite le navigateur
+    Args:
+        response: Réponse requests
+        ready_marker: Fragment HTML présent quand les résultats sont rendus
+            côté serveur (ex: 'id="search"')
+    Returns:
+        str: 'status', 'consent', 'blocked' ou 'javascript', ou None si la réponse est exploitable
+    """
+    # La page anti-robot est servie avec un statut 429
+    final_url = urlparse(response.url)
+    if response.status_code == 429 or any(final_url.path.startswith(path) for path in BLOCKED_PATHS):
+        return 'blocked'
+    if response.status_code != 200:
+        return 'status'
+    if final_url.hostname in CONSENT_HOSTS:
+        return 'consent'
+
+    page = response.text.lower()
+    if any(marker in page for marker in CONSENT_MARKERS):
+        return 'consent'
+    if any(marker in page for marker in JAVASCRIPT_MARKERS):
+        return 'javascript'
+    if ready_marker and ready_marker.lower() not in page:
+        return 'javascript'
+    return None
+
+class FetchBlocked(Exception):
+    """Le fournisseur a renvoyé sa page de blocage anti-robot"""
+
+class PageFetcher:
+    """Récupération HTTP d'abord, navigateur en repli"""
+
+    def __init__(self, config=None):
+        """
+        Initialise la récupération
+        Args:
+            config: Configuration à utiliser (par défaut: active_config)
+        """
+        self.config = config or active_config
+        self.enabled = self.config.FETCH_HTTP_FIRST
+        self.timeout = self.config.REQUEST_TIMEOUT
+        self.pool_size = self.config.HTTP_POOL_SIZE
+
+        self._session = None
+        self._stats = {}  # source -> compteurs par chemin et par raison de repli
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        Session HTTP du processus (pool de connexions keep-alive, créée au premier appel)
+        """
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            if self.config.PROXY_ENABLED:
+                session.proxies.update(self.config.get_proxies())
+            self._session = session
+        return self._session
+
+    def fetch(self, source, url, browser, headers=None, ready_marker=None, provider=None):
+        """
+        Récupère une page, par HTTP si possible, sinon avec le navigateur
+        Args:
+            source: Nom de la source (pour les statistiques, ex: 'linkedin')
+            url: Adresse de la page
+            browser: Fonction fetch(url) qui charge la page dans le navigateur
+                et retourne sa source, ou None si le navigateur est indisponible
+            headers: En-têtes de la requête HTTP
+            ready_marker: Fragment HTML attendu dans une page exploitable
+            provider: Fournisseur contacté (seau de utils/rate_limiter.py, ex:
+                'google') ; un jeton est pris avant chaque requête
+        Returns:
+            tuple: (source HTML ou None, chemin emprunté, raison du repli ou None)
+        Raises:
+            FetchBlocked: Si la requête HTTP aboutit à la page de blocage
+            RateLimitTimeout: Si le jeton du fournisseur n'est pas disponible à temps
+        """
+        reason = 'disabled'
+        if self.enabled:
+            self._acquire(provider)
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                reason = browser_reason(response, ready_marker)
+                if reason is None:
+                    self._record(source, FETCH_HTTP, None)
+                    logger.info(f"Page {source} récupérée par HTTP")
+                    return response.text, FETCH_HTTP, None
+            except requests.RequestException as e:
+                logger.warning(f"Échec de la requête HTTP {source}, repli sur le navigateur: {str(e)}")
+                reason = 'error'
+
+            if reason == 'blocked':
+                self._record(source, FETCH_BLOCKED, reason)
+                raise FetchBlocked(f"Requête {source} bloquée par {urlparse(url).hostname} (page anti-robot), abandon")
+
+        # Le repli est une nouvelle requête vers le fournisseur
+        self._acquire(provider)
+        self._record(source, FETCH_BROWSER, reason)
+        logger.info(f"Page {source} récupérée par le navigateur (raison: {reason})")
+        return browser(url), FETCH_BROWSER, reason
+
+    def _acquire(self, provider):
+        """
+        Prend un jeton du fournisseur avant une requête (sans fournisseur: aucune limite)
+        """
+        if provider:
+            outbound_limiter.acquire(provider, proxy_key(self.config))
+
+    def _record(self, source, path, reason):
+        """
+        Met à jour les compteurs du processus
+        """
+        with self._lock:
+            stats = self._stats.setdefault(source, {FETCH_HTTP: 0, FETCH_BROWSER: 0, FETCH_BLOCKED: 0, 'reasons': {}})
+            stats[path] += 1
+            if reason:
+                stats['reasons'][reason] = stats['reasons'].get(reason, 0) + 1
+
+    def stats(self):
+        """
+        Retourne les chemins empruntés par ce processus
+        Returns:
+            dict: source -> {http, browser, blocked, reasons}
+        """
+        with self._lock:
+            return {source: {**stats, 'reasons': dict(stats['reasons'])} for source, stats in self._stats.items()}
+
+
+# Récupération partagée par les modules OSINT du processus
+page_fetcher = PageFetcher()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Analyse HTML des pages de résultats
+Les pages récupérées par les scrapers sont analysées par le parseur le plus
+rapide disponible (selectolax, puis BeautifulSoup avec lxml, puis
+BeautifulSoup avec html.parser), derrière une interface commune de sélection
+CSS. L'analyse peut être restreinte aux conteneurs de résultats d'une page.
+"""
+
+import logging
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config import active_config
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Parseurs par ordre de préférence
+PARSERS = ('selectolax', 'lxml', 'html.parser')
+
+def available_parsers():
+    """
+    Liste les parseurs installés
+    Returns:
+        list: Noms des parseurs disponibles, par ordre de préférence
+    """
+    installed = {
+        'selectolax': LexborHTMLParser is not None,
+        'lxml': LXML_AVAILABLE,
+        'html.parser': True
+    }
+    return [name for name in PARSERS if installed[name]]
+
+def resolve_parser(name=None, config=None):
+    """
+    Choisit le parseur à utiliser
+    Args:
+        name: Parseur demandé ('auto' ou l'un de PARSERS, par défaut: HTML_PARSER)
+        config: Configuration à utiliser (par défaut: active_config)
+    Returns:
+        str: Nom du parseur disponible retenu
+    """
+    name = name or (config or active_config).HTML_PARSER
+    available = available_parsers()
+    if name in available:
+        return name
+    if name != 'auto':
+        logger.warning(f"Parseur HTML {name} indisponible, utilisation de {available[0]}")
+    return available[0]
+
+class Node:
+    """Élément HTML, quel que soit le parseur"""
+
+    def __init__(self, node, parser):
+        self._node = node
+        self._parser = parser
+
+    def select(self, selector):
+        """
+        Sélectionne les descendants correspondant à un sélecteur CSS
+        Args:
+            selector: Sélecteur CSS
+        Returns:
+            list: Éléments (Node) trouvés
+        """
+        if self._parser == 'selectolax':
+            # Lexbor inclut l'élément lui-même dans ses correspondances, BeautifulSoup non
+            return [Node(node, self._parser) for node in self._node.css(selector) if node.mem_id != self._node.mem_id]
+        return [Node(node, self._parser) for node in self._node.select(selector)]
+
+    def select_one(self, selector):
+        """
+        Sélectionne le premier descendant correspondant à un sélecteur CSS
+        Args:
+            selector: Sélecteur CSS
+        Returns:
+            Node: Élément trouvé, ou None
+        """
+        if self._parser == 'selectolax':
+            nodes = self.select(selector)
+            return nodes[0] if nodes else None
+        node = self._node.select_one(selector)
+        return Node(node, self._parser) if node is not None else None
+
+    def get_text(self):
+        """
+        Retourne le texte de l'élément et de ses descendants
+        """
+        if self._parser == 'selectolax':
+            return self._node.text(deep=True)
+        return self._node.get_text()
+
+    def get(self, attribute, default=None):
+        """
+        Retourne la valeur d'un attribut
+        Args:
+            attribute: Nom de l'attribut
+            default: Valeur si l'attribut est absent
+        """
+        if self._parser == 'selectolax':
+            value = self._node.attributes.get(attribute)
+            return default if value is None else value
+        value = self._node.get(attribute, default)
+        # BeautifulSoup découpe les attributs multivalués (class)
+        return ' '.join(value) if isinstance(value, list) else value
+
+class Document:
+    """Page analysée, éventuellement restreinte à ses conteneurs de résultats"""
+
+    def __init__(self, roots, parser):
+        self._roots = roots
+        self.parser = parser
+
+    def select(self, selector):
+        """
+        Sélectionne les éléments correspondant à un sélecteur CSS dans les conteneurs
+        Returns:
+            list: Éléments (Node) trouvés
+        """
+        return [node for root in self._roots for node in root.select(selector)]
+
+    def select_one(self, selector):
+        """
+        Sélectionne le premier élément correspondant à un sélecteur CSS dans les conteneurs
+        Returns:
+            Node: Élément trouvé, ou None
+        """
+        for root in self._roots:
+            node = root.select_one(selector)
+            if node is not None:
+                return node
+        return None
+
+def _strainer(scope):
+    """
+    Traduit des conteneurs simples ('#id' ou '.classe', plusieurs possibles
+    séparés par des virgules, tous du même type) en filtre d'analyse BeautifulSoup
+    Returns:
+        SoupStrainer: Filtre, ou None si le sélecteur ne s'y prête pas
+    """
+    selectors = [part.strip() for part in scope.split(',')]
+    kinds = {selector[:1] for selector in selectors}
+    names = {selector[1:] for selector in selectors}
+    if len(kinds) != 1 or not kinds <= {'#', '.'} or not all(name.replace('-', '').replace('_', '').isalnum() for name in names):
+        return None
+
+    if kinds == {'#'}:
+        return SoupStrainer(id=lambda value: value in names)
+    return SoupStrainer(class_=lambda value: value is not None and bool(names.intersection(str(value).split())))
+
+def _outermost(nodes, key, parents):
+    """
+    Retire les conteneurs inclus dans un autre conteneur retenu (comme le
+    filtre d'analyse BeautifulSoup, qui garde un conteneur et tout son contenu)
+    Args:
+        nodes: Conteneurs trouvés, dans l'ordre du document
+        key: Fonction identifiant un élément
+        parents: Fonction retournant les ancêtres d'un élément
+    Returns:
+        list: Conteneurs sans ancêtre parmi les conteneurs trouvés
+    """
+    found = {key(node) for node in nodes}
+    return [node for node in nodes if not any(key(parent) in found for parent in parents(node))]
+
+def _lexbor_parents(node):
+    """
+    Parcourt les ancêtres d'un élément selectolax
+    """
+    node = node.parent
+    while node is not None:
+        yield node
+        node = node.parent
+
+def parse_html(html, scope=None, parser=None, config=None):
+    """
+    Analyse une page HTML
+    Args:
+        html: Source de la page
+        scope: Sélecteur CSS des conteneurs de résultats (facultatif). Si aucun
+            conteneur n'est trouvé, toute la page est utilisée.
+        parser: Parseur à utiliser (par défaut: HTML_PARSER)
+        config: Configuration à utiliser (par défaut: active_config)
+    Returns:
+        Document: Page analysée
+    """
+    parser = resolve_parser(parser, config)
+
+    if parser == 'selectolax':
+        tree = LexborHTMLParser(html)
+        containers = _outermost(tree.css(scope), lambda node: node.mem_id, _lexbor_parents) if scope else []
+        roots = containers or [tree.root]
+        return Document([Node(node, parser) for node in roots if node is not None], parser)
+
+    builder = 'lxml' if parser == 'lxml' else 'html.parser'
+    if scope:
+        # Ne construire que les conteneurs quand le sélecteur le permet
+        strainer = _strainer(scope)
+        if strainer is not None:
+            soup = BeautifulSoup(html, builder, parse_only=strainer)
+            if soup.contents:
+                return Document([Node(soup, parser)], parser)
+        else:
+            soup = BeautifulSoup(html, builder)
+            containers = _outermost(soup.select(scope), id, lambda node: node.parents)
+            if containers:
+                return Document([Node(node, parser) for node in containers], parser)
+            return Document([Node(soup, parser)], parser)
+
+    return Document([Node(BeautifulSoup(html, builder), parser)], parser)
@@ -6,8 +6,14 @@ TheWatcher - Module de vérification légale
 Ce module gère les vérifications éthiques et légales des requêtes
 """
 
+import os
 import re
+import json
+import time
 import logging
+import threading
+
+from config import active_config
 
 # Liste des cas d'usage autorisés
 ALLOWED_USE_CASES = [
@@ -19,6 +25,7 @@ ALLOWED_USE_CASES = [
     'threat_intel'        # Renseignement sur les menaces
 ]
 
+# Règles par défaut (utilisées si le fichier LEGAL_RULES_FILE est absent)
 # Liste de mots-clés sensibles à surveiller dans les requêtes
 SENSITIVE_KEYWORDS = [
     'hack', 'stalk', 'spy', 'track', 'monitor', 'girlfriend', 'boyfriend', 
@@ -26,6 +33,7 @@ SENSITIVE_KEYWORDS = [
 ]
 
 # Expressions régulières pour détecter les informations personnelles sensibles
+# (l'ordre est celui de la priorité des motifs dans le motif de rejet)
 REGEX_PATTERNS = {
     'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
     'phone': r'\b(\+\d{1,3})?[\s.-]?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b',
@@ -33,6 +41,14 @@ REGEX_PATTERNS = {
     'credit_card': r'\b(?:\d{4}[- ]?){3}\d{4}\b'
 }
 
+# Informations personnelles tolérées selon le cas d'usage
+ALLOWED_BY_USE_CASE = {
+    'identity_verification': ['email', 'phone']
+}
+
+# Nom de la règle des mots-clés dans les violations relevées
+KEYWORD_RULE = 'keyword'
+
 # Logger
 logger = logging.getLogger(__name__)
 
@@ -49,59 +65,293 @@ def validate_use_case(use_case):
     
     return use_case.lower() in ALLOWED_USE_CASES
 
+def _keyword_trie(words):
+    """
+    Construit une expression en arbre de préfixes pour des mots-clés
+    ('spy', 'spouse' -> 'sp(?:ouse|y)') : à chaque position, le moteur suit un
+    seul chemin au lieu d'essayer chaque mot-clé.
+    Args:
+        words: Mots-clés
+    Returns:
+        str: Expression régulière (sans groupe capturant)
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        expression = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f"(?:{expression})?" if '' in node else expression
+
+    return build(trie)
+
+class CompiledRules:
+    """Règles de conformité compilées (instantané immuable, remplacé au rechargement)"""
+
+    def __init__(self, keywords, patterns, allowed):
+        """
+        Compile les règles
+        Args:
+            keywords: Mots-clés sensibles (mots entiers, sans tenir compte de la casse), par ordre de priorité
+            patterns: Nom -> expression régulière, par ordre de priorité
+            allowed: Cas d'usage -> noms des motifs tolérés
+        """
+        self.keywords = []
+        for keyword in keywords:
+            if keyword and keyword.lower() not in self.keywords:
+                self.keywords.append(keyword.lower())
+        self.patterns = dict(patterns)
+        self.allowed = {use_case.lower(): frozenset(names) for use_case, names in allowed.items()}
+
+        self.keyword_expression = re.compile(rf"\b(?i:{_keyword_trie(self.keywords)})\b") if self.keywords else None
+        self.pattern_expressions = {name: re.compile(pattern) for name, pattern in self.patterns.items()}
+
+        self._priority = {keyword: index for index, keyword in enumerate(self.keywords)}
+        self._priority.update({name: len(self.keywords) + index for index, name in enumerate(self.patterns)})
+        self._expressions = {frozenset(): self._compile_patterns(frozenset())}
+        self._lock = threading.Lock()
+
+    def _compile_patterns(self, tolerated):
+        """
+        Réunit les motifs non tolérés en une alternance de groupes nommés
+        Returns:
+            re.Pattern: Expression combinée, ou None si aucun motif ne s'applique
+        """
+        alternatives = [(name, pattern) for name, pattern in self.patterns.items() if name not in tolerated]
+        if not alternatives:
+            return None
+
+        # Si tous les motifs commencent par \b, ne tenter l'alternance qu'aux limites de mots
+        if all(pattern.startswith(r'\b') for _, pattern in alternatives):
+            return re.compile(r'\b(?:' + '|'.join(f"(?P<{name}>{pattern[2:]})" for name, pattern in alternatives) + ')')
+        return re.compile('|'.join(f"(?P<{name}>{pattern})" for name, pattern in alternatives))
+
+    def pattern_expression(self, use_case=None):
+        """
+        Retourne l'alternance des motifs d'un cas d'usage
+
+        Les motifs tolérés en sont exclus (et non filtrés après coup) : une
+        information tolérée ne peut pas masquer une violation qui la chevauche.
+        Args:
+            use_case: Cas d'usage déclaré
+        Returns:
+            re.Pattern: Expression combinée, ou None
+        """
+        tolerated = self.allowed.get((use_case or '').lower(), frozenset())
+        expression = self._expressions.get(tolerated)
+        if expression is None and tolerated not in self._expressions:
+            with self._lock:
+                expression = self._expressions.setdefault(tolerated, self._compile_patterns(tolerated))
+        return expression
+
+    def first_pattern(self, text, use_case=None, before=None):
+        """
+        Cherche le motif non toléré de plus haute priorité présent dans le texte
+
+        L'alternance ne relève que des correspondances disjointes : un motif dont
+        toutes les occurrences chevauchent celles d'un autre n'y apparaît pas.
+        Chaque motif plus prioritaire est donc cherché individuellement.
+        Args:
+            text: Texte à analyser
+            use_case: Cas d'usage déclaré
+            before: Motif déjà relevé ; seuls les motifs plus prioritaires sont cherchés
+        Returns:
+            tuple: (motif, valeur trouvée), ou None
+        """
+        tolerated = self.allowed.get((use_case or '').lower(), frozenset())
+        for name, expression in self.pattern_expressions.items():
+            if name == before:
+                return None
+            if name in tolerated:
+                continue
+            match = expression.search(text)
+            if match:
+                return name, match.group(0)
+        return None
+
+    def priority(self, violation):
+        """
+        Rang d'une violation : mots-clés dans l'ordre des règles, puis motifs dans l'ordre du fichier
+        """
+        rule, value = violation
+        return self._priority[value.lower() if rule == KEYWORD_RULE else rule]
+
+class PolicyEngine:
+    """
+    Règles de conformité compilées une fois
+
+    Les mots-clés sensibles forment un arbre de préfixes, parcouru sur tout le
+    texte ; les motifs d'informations personnelles non tolérés par le cas
+    d'usage sont réunis en une alternance de groupes nommés, parcourue
+    séparément. Les règles sont lues dans un fichier JSON, rechargé lorsqu'il
+    est modifié.
+    """
+
+    def __init__(self, config=None):
+        """
+        Initialise le moteur de règles
+        Args:
+            config: Configuration à utiliser (par défaut: active_config)
+        """
+        self.config = config or active_config
+        self.path = self.config.LEGAL_RULES_FILE or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'legal_rules.json'
+        )
+        self.reload_interval = self.config.LEGAL_RULES_RELOAD_INTERVAL
+
+        self._rules = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """
+        Lit et compile le fichier de règles (ou les règles par défaut s'il est absent)
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+
+        if self._rules is not None and mtime == self._mtime:
+            return
+
+        rules = {}
+        if mtime is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    rules = json.load(f)
+            except Exception as e:
+                logger.error(f"Erreur lors de la lecture des règles de conformité ({self.path}): {str(e)}")
+                if self._rules is not None:
+                    # Conserver les règles en vigueur jusqu'à la prochaine modification
+                    self._mtime = mtime
+                    return
+
+        try:
+            compiled = CompiledRules(
+                rules.get('keywords', SENSITIVE_KEYWORDS),
+                rules.get('patterns', REGEX_PATTERNS),
+                rules.get('allowed_by_use_case', ALLOWED_BY_USE_CASE)
+            )
+        except (re.error, AttributeError, TypeError) as e:
+            logger.error(f"Règles de conformité invalides ({self.path}): {str(e)}")
+            if self._rules is not None:
+                self._mtime = mtime
+                return
+            compiled = CompiledRules(SENSITIVE_KEYWORDS, REGEX_PATTERNS, ALLOWED_BY_USE_CASE)
+
+        self._rules = compiled
+        self._mtime = mtime
+        logger.info(f"Règles de conformité chargées ({len(compiled.keywords)} mots-clés, {len(compiled.patterns)} motifs)")
+
+    def rules(self):
+        """
+        Retourne les règles compilées, rechargées si le fichier a changé
+        (au plus une vérification toutes les LEGAL_RULES_RELOAD_INTERVAL secondes)
+        Returns:
+            CompiledRules: Règles en vigueur
+        """
+        now = time.monotonic()
+        if self._rules is None or now - self._checked_at >= self.reload_interval:
+            with self._lock:
+                if self._rules is None or now - self._checked_at >= self.reload_interval:
+                    self._load()
+                    self._checked_at = now
+        return self._rules
+
+    def find_violations(self, text, use_case=None):
+        """
+        Relève toutes les violations d'un texte
+
+        Les mots-clés sont cherchés sur tout le texte, indépendamment des
+        motifs : un mot-clé contenu dans une information personnelle (tolérée
+        ou non) est toujours relevé.
+        Args:
+            text: Texte à analyser
+            use_case: Cas d'usage déclaré (certaines informations peuvent être tolérées)
+        Returns:
+            list: Tuples (règle, valeur trouvée), par ordre de priorité des
+                règles (mots-clés puis motifs), puis dans l'ordre du texte
+        """
+        if not text:
+            return []
+
+        rules = self.rules()
+        violations = []
+
+        if rules.keyword_expression is not None:
+            violations.extend((KEYWORD_RULE, match.group(0)) for match in rules.keyword_expression.finditer(text))
+
+        expression = rules.pattern_expression(use_case)
+        if expression is not None:
+            found = [(match.lastgroup, match.group(match.lastgroup)) for match in expression.finditer(text)]
+            if found:
+                # Un texte sans correspondance n'en a pour aucun motif ; sinon,
+                # vérifier qu'aucun motif plus prioritaire n'a été masqué
+                best = min(found, key=rules.priority)[0]
+                hidden = rules.first_pattern(text, use_case, before=best)
+                if hidden is not None:
+                    found.append(hidden)
+            violations.extend(found)
+
+        violations.sort(key=rules.priority)
+        return violations
+
+
+# Moteur partagé par le processus
+policy_engine = PolicyEngine()
+
+def violation_reason(violation):
+    """
+    Formule le motif de rejet d'une violation
+    Args:
+        violation: Tuple (règle, valeur trouvée)
+    Returns:
+        str: Motif de rejet
+    """
+    rule, value = violation
+    if rule == KEYWORD_RULE:
+        return f"Détection d'un mot-clé sensible: '{value.lower()}'"
+    return f"Détection d'information sensible de type {rule}"
+
 def check_ethical_compliance(request):
     """
     Vérifie la conformité éthique d'une requête
+
+    Le texte analysé et le résultat sont conservés dans le contexte de la
+    requête : un second appel ne refait pas l'analyse.
     Args:
         request: Requête Flask à vérifier
     Returns:
         tuple: (is_compliant, reason)
     """
-    # Vérifier les mots-clés sensibles dans la requête
-    request_data = ''
-    
-    # Extraire les données de la requête
-    if request.method == 'GET':
-        request_data = ' '.join(request.args.values())
-    elif request.is_json:
-        try:
-            json_data = request.get_json()
-            if isinstance(json_data, dict):
-                request_data = ' '.join(str(v) for v in json_data.values())
-            elif isinstance(json_data, list):
-                request_data = ' '.join(str(item) for item in json_data)
-            else:
-                request_data = str(json_data)
-        except Exception as e:
-            logger.warning(f"Erreur lors de l'extraction des données JSON: {str(e)}")
-    elif request.form:
-        request_data = ' '.join(request.form.values())
-    
-    # Vérifier les mots-clés sensibles
-    for keyword in SENSITIVE_KEYWORDS:
-        if re.search(r'\b' + re.escape(keyword) + r'\b', request_data.lower()):
-            reason = f"Détection d'un mot-clé sensible: '{keyword}'"
-            logger.warning(reason)
-            return False, reason
-    
-    # Vérifier la présence d'informations personnelles sensibles
-    for pattern_name, pattern in REGEX_PATTERNS.items():
-        matches = re.findall(pattern, request_data)
-        if matches:
-            # Si nous sommes en mode vérification d'identité, certaines informations sont autorisées
-            use_case = request.headers.get('X-Use-Case', '').lower()
-            if use_case == 'identity_verification' and pattern_name in ['email', 'phone']:
-                continue
-                
-            reason = f"Détection d'information sensible de type {pattern_name}"
-            logger.warning(reason)
-            return False, reason
-    
-    # Vérifier l'adresse IP si elle provient d'un pays restreint
-    # Note: Ceci nécessiterait une librairie comme geoip2 pour la géolocalisation IP
-    
-    # Tout est en ordre
-    return True, "Conforme"
+    from utils.request_context import get_request_context
+
+    context = get_request_context()
+    if context.compliance is not None:
+        return context.compliance
+
+    violations = policy_engine.find_violations(context.text, context.use_case)
+
+    if not violations:
+        # Note: la vérification du pays d'origine de l'adresse IP nécessiterait geoip2
+        context.compliance = (True, "Conforme")
+        return context.compliance
+
+    # Violation de plus haute priorité (mots-clés d'abord, puis motifs dans l'ordre des règles)
+    reason = violation_reason(violations[0])
+
+    rules = sorted({rule for rule, _ in violations})
+    logger.warning(f"{reason} ({len(violations)} violations: {', '.join(rules)})")
+    context.compliance = (False, reason)
+    return context.compliance
 
 def check_compliance_with_gdpr(data_processing_purpose, retention_period):
     """
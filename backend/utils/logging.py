@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Journalisation
+Ce module configure les logs de l'application et fournit la journalisation
+d'audit utilisée par les routes.
+"""
+
+import uuid
+import logging
+
+from flask import has_request_context, request
+
+from models import AuditLog
+from utils.audit_queue import audit_queue
+
+def setup_logging(app):
+    """
+    Configure le niveau et le format des logs de l'application
+    Args:
+        app: Application Flask
+    """
+    level = getattr(logging, str(app.config.get('LOG_LEVEL', 'info')).upper(), logging.INFO)
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s %(levelname)s [%(name)s] %(message)s'
+    )
+    app.logger.setLevel(level)
+
+def audit_log(user_id, action, resource, ip_address, details=None, status='success'):
+    """
+    Journalise un événement d'audit (écriture différée, par lots)
+    Args:
+        user_id: Identifiant de l'utilisateur (ou None)
+        action: Action effectuée (ex: 'search_success')
+        resource: Ressource concernée (ex: 'search/photo')
+        ip_address: Adresse IP du client
+        details: Détails complémentaires (facultatif)
+        status: 'success', 'failure' ou 'denied'
+    """
+    audit_queue.enqueue(AuditLog.build_record(
+        user_id=uuid.UUID(str(user_id)) if user_id else None,
+        action=action,
+        resource=resource,
+        ip_address=ip_address,
+        user_agent=request.user_agent.string if has_request_context() else None,
+        details=details,
+        status=status
+    ))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Pagination par curseur
+Ce module implémente la pagination par clé (keyset) : la page suivante est
+sélectionnée par une comparaison sur (created_at, id) qui suit l'index, au lieu
+d'un OFFSET dont le coût croît avec le numéro de page.
+"""
+
+import json
+import base64
+import logging
+import datetime
+import uuid
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Executable, ClauseElement
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+def encode_cursor(created_at, item_id):
+    """
+    Encode la position du dernier élément d'une page
+    Args:
+        created_at: Date de création du dernier élément
+        item_id: Identifiant du dernier élément
+    Returns:
+        str: Curseur opaque (base64 URL)
+    """
+    payload = json.dumps([created_at.isoformat(), str(item_id)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Décode un curseur produit par encode_cursor
+    Args:
+        cursor: Curseur opaque
+    Returns:
+        tuple: (created_at, id)
+    Raises:
+        ValueError: Si le curseur est invalide
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.datetime.fromisoformat(created_at), uuid.UUID(item_id)
+    except Exception:
+        raise ValueError("Curseur de pagination invalide")
+
+def keyset_page(query, model, per_page, cursor=None):
+    """
+    Retourne une page d'éléments triés du plus récent au plus ancien
+    Args:
+        query: Requête SQLAlchemy déjà filtrée
+        model: Modèle interrogé (colonnes created_at et id)
+        per_page: Nombre d'éléments par page
+        cursor: Curseur de la page précédente (facultatif)
+    Returns:
+        tuple: (éléments, curseur de la page suivante ou None)
+    """
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, item_id))
+
+    # Un élément de plus pour savoir s'il existe une page suivante, sans COUNT(*)
+    items = query.order_by(model.created_at.desc(), model.id.desc()).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+
+    return items, next_cursor
+
+class Explain(Executable, ClauseElement):
+    """Plan d'exécution (EXPLAIN) d'une requête, au format JSON"""
+    inherit_cache = False
+    
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain, 'postgresql')
+def _compile_explain(element, compiler, **kw):
+    # La requête est compilée avec ses paramètres liés : SQLAlchemy les
+    # convertit (UUID, listes IN...) comme pour une exécution normale
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+def approximate_count(session, query):
+    """
+    Estime le nombre de lignes d'une requête à partir du plan de PostgreSQL
+    
+    L'estimation provient des statistiques du planificateur (EXPLAIN) et ne
+    parcourt pas la table ; sur un autre moteur, un COUNT exact est effectué.
+    Args:
+        session: Session SQLAlchemy
+        query: Requête SQLAlchemy filtrée
+    Returns:
+        int: Nombre de lignes estimé
+    """
+    connection = session.connection()
+    if connection.dialect.name != 'postgresql':
+        return query.count()
+
+    try:
+        plan = connection.execute(Explain(query.statement)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.error(f"Erreur lors de l'estimation du nombre de lignes: {str(e)}")
+        return None
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Partitions et rétention des données
+Les tables audit_logs, search_history et search_results sont partitionnées
+par plage de created_at (PostgreSQL), avec une partition par défaut pour les
+lignes hors des plages créées. Ce module crée les partitions à venir et
+applique DATA_RETENTION_DAYS en supprimant les partitions entièrement expirées,
+au lieu de DELETE ligne par ligne (pas de lignes mortes à nettoyer par VACUUM,
+index de taille stable).
+"""
+
+import re
+import logging
+import datetime
+
+from sqlalchemy import text
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Table partitionnée -> granularité des partitions (quotidienne : une ligne
+# survit au plus un jour au-delà de DATA_RETENTION_DAYS)
+PARTITIONED_TABLES = {
+    'audit_logs': 'day',
+    'search_history': 'day',
+    'search_results': 'day'
+}
+
+# Au-delà de cette durée, une partition à cheval sur la date limite est purgée
+# de ses lignes expirées (partitions mensuelles ou legacy antérieures)
+MAX_UNTRIMMED_SPAN = datetime.timedelta(days=1)
+
+# Verrou consultatif qui sérialise la maintenance (workers au démarrage, tâche quotidienne)
+PARTITIONS_LOCK_KEY = 0x7468657761746368
+
+# Bornes d'une partition telles que renvoyées par pg_get_expr(relpartbound)
+BOUND_PATTERN = re.compile(r"FROM \((MINVALUE|'[^']+')\) TO \('([^']+)'\)")
+
+def partition_start(moment, granularity):
+    """
+    Retourne le début de la partition contenant une date
+    Args:
+        moment: Date
+        granularity: 'day' ou 'month'
+    Returns:
+        datetime: Borne inférieure de la partition
+    """
+    start = datetime.datetime(moment.year, moment.month, moment.day)
+    if granularity == 'month':
+        start = start.replace(day=1)
+    return start
+
+def next_partition_start(start, granularity):
+    """
+    Retourne le début de la partition suivante
+    Args:
+        start: Borne inférieure d'une partition
+        granularity: 'day' ou 'month'
+    Returns:
+        datetime: Borne inférieure de la partition suivante
+    """
+    if granularity == 'day':
+        return start + datetime.timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+def partition_name(table, start, granularity):
+    """
+    Retourne le nom d'une partition (ex: audit_logs_p20240115, search_history_p202401)
+    """
+    return f"{table}_p{start.strftime('%Y%m%d' if granularity == 'day' else '%Y%m')}"
+
+def default_partition_name(table):
+    """
+    Retourne le nom de la partition par défaut d'une table (ex: audit_logs_default)
+    """
+    return f"{table}_default"
+
+def _create_partition(connection, table, name, start, end):
+    """
+    Crée une partition, en y déplaçant les lignes de sa plage reçues entre-temps
+    par la partition par défaut (PostgreSQL refuse sinon de la créer)
+    """
+    default = default_partition_name(table)
+    bounds = {'start': start, 'end': end}
+    has_default = connection.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {'name': default}).scalar()
+    stranded = has_default and connection.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {default} WHERE created_at >= :start AND created_at < :end)"
+    ), bounds).scalar()
+
+    if stranded:
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat(' ')}') TO ('{end.isoformat(' ')}')"
+    ))
+
+    if stranded:
+        moved = connection.execute(text(
+            f"WITH moved AS (DELETE FROM {default} WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {table} SELECT * FROM moved"
+        ), bounds).rowcount
+        connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+        logger.warning(f"{moved} lignes de {default} déplacées dans la partition {name}")
+
+def ensure_partitions(connection, days_ahead, now=None):
+    """
+    Crée la partition par défaut et les partitions couvrant la période
+    actuelle et les jours à venir
+
+    La partition par défaut reçoit les lignes hors des plages créées (tâche de
+    maintenance interrompue) : les insertions n'échouent jamais. Les plages
+    manquantes depuis la dernière partition sont recréées et leurs lignes
+    quittent la partition par défaut.
+    Args:
+        connection: Connexion SQLAlchemy (PostgreSQL)
+        days_ahead: Nombre de jours à couvrir au-delà d'aujourd'hui
+        now: Date de référence (par défaut: maintenant, UTC)
+    Returns:
+        list: Noms des partitions créées ou déjà présentes
+    """
+    if connection.dialect.name != 'postgresql':
+        return []
+
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': PARTITIONS_LOCK_KEY})
+
+    now = now or datetime.datetime.utcnow()
+    until = now + datetime.timedelta(days=days_ahead)
+    partitions = []
+
+    for table, granularity in PARTITIONED_TABLES.items():
+        default = default_partition_name(table)
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {default} PARTITION OF {table} DEFAULT"))
+        partitions.append(default)
+
+        # Reprendre après la dernière partition (sans recouvrir une plage déjà
+        # couverte, ni laisser de trou si la maintenance a été interrompue)
+        existing = list_partitions(connection, table)
+        start = existing[-1][2] if existing else partition_start(now, granularity)
+
+        while start <= until:
+            end = next_partition_start(start, granularity)
+            name = partition_name(table, start, granularity)
+            _create_partition(connection, table, name, start, end)
+            partitions.append(name)
+            start = end
+
+    return partitions
+
+def list_partitions(connection, table):
+    """
+    Liste les partitions d'une table avec leurs bornes
+    Args:
+        connection: Connexion SQLAlchemy (PostgreSQL)
+        table: Table partitionnée
+    Returns:
+        list: Tuples (nom, début, fin) triés par date
+    """
+    rows = connection.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {'table': table}).fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound or '')
+        if not match:
+            continue  # Partition par défaut ou bornes non datées
+        start, end = match.groups()
+        start = datetime.datetime.min if start == 'MINVALUE' else datetime.datetime.fromisoformat(start.strip("'"))
+        partitions.append((name, start, datetime.datetime.fromisoformat(end)))
+
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def drop_expired_partitions(connection, retention_days, now=None, dry_run=False):
+    """
+    Supprime les partitions dont toutes les lignes dépassent la durée de rétention
+
+    Une partition plus longue qu'un jour (partition mensuelle ou legacy créée
+    avant le passage aux partitions quotidiennes) qui contient la date limite
+    est purgée de ses lignes expirées par DELETE : la rétention est respectée
+    sans attendre l'expiration de toute la partition.
+    Args:
+        connection: Connexion SQLAlchemy (PostgreSQL)
+        retention_days: Durée de conservation (jours)
+        now: Date de référence (par défaut: maintenant, UTC)
+        dry_run: Lister les partitions sans les supprimer
+    Returns:
+        list: Noms des partitions supprimées (ou à supprimer)
+    """
+    if connection.dialect.name != 'postgresql':
+        return []
+
+    cutoff = (now or datetime.datetime.utcnow()) - datetime.timedelta(days=retention_days)
+    dropped = []
+
+    for table in PARTITIONED_TABLES:
+        for name, start, end in list_partitions(connection, table):
+            if end > cutoff:
+                if start < cutoff and end - start > MAX_UNTRIMMED_SPAN:
+                    _trim_partition(connection, name, cutoff, dry_run)
+                continue
+            if not dry_run:
+                connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                connection.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+
+    if dropped:
+        logger.info(f"Rétention ({retention_days} jours): partitions supprimées: {', '.join(dropped)}")
+    return dropped
+
+def _trim_partition(connection, name, cutoff, dry_run=False):
+    """
+    Supprime les lignes expirées d'une partition à cheval sur la date limite
+    Returns:
+        int: Nombre de lignes supprimées (ou à supprimer)
+    """
+    if dry_run:
+        count = connection.execute(text(f"SELECT count(*) FROM {name} WHERE created_at < :cutoff"), {'cutoff': cutoff}).scalar()
+    else:
+        count = connection.execute(text(f"DELETE FROM {name} WHERE created_at < :cutoff"), {'cutoff': cutoff}).rowcount
+    if count:
+        logger.info(f"Rétention: {count} lignes expirées {'à supprimer' if dry_run else 'supprimées'} de la partition {name}")
+    return count
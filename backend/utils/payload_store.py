@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Stockage des données de résultats volumineuses
+Les données d'un résultat (SearchResult.data) sont stockées en JSONB tant
+qu'elles restent petites. Au-delà de RESULT_COMPRESS_THRESHOLD octets, elles
+sont compressées (zstd, ou zlib si zstandard n'est pas installé) dans une
+colonne binaire ; au-delà de RESULT_OFFLOAD_THRESHOLD octets compressés, elles
+sont déposées dans le magasin de blobs et seule leur référence est conservée.
+"""
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import logging
+
+from config import active_config
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class BlobStore:
+    """Magasin de blobs local, adressé par contenu"""
+
+    def __init__(self, config=None):
+        """
+        Initialise le magasin de blobs
+        Args:
+            config: Configuration à utiliser (par défaut: active_config)
+        """
+        self.config = config or active_config
+        self.root = self.config.RESULT_BLOB_DIR or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'blobs'
+        )
+
+    def _path(self, digest):
+        """
+        Retourne le chemin d'un blob (répertoires de 2 caractères pour limiter leur taille)
+        """
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def put(self, payload):
+        """
+        Enregistre un blob
+        Args:
+            payload: Octets à enregistrer
+        Returns:
+            str: Référence du blob ('file:<sha256>')
+        """
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self._path(digest)
+
+        if os.path.exists(path):
+            # Blob partagé : rafraîchir sa date pour la purge
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.part"
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+        return f"file:{digest}"
+
+    def get(self, ref):
+        """
+        Lit un blob
+        Args:
+            ref: Référence renvoyée par put
+        Returns:
+            bytes: Contenu du blob
+        """
+        scheme, _, digest = ref.partition(':')
+        if scheme != 'file':
+            raise ValueError(f"Référence de blob non prise en charge: {ref}")
+
+        with open(self._path(digest), 'rb') as f:
+            return f.read()
+
+    def purge(self, older_than_days):
+        """
+        Supprime les blobs qui n'ont pas été écrits depuis un nombre de jours
+        Args:
+            older_than_days: Âge minimal des blobs supprimés (jours)
+        Returns:
+            int: Nombre de blobs supprimés
+        """
+        cutoff = time.time() - older_than_days * 86400
+        removed = 0
+
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+
+        if removed:
+            logger.info(f"Magasin de blobs: {removed} blobs supprimés")
+        return removed
+
+
+def _compress(raw):
+    """
+    Compresse des octets avec le meilleur codec disponible
+    Returns:
+        tuple: (codec, octets compressés)
+    """
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=3).compress(raw)
+    return 'zlib', zlib.compress(raw, 6)
+
+def _decompress(codec, payload):
+    """
+    Décompresse des octets selon leur codec
+    """
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Données compressées en zstd mais zstandard n'est pas installé")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if codec == 'zlib':
+        return zlib.decompress(payload)
+    raise ValueError(f"Codec inconnu: {codec}")
+
+def encode_payload(data, config=None):
+    """
+    Prépare les colonnes de stockage des données d'un résultat
+    Args:
+        data: Données du résultat (sérialisables en JSON)
+        config: Configuration à utiliser (par défaut: active_config)
+    Returns:
+        dict: Valeurs des colonnes data, data_codec, data_compressed et data_ref
+    """
+    config = config or active_config
+    columns = {'data': None, 'data_codec': None, 'data_compressed': None, 'data_ref': None}
+
+    if data is None:
+        return columns
+
+    raw = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if len(raw) < config.RESULT_COMPRESS_THRESHOLD:
+        columns['data'] = data
+        return columns
+
+    codec, compressed = _compress(raw)
+    columns['data_codec'] = codec
+
+    if len(compressed) >= config.RESULT_OFFLOAD_THRESHOLD:
+        columns['data_ref'] = blob_store.put(compressed)
+    else:
+        columns['data_compressed'] = compressed
+
+    return columns
+
+def decode_payload(data, data_codec=None, data_compressed=None, data_ref=None):
+    """
+    Restitue les données d'un résultat à partir de ses colonnes de stockage
+    Args:
+        data: Colonne JSONB (données non compressées)
+        data_codec: Codec de compression
+        data_compressed: Données compressées en base
+        data_ref: Référence du blob
+    Returns:
+        Données du résultat (ou None)
+    """
+    if data_codec is None:
+        return data
+
+    try:
+        payload = data_compressed if data_ref is None else blob_store.get(data_ref)
+        return json.loads(_decompress(data_codec, payload))
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture des données du résultat ({data_ref or data_codec}): {str(e)}")
+        return None
+
+
+# Magasin partagé par le processus
+blob_store = BlobStore()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Limitation du débit sortant par fournisseur
+Chaque appel à un fournisseur externe (Google, Yandex, TinEye, Hunter.io,
+Shodan, réseaux sociaux...) prend un jeton dans un seau partagé par tous les
+workers, stocké dans Redis et mis à jour par un script Lua atomique. Les seaux
+sont distincts par fournisseur et par proxy de sortie. Si Redis est
+indisponible, un seau local au processus prend le relais.
+"""
+
+import time
+import logging
+import threading
+
+from config import active_config
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Préfixe des clés Redis des seaux et des métriques
+KEY_PREFIX = 'thewatcher:ratelimit'
+
+# Délai avant de réessayer Redis après une erreur (seaux locaux entre-temps)
+REDIS_RETRY_DELAY = 30
+
+# Réserve un jeton (le solde peut devenir négatif : les appelants suivants
+# attendent leur tour) sauf si l'attente dépasserait le maximum accepté.
+# KEYS[1]: seau, KEYS[2]: métriques ; ARGV: débit (jetons/s), capacité, attente max (s)
+# Retourne {accordé (0/1), attente en secondes}
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate) - 1
+
+local wait = 0
+if tokens < 0 then
+    wait = -tokens / rate
+end
+
+if wait > max_wait then
+    redis.call('HINCRBY', KEYS[2], 'denied', 1)
+    return {0, tostring(wait)}
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+redis.call('HINCRBY', KEYS[2], 'acquired', 1)
+if wait > 0 then
+    redis.call('HINCRBY', KEYS[2], 'waited', 1)
+    redis.call('HINCRBYFLOAT', KEYS[2], 'wait_seconds', tostring(wait))
+end
+return {1, tostring(wait)}
+"""
+
+class RateLimitTimeout(Exception):
+    """Le jeton d'un fournisseur n'est pas disponible dans le délai d'attente maximal"""
+
+
+def parse_limits(value):
+    """
+    Lit les limites par fournisseur
+    Args:
+        value: Chaîne 'fournisseur=requêtes_par_minute:capacité,...' (ex: 'google=20:3')
+    Returns:
+        dict: fournisseur -> (jetons par seconde, capacité)
+    """
+    limits = {}
+    for entry in (value or '').split(','):
+        if '=' not in entry:
+            continue
+        provider, _, spec = entry.partition('=')
+        per_minute, _, burst = spec.partition(':')
+        try:
+            limits[provider.strip()] = (float(per_minute) / 60.0, float(burst or 1))
+        except ValueError:
+            logger.error(f"Limite de débit sortant invalide ignorée: {entry.strip()}")
+    return limits
+
+def proxy_key(config=None):
+    """
+    Identifie le proxy de sortie (chaque proxy a ses propres seaux)
+    Args:
+        config: Configuration à utiliser (par défaut: active_config)
+    Returns:
+        str: 'hôte:port' du proxy, ou 'direct'
+    """
+    config = config or active_config
+    if not config.PROXY_ENABLED:
+        return 'direct'
+    return f"{config.PROXY_HOST}:{config.PROXY_PORT}"
+
+class OutboundRateLimiter:
+    """Seaux à jetons partagés, par fournisseur et par proxy"""
+
+    def __init__(self, config=None):
+        """
+        Initialise le limiteur
+        Args:
+            config: Configuration à utiliser (par défaut: active_config)
+        """
+        self.config = config or active_config
+        self.enabled = self.config.OUTBOUND_RATE_LIMIT_ENABLED
+        self.limits = parse_limits(self.config.OUTBOUND_RATE_LIMITS)
+        self.default_limit = parse_limits(f"default={self.config.OUTBOUND_RATE_LIMIT_DEFAULT}")['default']
+        self.max_wait = self.config.OUTBOUND_RATE_LIMIT_MAX_WAIT
+
+        self._scripts = {}  # client Redis -> script enregistré
+        self._local = {}  # clé -> (jetons, horodatage) (repli sans Redis)
+        self._stats = {}  # fournisseur -> métriques du processus
+        self._lock = threading.Lock()
+        self._redis_retry_at = 0.0
+
+    def acquire(self, provider, proxy=None, max_wait=None):
+        """
+        Attend un jeton pour appeler un fournisseur
+        Args:
+            provider: Nom du fournisseur (clé de OUTBOUND_RATE_LIMITS)
+            proxy: Proxy de sortie (par défaut: proxy_key())
+            max_wait: Attente maximale en secondes (par défaut: OUTBOUND_RATE_LIMIT_MAX_WAIT)
+        Returns:
+            float: Temps d'attente en secondes
+        Raises:
+            RateLimitTimeout: Si le jeton n'est pas disponible à temps
+        """
+        if not self.enabled:
+            return 0.0
+
+        rate, burst = self.limits.get(provider, self.default_limit)
+        max_wait = self.max_wait if max_wait is None else max_wait
+        key = f"{provider}:{proxy or proxy_key(self.config)}"
+
+        granted, wait = None, 0.0
+        if time.monotonic() >= self._redis_retry_at:
+            try:
+                granted, wait = self._reserve_redis(key, rate, burst, max_wait)
+            except Exception as e:
+                logger.warning(f"Redis indisponible pour la limitation sortante, seaux locaux utilisés pendant {REDIS_RETRY_DELAY} s: {str(e)}")
+                self._redis_retry_at = time.monotonic() + REDIS_RETRY_DELAY
+
+        if granted is None:
+            granted, wait = self._reserve_local(key, rate, burst, max_wait)
+
+        self._record(provider, granted, wait)
+
+        if not granted:
+            raise RateLimitTimeout(f"Limite de débit atteinte pour {provider} (attente estimée {wait:.1f} s)")
+
+        if wait > 0:
+            if wait >= 1:
+                logger.info(f"Limitation sortante: attente de {wait:.1f} s avant l'appel à {provider}")
+            time.sleep(wait)
+        return wait
+
+    def _reserve_redis(self, key, rate, burst, max_wait):
+        """
+        Réserve un jeton dans le seau Redis partagé
+        Returns:
+            tuple: (accordé, attente en secondes)
+        """
+        from utils.redis_client import get_redis
+
+        client = get_redis(self.config)
+        script = self._scripts.get(id(client))
+        if script is None:
+            script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            self._scripts = {id(client): script}
+
+        granted, wait = script(
+            keys=[f"{KEY_PREFIX}:{key}", f"{KEY_PREFIX}:metrics:{key.split(':', 1)[0]}"],
+            args=[rate, burst, max_wait]
+        )
+        return bool(int(granted)), float(wait)
+
+    def _reserve_local(self, key, rate, burst, max_wait):
+        """
+        Réserve un jeton dans un seau local au processus (même algorithme que le script Lua)
+        Returns:
+            tuple: (accordé, attente en secondes)
+        """
+        with self._lock:
+            now = time.monotonic()
+            tokens, ts = self._local.get(key, (burst, now))
+            tokens = min(burst, tokens + max(0.0, now - ts) * rate) - 1
+            wait = -tokens / rate if tokens < 0 else 0.0
+
+            if wait > max_wait:
+                return False, wait
+
+            self._local[key] = (tokens, now)
+            return True, wait
+
+    def _record(self, provider, granted, wait):
+        """
+        Met à jour les métriques d'attente du processus
+        """
+        with self._lock:
+            stats = self._stats.setdefault(provider, {'acquired': 0, 'denied': 0, 'waited': 0, 'wait_seconds': 0.0, 'max_wait': 0.0})
+            if not granted:
+                stats['denied'] += 1
+                return
+            stats['acquired'] += 1
+            if wait > 0:
+                stats['waited'] += 1
+                stats['wait_seconds'] += wait
+                stats['max_wait'] = max(stats['max_wait'], wait)
+
+    def stats(self):
+        """
+        Retourne les métriques d'attente de ce processus
+        Returns:
+            dict: fournisseur -> {acquired, denied, waited, wait_seconds, max_wait}
+        """
+        with self._lock:
+            return {provider: dict(stats) for provider, stats in self._stats.items()}
+
+    def cluster_stats(self):
+        """
+        Retourne les métriques d'attente cumulées de tous les workers (Redis)
+        Returns:
+            dict: fournisseur -> {acquired, denied, waited, wait_seconds}
+        """
+        from utils.redis_client import get_redis
+
+        client = get_redis(self.config)
+        prefix = f"{KEY_PREFIX}:metrics:"
+        stats = {}
+        for key in client.scan_iter(match=f"{prefix}*"):
+            values = client.hgetall(key)
+            stats[key.decode('utf-8')[len(prefix):]] = {
+                'acquired': int(values.get(b'acquired', 0)),
+                'denied': int(values.get(b'denied', 0)),
+                'waited': int(values.get(b'waited', 0)),
+                'wait_seconds': float(values.get(b'wait_seconds', 0))
+            }
+        return stats
+
+
+# Limiteur partagé par les modules OSINT du processus
+outbound_limiter = OutboundRateLimiter()
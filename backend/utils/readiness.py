@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Attente de la fin du chargement des pages de résultats
+Au lieu d'une pause fixe après l'apparition des premiers résultats, les
+scrapers attendent que le nombre de résultats ne change plus pendant une
+courte fenêtre et que le navigateur n'ait plus de requêtes réseau en cours
+(événements CDP Network lus dans le journal 'performance' de Chrome). Une page
+rapide est donc lue immédiatement, une page lente jusqu'à la limite fixée.
+"""
+
+import json
+import time
+import logging
+
+from config import active_config
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Intervalle entre deux vérifications (secondes)
+POLL_INTERVAL = 0.1
+
+# Requêtes longues tolérées (connexions persistantes, suivi d'audience)
+MAX_INFLIGHT_REQUESTS = 2
+
+# Journal Chrome qui transporte les événements CDP (à activer sur le WebDriver)
+PERFORMANCE_LOG = 'performance'
+LOGGING_PREFS = {PERFORMANCE_LOG: 'ALL'}
+
+class NetworkMonitor:
+    """Requêtes réseau en cours dans le navigateur, d'après les événements CDP"""
+
+    def __init__(self, driver):
+        """
+        Initialise le suivi
+        Args:
+            driver: WebDriver Chrome démarré avec goog:loggingPrefs = LOGGING_PREFS
+        """
+        self.driver = driver
+        self.available = True
+        self.pending = set()
+        self.last_event = time.monotonic()
+
+    def reset(self):
+        """
+        Oublie les requêtes de la page précédente (à appeler avant driver.get)
+        """
+        self.poll()
+        self.pending.clear()
+        self.last_event = time.monotonic()
+
+    def poll(self):
+        """
+        Lit les événements réseau reçus depuis le dernier appel
+        """
+        if not self.available:
+            return
+
+        try:
+            entries = self.driver.get_log(PERFORMANCE_LOG)
+        except Exception as e:
+            logger.warning(f"Événements réseau du navigateur indisponibles, attente sur les résultats seuls: {str(e)}")
+            self.available = False
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get('method')
+            request_id = message.get('params', {}).get('requestId')
+            if method == 'Network.requestWillBeSent':
+                self.pending.add(request_id)
+            elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                self.pending.discard(request_id)
+            else:
+                continue
+            self.last_event = time.monotonic()
+
+    def idle(self, window):
+        """
+        Indique si le réseau est au repos
+        Args:
+            window: Durée sans nouvel événement réseau exigée (secondes)
+        Returns:
+            bool: True si au plus MAX_INFLIGHT_REQUESTS requêtes sont en cours
+                depuis au moins window secondes (toujours True sans événements CDP)
+        """
+        if not self.available:
+            return True
+        return len(self.pending) <= MAX_INFLIGHT_REQUESTS and time.monotonic() - self.last_event >= window
+
+def wait_for_results(driver, selector, network=None, timeout=None, window=None, config=None):
+    """
+    Attend que les résultats d'une page soient complets
+    Args:
+        driver: WebDriver sur la page de résultats (les premiers résultats sont déjà présents)
+        selector: Sélecteur CSS des éléments de résultat
+        network: NetworkMonitor du navigateur (facultatif)
+        timeout: Attente maximale en secondes (par défaut: SCRAPER_SETTLE_TIMEOUT)
+        window: Durée de stabilité exigée en secondes (par défaut: SCRAPER_SETTLE_WINDOW)
+        config: Configuration à utiliser (par défaut: active_config)
+    Returns:
+        int: Nombre de résultats présents
+    """
+    config = config or active_config
+    timeout = config.SCRAPER_SETTLE_TIMEOUT if timeout is None else timeout
+    window = config.SCRAPER_SETTLE_WINDOW if window is None else window
+
+    start = time.monotonic()
+    deadline = start + timeout
+    count, stable_since = None, start
+
+    while True:
+        current = driver.execute_script("return document.querySelectorAll(arguments[0]).length", selector)
+        if network is not None:
+            network.poll()
+
+        now = time.monotonic()
+        if current != count:
+            count, stable_since = current, now
+        elif now - stable_since >= window and (network is None or network.idle(window)):
+            logger.debug(f"Résultats stables ({count}) après {now - start:.2f} s")
+            return count
+
+        if now >= deadline:
+            logger.info(f"Chargement des résultats non terminé après {timeout} s, lecture de {count} résultats")
+            return count
+
+        time.sleep(POLL_INTERVAL)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Client Redis partagé
+Ce module fournit un client Redis unique par processus, créé à la première
+utilisation à partir de REDIS_URL.
+"""
+
+import os
+import logging
+import threading
+
+from config import active_config
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+def get_redis(config=None):
+    """
+    Retourne le client Redis du processus
+    
+    Le client (et son pool de connexions) est recréé après un fork : les
+    connexions du processus maître ne sont pas partagées avec les workers.
+    Args:
+        config: Configuration à utiliser (par défaut: active_config)
+    Returns:
+        redis.Redis: Client Redis
+    """
+    global _client, _client_pid
+
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            import redis
+            config = config or active_config
+            _client = redis.Redis.from_url(config.REDIS_URL, socket_timeout=1.0, socket_connect_timeout=1.0)
+            _client_pid = os.getpid()
+
+    return _client
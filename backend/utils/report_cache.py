@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Cache des rapports
+Ce module conserve les rapports HTML déjà rendus, indexés par identifiant de
+recherche et empreinte des résultats, les pré-rend en arrière-plan à la fin
+d'une recherche et limite la taille et l'âge du cache.
+"""
+
+import os
+import glob
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import active_config
+from modules.registry import get_module_class
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+class ReportCache:
+    """Cache disque des rapports HTML par recherche"""
+
+    def __init__(self, config=None):
+        """
+        Initialise le cache des rapports
+        Args:
+            config: Configuration à utiliser (par défaut: active_config)
+        """
+        self.config = config or active_config
+        self.max_bytes = self.config.REPORT_CACHE_MAX_MB * 1024 * 1024
+        self.max_age = self.config.REPORT_CACHE_MAX_AGE_HOURS * 3600
+
+        # Répertoire du cache, à côté des rapports générés
+        self.cache_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'reports', 'cache')
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Pré-rendu en arrière-plan, un seul rendu en cours par rapport
+        self._executor = ThreadPoolExecutor(max_workers=self.config.REPORT_PRERENDER_WORKERS, thread_name_prefix='report-prerender')
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, search_id, results_hash):
+        """
+        Retourne le chemin du rapport en cache pour une recherche et un contenu
+        Args:
+            search_id: Identifiant de la recherche
+            results_hash: Empreinte du contenu des résultats
+        Returns:
+            str: Chemin du fichier de cache
+        """
+        return os.path.join(self.cache_dir, f"{search_id}_{results_hash[:16]}.html")
+
+    def get(self, search_id, results_hash):
+        """
+        Recherche un rapport déjà rendu
+        Args:
+            search_id: Identifiant de la recherche
+            results_hash: Empreinte du contenu des résultats
+        Returns:
+            str: Chemin du rapport en cache, ou None s'il est absent ou expiré
+        """
+        report_file = self.path_for(search_id, results_hash)
+
+        try:
+            if time.time() - os.path.getmtime(report_file) > self.max_age:
+                return None
+        except OSError:
+            return None
+
+        return report_file
+
+    def stream(self, search_id, results_hash, report_data):
+        """
+        Rend un rapport de manière incrémentale en l'enregistrant dans le cache
+        Args:
+            search_id: Identifiant de la recherche
+            results_hash: Empreinte du contenu des résultats
+            report_data: Données du rapport
+        Yields:
+            str: Fragments HTML successifs
+        """
+        report_file = self.path_for(search_id, results_hash)
+        data_aggregator = get_module_class('DataAggregator')()
+
+        yield from data_aggregator.stream_report(report_data, report_file=report_file)
+
+        if os.path.exists(report_file):
+            self._discard_stale(search_id, report_file)
+            self.evict()
+
+    def render(self, search_id, results_hash, build_report_data):
+        """
+        Rend un rapport dans le cache s'il n'y est pas déjà
+        Args:
+            search_id: Identifiant de la recherche
+            results_hash: Empreinte du contenu des résultats
+            build_report_data: Fonction sans argument retournant les données du rapport
+        Returns:
+            str: Chemin du rapport en cache, ou None en cas d'échec
+        """
+        report_file = self.get(search_id, results_hash)
+        if report_file:
+            return report_file
+
+        for _ in self.stream(search_id, results_hash, build_report_data()):
+            pass
+
+        return self.get(search_id, results_hash)
+
+    def prerender(self, search_id, results_hash, build_report_data):
+        """
+        Planifie le rendu d'un rapport en arrière-plan
+        Args:
+            search_id: Identifiant de la recherche
+            results_hash: Empreinte du contenu des résultats
+            build_report_data: Fonction sans argument retournant les données du
+                rapport (appelée dans le thread de rendu)
+        Returns:
+            Future: Rendu en cours (partagé si le même rapport est déjà planifié)
+        """
+        key = self.path_for(search_id, results_hash)
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._prerender, key, search_id, results_hash, build_report_data)
+                self._pending[key] = future
+
+        return future
+
+    def _prerender(self, key, search_id, results_hash, build_report_data):
+        """
+        Exécute un pré-rendu et le retire des rendus en cours
+        """
+        try:
+            report_file = self.render(search_id, results_hash, build_report_data)
+            logger.info(f"Rapport pré-rendu pour la recherche {search_id}: {report_file}")
+            return report_file
+        except Exception as e:
+            logger.error(f"Erreur lors du pré-rendu du rapport {search_id}: {str(e)}")
+            return None
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _discard_stale(self, search_id, report_file):
+        """
+        Supprime les rapports d'une recherche rendus à partir d'un autre contenu
+        """
+        for path in glob.glob(os.path.join(self.cache_dir, f"{search_id}_*.html")):
+            if path != report_file:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def evict(self):
+        """
+        Applique le budget du cache : supprime les rapports expirés puis les plus
+        anciens jusqu'à revenir sous la taille maximale
+        Returns:
+            int: Nombre de rapports supprimés
+        """
+        now = time.time()
+        entries = []
+
+        for path in glob.glob(os.path.join(self.cache_dir, '*.html')):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total_size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total_size -= size
+                removed += 1
+            except OSError:
+                pass
+
+        if removed:
+            logger.info(f"Cache des rapports: {removed} rapports supprimés")
+        return removed
+
+
+# Cache partagé par les routes du processus
+report_cache = ReportCache()
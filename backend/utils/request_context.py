@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Contexte de requête partagé
+Le corps d'une requête, ses en-têtes de consentement et de cas d'usage et
+l'identité de l'utilisateur sont lus et validés une seule fois (dans
+before_request ou au premier accès), puis réutilisés par la vérification
+éthique, le journal d'audit et les routes.
+"""
+
+import logging
+
+from flask import g, request
+
+from utils.legal_check import validate_use_case
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# En-têtes de consentement et de cas d'usage
+CONSENT_HEADER = 'X-Ethical-Consent'
+USE_CASE_HEADER = 'X-Use-Case'
+
+# Marqueur d'un attribut non encore calculé
+_UNSET = object()
+
+class RequestContext:
+    """Données d'une requête lues et validées une seule fois"""
+
+    def __init__(self, flask_request):
+        """
+        Lit les en-têtes et paramètres de la requête (le corps est lu au premier accès)
+        Args:
+            flask_request: Requête Flask
+        """
+        self._request = flask_request
+        self.method = flask_request.method
+        self.path = flask_request.path
+
+        self.consent = flask_request.headers.get(CONSENT_HEADER, '').lower() == 'true'
+        self.use_case = flask_request.headers.get(USE_CASE_HEADER)
+        self.use_case_valid = validate_use_case(self.use_case)
+
+        # Identité renseignée par auth_required (voir utils/auth.py)
+        self.identity_resolved = False
+        self.user = None
+        self.user_id = None
+
+        # Résultat de la vérification éthique (voir check_ethical_compliance)
+        self.compliance = None
+
+        self._json = _UNSET
+        self._form = _UNSET
+        self._text = _UNSET
+
+    @property
+    def json(self):
+        """
+        Corps JSON de la requête (None s'il est absent ou invalide), analysé une fois
+        """
+        if self._json is _UNSET:
+            self._json = self._request.get_json(silent=True) if self._request.is_json else None
+        return self._json
+
+    @property
+    def form(self):
+        """
+        Champs du formulaire de la requête
+        """
+        if self._form is _UNSET:
+            self._form = self._request.form.to_dict()
+        return self._form
+
+    @property
+    def text(self):
+        """
+        Texte analysé par la vérification éthique (paramètres, valeurs JSON ou formulaire)
+        """
+        if self._text is _UNSET:
+            if self.method == 'GET':
+                self._text = ' '.join(self._request.args.values())
+            elif self._request.is_json:
+                json_data = self.json
+                if isinstance(json_data, dict):
+                    self._text = ' '.join(str(v) for v in json_data.values())
+                elif isinstance(json_data, list):
+                    self._text = ' '.join(str(item) for item in json_data)
+                else:
+                    self._text = str(json_data) if json_data is not None else ''
+            else:
+                self._text = ' '.join(self.form.values())
+        return self._text
+
+    def set_identity(self, user_id, user=None):
+        """
+        Enregistre l'utilisateur authentifié de la requête
+        Args:
+            user_id: Identifiant de l'utilisateur (None pour une requête anonyme)
+            user: Utilisateur en cache (facultatif)
+        """
+        self.user_id = user_id
+        self.user = user
+        self.identity_resolved = True
+
+
+def get_request_context():
+    """
+    Retourne le contexte de la requête courante, créé au premier appel
+    Returns:
+        RequestContext: Contexte de la requête
+    """
+    context = g.get('request_context')
+    if context is None:
+        context = RequestContext(request)
+        g.request_context = context
+    return context
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Extraction des pages de résultats des moteurs
+Chaque fonction analyse la source d'une page de résultats (Google Images,
+Yandex, TinEye, recherche Google restreinte à un site) et n'en construit que
+les conteneurs utiles (voir utils/html_parser.py).
+"""
+
+from utils.html_parser import parse_html
+
+# Conteneurs de résultats de chaque page
+GOOGLE_IMAGES_SCOPE = '#search, #topstuff, #islrg'
+YANDEX_IMAGES_SCOPE = '.serp-list, .cbir-recognition'
+TINEYE_SCOPE = '.results, .sidebar-domains'
+GOOGLE_SEARCH_SCOPE = '#search'
+
+def parse_google_images(html, parser=None, scoped=True):
+    """
+    Extrait les résultats d'une recherche Google Images par image
+    Args:
+        html: Source de la page
+        parser: Parseur à utiliser (par défaut: HTML_PARSER)
+        scoped: Restreindre l'analyse aux conteneurs de résultats
+    Returns:
+        dict: Images similaires, sites web et meilleure supposition
+    """
+    document = parse_html(html, GOOGLE_IMAGES_SCOPE if scoped else None, parser)
+
+    results = {
+        'similar_images': [],
+        'websites': [],
+        'best_guess': None
+    }
+
+    # Récupérer les sites web contenant l'image
+    for element in document.select(".Psd1Cc"):
+        title_elem = element.select_one(".MLSGY")
+        url_elem = element.select_one(".KjWMVd")
+        description_elem = element.select_one(".VjqMgc")
+
+        if title_elem and url_elem:
+            results['websites'].append({
+                'title': title_elem.get_text(),
+                'url': url_elem.get('href'),
+                'description': description_elem.get_text() if description_elem else ''
+            })
+
+    # Récupérer la meilleure supposition (best guess)
+    best_guess_elem = document.select_one(".fKDtNb")
+    if best_guess_elem:
+        results['best_guess'] = best_guess_elem.get_text()
+
+    # Récupérer les images similaires
+    for element in document.select(".isv-r"):
+        img_elem = element.select_one("img.Q4LuWd")
+        link_elem = element.select_one("a")
+
+        if img_elem and link_elem:
+            img_url = img_elem.get('src')
+            page_url = link_elem.get('href')
+            if img_url and not img_url.startswith('data:'):
+                results['similar_images'].append({
+                    'url': img_url,
+                    'page_url': page_url if page_url and page_url.startswith('http') else None
+                })
+
+    return results
+
+def parse_yandex_images(html, parser=None, scoped=True):
+    """
+    Extrait les résultats d'une recherche Yandex Images par image
+    Args:
+        html: Source de la page
+        parser: Parseur à utiliser (par défaut: HTML_PARSER)
+        scoped: Restreindre l'analyse aux conteneurs de résultats
+    Returns:
+        dict: Images similaires, sites web et catégories suggérées
+    """
+    document = parse_html(html, YANDEX_IMAGES_SCOPE if scoped else None, parser)
+
+    results = {
+        'similar_images': [],
+        'websites': [],
+        'categories': []
+    }
+
+    # Récupérer les sites web et les images
+    for element in document.select(".serp-item"):
+        title_elem = element.select_one(".serp-item__title")
+        link_elem = element.select_one(".serp-item__link")
+        thumb_elem = element.select_one(".serp-item__thumb")
+
+        if title_elem and link_elem:
+            site_info = {
+                'title': title_elem.get_text(),
+                'url': link_elem.get('href'),
+                'thumbnail': thumb_elem.get('src') if thumb_elem else None
+            }
+
+            # Un résultat avec vignette est une image, sinon un site web
+            if thumb_elem:
+                results['similar_images'].append(site_info)
+            else:
+                results['websites'].append(site_info)
+
+    # Récupérer les catégories suggérées
+    for element in document.select(".cbir-recognition__group"):
+        category_name = element.select_one(".cbir-recognition__group-title")
+        category_items = element.select(".cbir-recognition__label")
+
+        if category_name:
+            results['categories'].append({
+                'name': category_name.get_text(),
+                'items': [item.get_text() for item in category_items]
+            })
+
+    return results
+
+def parse_tineye(html, parser=None, scoped=True):
+    """
+    Extrait les résultats d'une recherche TinEye
+    Args:
+        html: Source de la page
+        parser: Parseur à utiliser (par défaut: HTML_PARSER)
+        scoped: Restreindre l'analyse aux conteneurs de résultats
+    Returns:
+        dict: Correspondances, nombre total de résultats et domaines
+    """
+    document = parse_html(html, TINEYE_SCOPE if scoped else None, parser)
+
+    results = {
+        'matches': [],
+        'total_results': 0,
+        'domains': []
+    }
+
+    # Récupérer le nombre total de résultats
+    total_results_elem = document.select_one(".matches strong")
+    if total_results_elem:
+        try:
+            results['total_results'] = int(total_results_elem.get_text().replace(',', ''))
+        except ValueError:
+            pass
+
+    # Récupérer les correspondances
+    for element in document.select(".match-row"):
+        image_tag = element.select_one(".match-img img")
+        link_tag = element.select_one(".match-details .item-link a")
+        domain_tag = element.select_one(".match-details .domains a")
+        size_tag = element.select_one(".match-details .image-detail-size")
+
+        if image_tag and link_tag:
+            results['matches'].append({
+                'thumbnail': image_tag.get('src'),
+                'url': link_tag.get('href'),
+                'domain': domain_tag.get_text() if domain_tag else None,
+                'size': size_tag.get_text() if size_tag else None
+            })
+
+    # Récupérer les domaines
+    for element in document.select(".sidebar-domains .domain-link"):
+        domain_name = element.select_one(".domain-name")
+        domain_count = element.select_one(".domain-count")
+
+        if domain_name and domain_count:
+            results['domains'].append({
+                'name': domain_name.get_text(),
+                'count': domain_count.get_text().strip('()')
+            })
+
+    return results
+
+def parse_google_results(html, parser=None, scoped=True):
+    """
+    Extrait les résultats d'une recherche Google (requêtes site:...)
+    Args:
+        html: Source de la page
+        parser: Parseur à utiliser (par défaut: HTML_PARSER)
+        scoped: Restreindre l'analyse au conteneur de résultats
+    Returns:
+        list: Résultats {name, url, description}, à filtrer par l'appelant
+    """
+    document = parse_html(html, GOOGLE_SEARCH_SCOPE if scoped else None, parser)
+
+    results = []
+    for g in document.select('.g'):
+        link_elem = g.select_one('a')
+        title_elem = g.select_one('h3')
+        description_elem = g.select_one('.VwiC3b')
+
+        if link_elem and title_elem and link_elem.get('href'):
+            results.append({
+                'name': title_elem.get_text(),
+                'url': link_elem.get('href'),
+                'description': description_elem.get_text() if description_elem else None
+            })
+
+    return results
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Persistance des résultats de recherche
+Ce module aplatit les résultats des modules OSINT en éléments individuels
+(profil, compte, image, site web, email) destinés à la table search_results,
+et reconstruit les données d'un rapport à partir de ces éléments.
+"""
+
+import json
+import hashlib
+import logging
+
+from modules.registry import get_module_class
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Types d'éléments comptés dans results_count
+ITEM_RESULT_TYPES = ('profile', 'account', 'image', 'website', 'email')
+
+# Clés des moteurs de recherche d'image contenant des listes d'images ou de pages
+IMAGE_LIST_KEYS = ('similar_images', 'matches', 'full_matches', 'partial_matches', 'visually_similar')
+WEBSITE_LIST_KEYS = ('websites', 'pages_with_image')
+
+def _item(result_type, source, data, confidence=None):
+    """
+    Construit un élément de résultat
+    """
+    return {
+        'result_type': result_type,
+        'source': source,
+        'confidence': confidence,
+        'data': data
+    }
+
+def _flatten_emails(emails, source):
+    """
+    Aplatit une liste d'emails (format Hunter.io)
+    """
+    items = []
+    for email in emails or []:
+        if isinstance(email, dict) and email.get('value'):
+            items.append(_item('email', source, email, email.get('confidence')))
+    return items
+
+def _flatten_image_search(image_search):
+    """
+    Aplatit les résultats de recherche d'image inversée, moteur par moteur
+    """
+    items = []
+    for engine, results in (image_search or {}).items():
+        if not isinstance(results, dict):
+            continue
+
+        summary = {}
+        for key, value in results.items():
+            if key in IMAGE_LIST_KEYS and isinstance(value, list):
+                for image in value:
+                    if isinstance(image, dict):
+                        items.append(_item('image', engine, dict(image, kind=key)))
+            elif key in WEBSITE_LIST_KEYS and isinstance(value, list):
+                for website in value:
+                    if isinstance(website, dict):
+                        items.append(_item('website', engine, website))
+            else:
+                # Informations globales du moteur (best_guess, catégories, erreur...)
+                summary[key] = value
+
+        if summary:
+            items.append(_item('engine_summary', engine, summary))
+    return items
+
+def flatten_results(search_type, results):
+    """
+    Aplatit les résultats d'une recherche en éléments individuels
+    Args:
+        search_type: Type de recherche ('person', 'username', 'photo')
+        results: Résultats renvoyés par les modules OSINT
+    Returns:
+        list: Éléments {result_type, source, confidence, data}
+    """
+    items = []
+
+    if search_type == 'person':
+        for platform, profiles in results.get('profiles', {}).items():
+            for profile in profiles:
+                items.append(_item('profile', platform, profile))
+
+    elif search_type == 'username':
+        accounts = results.get('accounts', {})
+        if isinstance(accounts, dict):
+            for site, account in accounts.items():
+                items.append(_item('account', site, account if isinstance(account, dict) else {'url': account}))
+
+    elif search_type == 'photo':
+        if 'face_detection' in results:
+            items.append(_item('face_detection', 'face_recognition', results['face_detection']))
+        items.extend(_flatten_image_search(results.get('image_search')))
+
+    # Emails éventuellement associés (recherche Hunter.io)
+    items.extend(_flatten_emails(results.get('emails'), 'hunter.io'))
+
+    return items
+
+def count_items(items):
+    """
+    Compte les éléments de résultat significatifs (hors résumés)
+    Args:
+        items: Éléments de résultat
+    Returns:
+        int: Nombre d'éléments
+    """
+    return sum(1 for item in items if item['result_type'] in ITEM_RESULT_TYPES)
+
+def canonical_items(items):
+    """
+    Trie les éléments dans un ordre indépendant de l'ordre de stockage
+    Args:
+        items: Éléments de résultat
+    Returns:
+        list: Éléments triés
+    """
+    return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, default=str))
+
+def content_hash(items):
+    """
+    Calcule l'empreinte du contenu des résultats d'une recherche
+    Args:
+        items: Éléments de résultat
+    Returns:
+        str: Empreinte SHA-256 hexadécimale
+    """
+    payload = json.dumps(canonical_items(items), sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def build_report_data(search_type, search_term, items):
+    """
+    Prépare les données d'un rapport à partir des éléments de résultat
+    Args:
+        search_type: Type de recherche ('person', 'username', 'photo')
+        search_term: Terme recherché (nom, nom d'utilisateur ou fichier)
+        items: Éléments de résultat
+    Returns:
+        dict: Données agrégées du rapport, ou None si le type n'est pas pris en charge
+    """
+    if search_type not in ('person', 'username', 'photo'):
+        return None
+
+    profiles = {}
+    engines = {}
+    emails = []
+
+    for item in canonical_items(items):
+        data = item['data'] or {}
+        if item['result_type'] == 'profile':
+            profiles.setdefault(item['source'], []).append(data)
+        elif item['result_type'] == 'account':
+            profiles.setdefault(item['source'], []).append({'name': item['source'], 'url': data.get('url', '')})
+        elif item['result_type'] in ('image', 'website', 'engine_summary'):
+            engine = engines.setdefault(item['source'], {'similar_images': [], 'websites': []})
+            if item['result_type'] == 'engine_summary':
+                engine.update(data)
+            elif item['result_type'] == 'website':
+                engine['websites'].append(data)
+            elif item['source'] == 'tineye':
+                # TinEye : la vignette est l'image, l'URL est la page qui la contient
+                engine['similar_images'].append({'url': data.get('thumbnail'), 'page_url': data.get('url')})
+            elif data.get('url'):
+                engine['similar_images'].append({'url': data['url'], 'page_url': data.get('page_url')})
+        elif item['result_type'] == 'email':
+            emails.append(data)
+
+    data_aggregator = get_module_class('DataAggregator')()
+    report_data = data_aggregator.aggregate_person_data(
+        search_term,
+        {'profiles': profiles} if profiles else None,
+        engines or None,
+        {'emails': emails} if emails else None
+    )
+
+    if search_type == 'username':
+        report_data['possible_usernames'] = sorted(set(report_data.get('possible_usernames', [])) | {search_term})
+
+    return report_data
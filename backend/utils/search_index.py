@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Indexation des résultats dans Elasticsearch
+Les éléments de résultat sont normalisés en documents (URL, noms d'utilisateur,
+emails, noms) et envoyés à Elasticsearch par requêtes bulk depuis un thread
+d'arrière-plan. La file est bornée : lorsque Elasticsearch ne suit pas, les
+producteurs attendent brièvement puis les documents sont abandonnés (ils restent
+en base et peuvent être réindexés avec `flask reindex`).
+"""
+
+import os
+import queue
+import atexit
+import logging
+import threading
+
+from utils.result_persistence import canonical_items, content_hash
+from utils.urls import canonicalize_url
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Clés dont les valeurs sont des noms d'utilisateur ou des noms de personnes
+USERNAME_KEYS = ('username', 'login', 'handle', 'screen_name')
+NAME_KEYS = ('name', 'full_name', 'display_name', 'title')
+
+# Correspondances de l'index des résultats
+INDEX_MAPPINGS = {
+    'settings': {
+        'analysis': {
+            'normalizer': {
+                'lowercase': {'type': 'custom', 'filter': ['lowercase']}
+            }
+        }
+    },
+    'mappings': {
+        'properties': {
+            'search_id': {'type': 'keyword'},
+            'user_id': {'type': 'keyword'},
+            'search_type': {'type': 'keyword'},
+            'search_term': {'type': 'text', 'fields': {'raw': {'type': 'keyword', 'normalizer': 'lowercase'}}},
+            'searched_at': {'type': 'date'},
+            'result_type': {'type': 'keyword'},
+            'source': {'type': 'keyword'},
+            'confidence': {'type': 'integer'},
+            'urls': {'type': 'keyword', 'normalizer': 'lowercase'},
+            'usernames': {'type': 'keyword', 'normalizer': 'lowercase'},
+            'emails': {'type': 'keyword', 'normalizer': 'lowercase'},
+            'names': {'type': 'text'},
+            'text': {'type': 'text'}
+        }
+    }
+}
+
+# Champ interrogé selon le type de recherche dans l'historique
+QUERY_FIELDS = {
+    'url': 'urls',
+    'username': 'usernames',
+    'email': 'emails'
+}
+
+def normalize_url(url):
+    """
+    Normalise une URL pour la recherche exacte (forme canonique, voir utils.urls)
+    """
+    return canonicalize_url(url) or url.strip().rstrip('/').lower()
+
+def _collect(value, key, fields):
+    """
+    Parcourt récursivement les données d'un élément et range les valeurs utiles
+    """
+    if isinstance(value, dict):
+        for child_key, child in value.items():
+            _collect(child, str(child_key).lower(), fields)
+    elif isinstance(value, list):
+        for child in value:
+            _collect(child, key, fields)
+    elif isinstance(value, str) and value.strip():
+        text = value.strip()
+        if text.startswith(('http://', 'https://')):
+            fields['urls'].add(normalize_url(text))
+        elif '@' in text and ' ' not in text and '.' in text.rsplit('@', 1)[-1]:
+            fields['emails'].add(text.lower())
+        elif key in USERNAME_KEYS:
+            fields['usernames'].add(text.lstrip('@'))
+        elif key in NAME_KEYS:
+            fields['names'].add(text)
+        fields['text'].append(text)
+
+def build_documents(search_history, items):
+    """
+    Normalise les éléments de résultat d'une recherche en documents d'index
+
+    L'identifiant d'un document dérive de la recherche et du contenu de
+    l'élément : une réindexation ou un nouvel essai remplace le document au lieu
+    de le dupliquer.
+    Args:
+        search_history: Entrée d'historique de la recherche
+        items: Éléments de résultat {result_type, source, confidence, data}
+    Returns:
+        list: Documents {_id, _source}
+    """
+    documents = []
+    for item in canonical_items(items):
+        fields = {'urls': set(), 'usernames': set(), 'emails': set(), 'names': set(), 'text': []}
+        _collect(item['data'], '', fields)
+
+        if item['result_type'] == 'account':
+            fields['usernames'].add(search_history.search_term)
+
+        documents.append({
+            '_id': f"{search_history.id}:{content_hash([item])[:20]}",
+            '_source': {
+                'search_id': str(search_history.id),
+                'user_id': str(search_history.user_id) if search_history.user_id else None,
+                'search_type': search_history.search_type,
+                'search_term': search_history.search_term,
+                'searched_at': search_history.created_at.isoformat(),
+                'result_type': item['result_type'],
+                'source': item['source'],
+                'confidence': item['confidence'],
+                'urls': sorted(fields['urls']),
+                'usernames': sorted(fields['usernames']),
+                'emails': sorted(fields['emails']),
+                'names': sorted(fields['names']),
+                'text': ' '.join(fields['text'])[:10000]
+            }
+        })
+    return documents
+
+class SearchIndexer:
+    """Indexation en arrière-plan des résultats de recherche dans Elasticsearch"""
+
+    def __init__(self, app=None):
+        """
+        Initialise l'indexeur
+        Args:
+            app: Application Flask (facultatif, voir init_app)
+        """
+        self.enabled = False
+        self._client = None
+        self._index_ready = False
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configure l'indexeur pour une application Flask
+        Args:
+            app: Application Flask
+        """
+        self.enabled = app.config['ELASTIC_INDEXING']
+        self.url = app.config['ELASTIC_URL']
+        self.index = app.config['ELASTIC_INDEX']
+        self.bulk_size = app.config['ELASTIC_BULK_SIZE']
+        self.max_retries = app.config['ELASTIC_MAX_RETRIES']
+        self.enqueue_timeout = app.config['ELASTIC_ENQUEUE_TIMEOUT']
+
+        self._queue = queue.Queue(maxsize=app.config['ELASTIC_QUEUE_SIZE'])
+        app.extensions['search_indexer'] = self
+        atexit.register(self.shutdown)
+
+    @property
+    def client(self):
+        """
+        Client Elasticsearch, créé à la première utilisation
+        """
+        if self._client is None:
+            from elasticsearch import Elasticsearch
+            self._client = Elasticsearch(self.url, timeout=30)
+        return self._client
+
+    def ensure_index(self):
+        """
+        Crée l'index des résultats s'il n'existe pas
+        """
+        if self._index_ready:
+            return
+
+        if not self.client.indices.exists(index=self.index):
+            self.client.indices.create(index=self.index, body=INDEX_MAPPINGS, ignore=400)
+            logger.info(f"Index Elasticsearch créé: {self.index}")
+        self._index_ready = True
+
+    def enqueue(self, documents):
+        """
+        Place des documents dans la file d'indexation
+
+        Si la file est pleine, l'appelant attend au plus ELASTIC_ENQUEUE_TIMEOUT
+        secondes (contre-pression) avant que les documents restants ne soient
+        abandonnés.
+        Args:
+            documents: Documents produits par build_documents
+        Returns:
+            int: Nombre de documents placés dans la file
+        """
+        if not self.enabled or not documents:
+            return 0
+
+        self._ensure_worker()
+
+        for count, document in enumerate(documents):
+            try:
+                self._queue.put(document, timeout=self.enqueue_timeout)
+            except queue.Full:
+                logger.warning(f"File d'indexation pleine: {len(documents) - count} documents non indexés")
+                return count
+        return len(documents)
+
+    def _ensure_worker(self):
+        """
+        Démarre le thread d'indexation dans le processus courant (après le fork)
+        """
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+
+        with self._start_lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+
+            if self._pid != os.getpid():
+                # Processus enfant : ne pas réutiliser la file ni le client du parent
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._stop = threading.Event()
+                self._client = None
+                self._index_ready = False
+
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='search-indexer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """
+        Boucle du thread d'indexation : regroupe les documents en requêtes bulk
+        """
+        while not self._stop.is_set():
+            batch = self._next_batch(1.0)
+            if batch:
+                self._send(batch)
+
+    def _next_batch(self, timeout):
+        """
+        Attend un premier document puis vide la file jusqu'à la taille de lot
+        """
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < self.bulk_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _send(self, batch):
+        """
+        Envoie un lot de documents, avec nouvel essai en cas d'indisponibilité
+        Returns:
+            int: Nombre de documents indexés
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.bulk(batch)
+            except Exception as e:
+                delay = min(2 ** attempt, 30)
+                logger.error(f"Erreur lors de l'indexation ({len(batch)} documents, essai {attempt + 1}): {str(e)}")
+                if attempt < self.max_retries and not self._stop.wait(delay):
+                    continue
+                break
+
+        logger.error(f"{len(batch)} documents non indexés après {self.max_retries + 1} essais")
+        return 0
+
+    def bulk(self, documents):
+        """
+        Indexe des documents par requêtes bulk (synchrone)
+
+        Les rejets temporaires (HTTP 429) sont renvoyés par streaming_bulk avec un
+        délai croissant ; les autres rejets sont journalisés.
+        Args:
+            documents: Itérable de documents produits par build_documents
+        Returns:
+            int: Nombre de documents indexés
+        """
+        from elasticsearch.helpers import streaming_bulk
+
+        self.ensure_index()
+
+        actions = (
+            {'_index': self.index, '_id': document['_id'], '_source': document['_source']}
+            for document in documents
+        )
+
+        indexed = 0
+        for ok, info in streaming_bulk(
+            self.client,
+            actions,
+            chunk_size=self.bulk_size,
+            max_retries=self.max_retries,
+            initial_backoff=1,
+            max_backoff=30,
+            raise_on_error=False
+        ):
+            if ok:
+                indexed += 1
+            else:
+                logger.error(f"Document rejeté par Elasticsearch: {info}")
+        return indexed
+
+    def search(self, user_id, query, field=None, size=20):
+        """
+        Recherche une valeur dans les résultats indexés d'un utilisateur
+        Args:
+            user_id: Identifiant de l'utilisateur
+            query: Valeur recherchée (URL, nom d'utilisateur, email ou texte)
+            field: 'url', 'username', 'email' ou None (tous les champs)
+            size: Nombre maximal de résultats
+        Returns:
+            list: Documents correspondants, les plus récents d'abord
+        """
+        if field == 'url':
+            match = {'term': {'urls': normalize_url(query)}}
+        elif field in QUERY_FIELDS:
+            match = {'term': {QUERY_FIELDS[field]: query.strip().lstrip('@')}}
+        else:
+            match = {'multi_match': {'query': query, 'fields': ['urls', 'usernames', 'emails', 'names', 'search_term', 'text']}}
+
+        response = self.client.search(index=self.index, body={
+            'query': {'bool': {'must': [match], 'filter': [{'term': {'user_id': str(user_id)}}]}},
+            'sort': [{'searched_at': 'desc'}, '_score'],
+            'size': size
+        })
+        return [hit['_source'] for hit in response['hits']['hits']]
+
+    def shutdown(self, timeout=5.0):
+        """
+        Arrête le thread d'indexation et envoie les documents restants
+        Args:
+            timeout: Temps maximal d'attente du thread (en secondes)
+        """
+        if self._queue is None or self._pid != os.getpid():
+            return
+
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if remaining:
+            try:
+                self.bulk(remaining)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'indexation à l'arrêt: {str(e)}")
+
+
+# Indexeur partagé par l'application (voir init_app dans create_app)
+search_indexer = SearchIndexer()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Regroupement des recherches identiques simultanées
+Lorsque plusieurs requêtes lancent la même recherche en même temps (même nom
+d'utilisateur normalisé, même image), une seule l'exécute et les autres
+reçoivent son résultat. Dans un processus, les appelants attendent l'exécution
+en cours ; entre workers, un verrou Redis désigne l'exécutant, qui dépose le
+résultat dans Redis pour les autres.
+"""
+
+import copy
+import json
+import time
+import uuid
+import logging
+import threading
+
+from config import active_config
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Préfixe des clés Redis des verrous et des résultats
+KEY_PREFIX = 'thewatcher:singleflight'
+
+# Supprime le verrou seulement s'il appartient encore à l'exécutant
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Intervalle maximal entre deux lectures du résultat par un worker en attente (secondes)
+MAX_POLL_INTERVAL = 1.0
+
+class _Call:
+    """Exécution en cours dans le processus"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _json_default(value):
+    """
+    Sérialise les ensembles (fréquents dans les résultats des modules OSINT)
+    """
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+class SingleFlight:
+    """Exécution unique des appels identiques simultanés, dans le processus et entre workers"""
+
+    def __init__(self, config=None):
+        """
+        Initialise le regroupement
+        Args:
+            config: Configuration à utiliser (par défaut: active_config)
+        """
+        self.config = config or active_config
+        self.enabled = self.config.SINGLEFLIGHT_ENABLED
+        self.lock_ttl = self.config.SINGLEFLIGHT_LOCK_TTL
+        self.wait_timeout = self.config.SINGLEFLIGHT_WAIT_TIMEOUT
+        self.result_ttl = self.config.SINGLEFLIGHT_RESULT_TTL
+
+        # Un appelant qui attend puis exécute la recherche localement doit
+        # terminer avant que gunicorn n'arrête le worker
+        worker_timeout = self.config.WORKER_TIMEOUT
+        if self.wait_timeout >= worker_timeout:
+            logger.warning(
+                f"SINGLEFLIGHT_WAIT_TIMEOUT ({self.wait_timeout} s) doit être inférieur au timeout des workers "
+                f"({worker_timeout} s) : attente réduite à {worker_timeout // 2} s"
+            )
+            self.wait_timeout = worker_timeout // 2
+
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Exécute fn, ou attend le résultat d'une exécution identique en cours
+
+        Chaque appelant reçoit sa propre copie du résultat. Si l'exécutant
+        échoue, l'exception est transmise aux appelants du même processus ;
+        les workers en attente relancent alors la recherche eux-mêmes.
+        Args:
+            key: Clé de la recherche (requête normalisée ou empreinte du contenu)
+            fn: Fonction sans argument qui exécute la recherche
+        Returns:
+            Résultat de fn
+        """
+        if not self.enabled:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.done.wait(self.wait_timeout):
+                if call.error is not None:
+                    raise call.error
+                logger.info(f"Recherche partagée avec une exécution en cours: {key}")
+                return copy.deepcopy(call.result)
+            logger.warning(f"Attente de la recherche {key} expirée, exécution locale")
+            return fn()
+
+        try:
+            call.result = self._run_distributed(key, fn)
+            return copy.deepcopy(call.result)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _run_distributed(self, key, fn):
+        """
+        Exécute fn si ce worker obtient le verrou Redis, sinon attend le résultat de l'exécutant
+        """
+        try:
+            from utils.redis_client import get_redis
+            client = get_redis(self.config)
+            lock_key = f"{KEY_PREFIX}:lock:{key}"
+            token = uuid.uuid4().hex
+            acquired = client.set(lock_key, token, nx=True, ex=self.lock_ttl)
+        except Exception as e:
+            logger.warning(f"Redis indisponible, recherche {key} non partagée entre workers: {str(e)}")
+            return fn()
+
+        deadline = time.monotonic() + self.wait_timeout
+        while not acquired:
+            result, acquired = self._wait_for_leader(client, key, lock_key, token, deadline)
+            if not acquired:
+                logger.info(f"Recherche partagée avec un autre worker: {key}")
+                return result
+
+        return self._lead(client, key, lock_key, token, fn)
+
+    def _lead(self, client, key, lock_key, token, fn):
+        """
+        Exécute la recherche en tant qu'exécutant et dépose le résultat pour les autres workers
+        """
+        try:
+            result = fn()
+
+            try:
+                payload = json.dumps(result, default=_json_default)
+                client.set(f"{KEY_PREFIX}:result:{key}:{token}", payload, ex=self.result_ttl)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Résultat de la recherche {key} non partageable entre workers: {str(e)}")
+            except Exception as e:
+                logger.error(f"Erreur lors du dépôt du résultat de la recherche {key}: {str(e)}")
+
+            return result
+        finally:
+            try:
+                client.eval(RELEASE_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                logger.error(f"Erreur lors de la libération du verrou {lock_key}: {str(e)}")
+
+    def _wait_for_leader(self, client, key, lock_key, token, deadline):
+        """
+        Attend le résultat de l'exécutant d'un autre worker
+
+        Si l'exécutant libère le verrou sans résultat (échec, arrêt du worker),
+        ce worker tente de prendre le relais.
+        Returns:
+            tuple: (résultat, verrou obtenu) ; si le verrou est obtenu, le résultat est None
+        """
+        interval = 0.05
+        leader_token = client.get(lock_key)
+
+        while time.monotonic() < deadline:
+            if leader_token is not None:
+                payload = client.get(f"{KEY_PREFIX}:result:{key}:{leader_token.decode('utf-8')}")
+                if payload is not None:
+                    return json.loads(payload), False
+
+            current = client.get(lock_key)
+            if current is None:
+                # Dernière lecture : l'exécutant a pu déposer le résultat puis libérer le verrou
+                if leader_token is not None:
+                    payload = client.get(f"{KEY_PREFIX}:result:{key}:{leader_token.decode('utf-8')}")
+                    if payload is not None:
+                        return json.loads(payload), False
+                if client.set(lock_key, token, nx=True, ex=self.lock_ttl):
+                    return None, True
+                current = client.get(lock_key)
+            leader_token = current
+
+            time.sleep(interval)
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+        logger.warning(f"Attente de la recherche {key} expirée, exécution locale")
+        return None, True
+
+
+# Regroupement partagé par les routes du processus
+singleflight = SingleFlight()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+TheWatcher - Canonicalisation et dédoublonnage des URL
+Les moteurs de recherche renvoient la même ressource sous plusieurs formes
+(http/https, sous-domaines www ou mobiles, paramètres de suivi, / final...).
+Ce module réduit une URL à une forme canonique et complète l'élément conservé
+avec ses doublons, en réunissant leurs sources, indépendamment de l'ordre
+d'arrivée des doublons.
+"""
+
+import json
+import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote, unquote
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Préfixes d'hôte équivalents au domaine principal
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'mbasic.', 'touch.', 'amp.')
+
+# Paramètres de suivi sans effet sur la ressource désignée
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'igsh', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref', 'ref_src', 'ref_url', 'si', 'spm', 'feature', 'share', 'src'
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'hsa_')
+
+# Ports par défaut retirés de l'hôte
+DEFAULT_PORTS = {'80', '443'}
+
+def _is_tracking_param(name):
+    """
+    Indique si un paramètre de requête est un paramètre de suivi
+    """
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def canonicalize_url(url):
+    """
+    Réduit une URL à sa forme canonique
+
+    Schéma https, hôte en minuscules sans préfixe www/mobile ni port par
+    défaut, chemin normalisé sans / final, paramètres de suivi retirés et
+    paramètres restants triés, fragment retiré.
+    Args:
+        url: URL à canonicaliser
+    Returns:
+        str: URL canonique, ou None si ce n'est pas une URL http(s)
+    """
+    if not isinstance(url, str):
+        return None
+
+    url = url.strip()
+    if url.startswith('//'):
+        url = 'https:' + url
+
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+
+    if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+        return None
+
+    # Retirer les préfixes successifs (www.m.) pour que la forme canonique soit stable
+    host = parts.hostname.rstrip('.')
+    stripped = True
+    while stripped:
+        stripped = False
+        for prefix in HOST_PREFIXES:
+            if host.startswith(prefix) and host.count('.') > 1:
+                host = host[len(prefix):]
+                stripped = True
+                break
+
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and str(port) not in DEFAULT_PORTS:
+        host = f"{host}:{port}"
+
+    # Décoder puis réencoder pour unifier les variantes d'encodage
+    path = quote(unquote(parts.path), safe="/:@!$&'()*+,;=-._~")
+    while '//' in path:
+        path = path.replace('//', '/')
+    path = path.rstrip('/')
+
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    ))
+
+    return urlunsplit(('https', host, path, query, ''))
+
+def _value_order(value):
+    """
+    Clé d'ordre total d'une valeur de champ (chaînes, nombres, listes, dictionnaires)
+    """
+    return json.dumps(value, sort_keys=True, default=str)
+
+def merge_duplicate(entry, item, source_key='source'):
+    """
+    Complète un élément conservé avec un doublon
+
+    Pour chaque champ, la plus petite valeur non vide des deux éléments est
+    retenue, et la provenance du doublon (sa liste `sources`, à défaut sa
+    source) est ajoutée à `sources`, triée. Le résultat ne dépend ni de l'ordre
+    ni du regroupement des fusions : des états partiels arrivés dans n'importe
+    quel ordre donnent le même élément.
+    Args:
+        entry: Élément conservé (modifié sur place, avec une liste `sources`)
+        item: Doublon
+        source_key: Clé de la provenance dans un élément
+    """
+    for key, value in item.items():
+        if key == 'sources' or value in (None, ''):
+            continue
+        current = entry.get(key)
+        if current in (None, '') or _value_order(value) < _value_order(current):
+            entry[key] = value
+
+    sources = item.get('sources') or ([item[source_key]] if item.get(source_key) else [])
+    entry['sources'] = sorted(set(entry['sources']).union(sources))